@@ -5,6 +5,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
 
-def ready(self):
-    import accounts.signals
+    def ready(self):
+        import accounts.signals  # noqa: F401
 
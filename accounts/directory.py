@@ -0,0 +1,90 @@
+# accounts/directory.py
+"""
+User lookups for the role assignment screen.
+
+Prefix search is a range scan on the LOWER(username) / LOWER(email)
+expression indexes (`q <= value < q + U+10FFFF`), which every backend can
+serve from a b-tree, unlike LIKE/ILIKE. Results are keyset-paginated on
+(LOWER(username), id) and only fetch the columns the picker shows.
+"""
+import base64
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import User, UserRole
+from .permissions import invalidate_users
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+PREFIX_END = '\U0010ffff'
+
+
+def encode_cursor(user):
+    raw = f"{user.username_key}|{user.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """(username_key, pk) from a cursor, or None if it's missing or malformed"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        key, pk = raw.rsplit('|', 1)
+        return key, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def search_users(query='', cursor=None, page_size=PAGE_SIZE):
+    """Return (users, next_cursor) for users whose username or email starts with `query`"""
+    users = (
+        User.objects.annotate(username_key=Lower('username'), email_key=Lower('email'))
+        .only('id', 'username', 'email')
+        .order_by('username_key', 'id')
+    )
+    prefix = query.strip().lower()
+    if prefix:
+        users = users.filter(
+            Q(username_key__gte=prefix, username_key__lt=prefix + PREFIX_END)
+            | Q(email_key__gte=prefix, email_key__lt=prefix + PREFIX_END)
+        )
+    position = decode_cursor(cursor)
+    if position:
+        key, pk = position
+        users = users.filter(Q(username_key__gt=key) | Q(username_key=key, id__gt=pk))
+
+    rows = list(users[:page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
+
+
+def serialize_user(user):
+    return {'id': user.pk, 'username': user.username, 'email': user.email}
+
+
+def assign_role(user_ids, role):
+    """
+    Give `role` to every user in `user_ids` with one batched upsert.
+
+    Returns (assigned, already_had); users that already had the role just
+    get their updated_at refreshed.
+    """
+    user_ids = set(User.objects.filter(pk__in=set(user_ids)).values_list('pk', flat=True))
+    if not user_ids:
+        return 0, 0
+    already_had = UserRole.objects.filter(role=role, user_id__in=user_ids).count()
+    now = timezone.now()
+    UserRole.objects.bulk_create(
+        [UserRole(user_id=user_id, role=role, created_at=now, updated_at=now) for user_id in user_ids],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['user', 'role'],
+        update_fields=['updated_at'],
+    )
+    # bulk_create doesn't send post_save
+    invalidate_users(user_ids)
+    return len(user_ids) - already_had, already_had
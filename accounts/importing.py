@@ -0,0 +1,198 @@
+# accounts/importing.py
+"""
+Bulk user import from CSV or JSON Lines.
+
+Rows are read as a stream and handled in chunks: each chunk is validated
+against itself and the database (two queries), its passwords are hashed in
+a process pool, and the users and their UserRole rows go in with
+bulk_create. bulk_create skips post_save, so assign_default_role never runs;
+the Client role is resolved once and assigned here instead.
+
+Columns: email, username, optional password (blank leaves the password
+unusable) and optional role (an existing Role name, given on top of Client).
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import Role, User, UserRole
+
+DEFAULT_ROLE = 'Client'
+DEFAULT_CHUNK_SIZE = 1000
+FORMATS = ('csv', 'jsonl')
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # (line number, message)
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """Rows handled per second"""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(name):
+    return 'jsonl' if name.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, fmt='csv'):
+    """Yield (line number, row dict or None, error or None) from a text stream"""
+    if fmt == 'jsonl':
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_no, None, f"Invalid JSON: {exc}"
+                continue
+            if isinstance(row, dict):
+                yield line_no, row, None
+            else:
+                yield line_no, None, "Expected a JSON object"
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+
+
+def _hash_worker_init():
+    import django
+    django.setup()
+
+
+def _clean(row, roles):
+    email = User.objects.normalize_email(str(row.get('email') or '').strip())
+    username = str(row.get('username') or '').strip()
+    role_name = str(row.get('role') or '').strip()
+    if not email:
+        raise ValidationError("Email is required")
+    validate_email(email)
+    if not username:
+        raise ValidationError("Username is required")
+    if len(username) > User._meta.get_field('username').max_length:
+        raise ValidationError("Username is too long")
+    if role_name and role_name not in roles:
+        raise ValidationError(f"Unknown role {role_name!r}")
+    return {'email': email, 'username': username, 'password': row.get('password') or None, 'role': role_name}
+
+
+class UserImporter:
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.roles = {}
+        self.seen_emails, self.seen_usernames = set(), set()
+
+    def run(self, rows):
+        """Import (line number, row, error) tuples as produced by read_rows()"""
+        result = ImportResult()
+        client, _ = Role.objects.get_or_create(name=DEFAULT_ROLE)
+        self.roles = {role.name: role.pk for role in Role.objects.only('pk', 'name')}
+        self.client_id = client.pk
+
+        pool = ProcessPoolExecutor(self.workers, initializer=_hash_worker_init) if self.workers > 1 else None
+        try:
+            rows = iter(rows)
+            while chunk := list(islice(rows, self.chunk_size)):
+                self._import_chunk(chunk, result, pool)
+                if self.progress:
+                    self.progress(result)
+        finally:
+            if pool:
+                pool.shutdown()
+        result.errors.sort()
+        return result
+
+    def _hash(self, passwords, pool):
+        if pool is None:
+            return [make_password(p) for p in passwords]
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (self.workers * 4))))
+
+    def _import_chunk(self, chunk, result, pool):
+        result.rows += len(chunk)
+        valid = []
+        for line_no, row, error in chunk:
+            if error is None:
+                try:
+                    row = _clean(row, self.roles)
+                except ValidationError as exc:
+                    error = '; '.join(exc.messages)
+            if error is None and row['email'] in self.seen_emails:
+                error = f"Duplicate email {row['email']} in file"
+            elif error is None and row['username'] in self.seen_usernames:
+                error = f"Duplicate username {row['username']} in file"
+            if error:
+                result.errors.append((line_no, error))
+                continue
+            self.seen_emails.add(row['email'])
+            self.seen_usernames.add(row['username'])
+            valid.append((line_no, row))
+        if not valid:
+            return
+
+        taken_emails = set(User.objects.filter(email__in=[r['email'] for _, r in valid]).values_list('email', flat=True))
+        taken_usernames = set(User.objects.filter(username__in=[r['username'] for _, r in valid]).values_list('username', flat=True))
+        ready = []
+        for line_no, row in valid:
+            if row['email'] in taken_emails:
+                result.errors.append((line_no, f"Email {row['email']} already exists"))
+            elif row['username'] in taken_usernames:
+                result.errors.append((line_no, f"Username {row['username']} already exists"))
+            else:
+                ready.append((line_no, row))
+        if not ready:
+            return
+
+        hashes = self._hash([row['password'] for _, row in ready], pool)
+        users = [
+            User(email=row['email'], username=row['username'], password=password)
+            for (_, row), password in zip(ready, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                self._save(users, [row['role'] for _, row in ready])
+            result.created += len(users)
+        except IntegrityError:
+            # Someone registered one of these addresses meanwhile: fall back to row by row
+            for (line_no, row), user in zip(ready, users):
+                user.pk = None
+                try:
+                    with transaction.atomic():
+                        self._save([user], [row['role']])
+                    result.created += 1
+                except IntegrityError as exc:
+                    result.errors.append((line_no, f"Could not create user: {exc}"))
+
+    def _save(self, users, role_names):
+        User.objects.bulk_create(users, batch_size=500)
+        # Not every backend returns primary keys from bulk_create, so look them up
+        ids = dict(User.objects.filter(email__in=[u.email for u in users]).values_list('email', 'pk'))
+        links = []
+        for user, role_name in zip(users, role_names):
+            links.append(UserRole(user_id=ids[user.email], role_id=self.client_id))
+            if role_name and role_name != DEFAULT_ROLE:
+                links.append(UserRole(user_id=ids[user.email], role_id=self.roles[role_name]))
+        UserRole.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+def import_users(stream, fmt='csv', **options):
+    """Import users from a text stream; see UserImporter for options"""
+    return UserImporter(**options).run(read_rows(stream, fmt))
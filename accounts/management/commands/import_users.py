@@ -0,0 +1,37 @@
+# accounts/management/commands/import_users.py
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importing import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, import_users
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users from a CSV or JSONL file (columns: email, username, password, role)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, help='Password hashing processes (default: CPU count, 0 to hash inline)')
+        parser.add_argument('--max-errors', type=int, default=50, help='How many row errors to print')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+
+        def progress(result):
+            self.stdout.write(f"  {result.rows} rows · {result.created} created · {len(result.errors)} errors · {result.rate:.0f} rows/s")
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                result = import_users(
+                    stream, fmt, workers=options['workers'], chunk_size=options['chunk_size'], progress=progress,
+                )
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for line_no, message in result.errors[:options['max_errors']]:
+            self.stdout.write(self.style.WARNING(f"  line {line_no}: {message}"))
+        if len(result.errors) > options['max_errors']:
+            self.stdout.write(self.style.WARNING(f"  ... and {len(result.errors) - options['max_errors']} more"))
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Imported {result.created} of {result.rows} rows in {result.elapsed:.1f}s ({result.rate:.0f} rows/s)"
+        ))
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 
@@ -33,11 +34,24 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            # accounts.directory prefix search
+            models.Index(Lower('username'), 'id', name='user_username_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
+
     def has_role(self, role_name):
-        return self.roles.filter(name=role_name).exists()
+        from .permissions import get_access
+        return get_access(self).has_role(role_name)
+
+    def has_permission(self, permission_name):
+        from .permissions import get_access
+        return get_access(self).has_permission(permission_name)
 
     def get_roles(self):
-        return [ur.role.name for ur in self.userrole_set.select_related('role')]
+        from .permissions import get_access
+        return sorted(get_access(self).roles)
 
 
 class Role(models.Model):
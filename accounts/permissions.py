@@ -0,0 +1,114 @@
+# accounts/permissions.py
+"""
+Resolve a user's roles and permissions once.
+
+One LEFT JOIN over UserRole → Role → RolePermission → Permission yields
+both sets, which are frozen into a UserAccess. That object is memoised on
+the user instance (so once per request for request.user) and cached per
+user. UserRole changes drop that user's entry; Role, RolePermission and
+Permission changes bump a shared version that retires every entry.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+
+from core.utils.cache_versions import bump_on_commit, get_version
+
+VERSION_NAME = 'accounts:access'
+DEFAULT_CACHE_TTL = 60 * 60
+
+
+class UserAccess:
+    """Immutable roles/permissions of one user"""
+    __slots__ = ('roles', 'permissions', 'is_superuser')
+
+    def __init__(self, roles=(), permissions=(), is_superuser=False):
+        self.roles = frozenset(roles)
+        self.permissions = frozenset(permissions)
+        self.is_superuser = is_superuser
+
+    def has_role(self, *names):
+        """True if the user has any of the given roles"""
+        return not self.roles.isdisjoint(names)
+
+    def has_permission(self, *names):
+        """True if the user has all of the given permissions (superusers have every permission)"""
+        return self.is_superuser or self.permissions.issuperset(names)
+
+
+ANONYMOUS = UserAccess()
+
+
+def _cache_key(user_id):
+    return f"access:{get_version(VERSION_NAME)}:{user_id}"
+
+
+def load_access(user_id):
+    """(roles, permissions) for one user in a single joined query"""
+    from .models import UserRole
+
+    roles, permissions = set(), set()
+    rows = UserRole.objects.filter(user_id=user_id).values_list('role__name', 'role__rolepermission__permission__name')
+    for role, permission in rows:
+        roles.add(role)
+        if permission:
+            permissions.add(permission)
+    return frozenset(roles), frozenset(permissions)
+
+
+def get_access(user):
+    """The user's UserAccess: memoised on the instance, then cached, then one query"""
+    if not getattr(user, 'is_authenticated', False):
+        return ANONYMOUS
+    access = getattr(user, '_access', None)
+    if access is None:
+        key = _cache_key(user.pk)
+        resolved = cache.get(key)
+        if resolved is None:
+            resolved = load_access(user.pk)
+            cache.set(key, resolved, getattr(settings, 'ACCESS_CACHE_TTL', DEFAULT_CACHE_TTL))
+        access = UserAccess(*resolved, is_superuser=user.is_superuser)
+        user._access = access
+    return access
+
+
+def invalidate_users(user_ids):
+    """Drop cached access for these users now and again on commit"""
+    def drop():
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+    user_ids = set(user_ids)
+    if user_ids:
+        drop()
+        transaction.on_commit(drop)
+
+
+def invalidate_all():
+    bump_on_commit(VERSION_NAME)
+
+
+def _require(check):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return redirect_to_login(request.get_full_path())
+            if not (request.user.is_superuser or check(get_access(request.user))):
+                raise PermissionDenied
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def requires_role(*names):
+    """View decorator: the user needs at least one of these roles (superusers always pass)"""
+    return _require(lambda access: access.has_role(*names))
+
+
+def requires_permission(*names):
+    """View decorator: the user needs every one of these permissions"""
+    return _require(lambda access: access.has_permission(*names))
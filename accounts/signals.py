@@ -1,9 +1,22 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import User, Role, UserRole
+from .models import User, Role, UserRole, Permission, RolePermission
+from .permissions import invalidate_all, invalidate_users
 
 @receiver(post_save, sender=User)
 def assign_default_role(sender, instance, created, **kwargs):
     if created:
         client_role, _ = Role.objects.get_or_create(name='Client')
         UserRole.objects.get_or_create(user=instance, role=client_role)
+
+
+@receiver([post_save, post_delete], sender=UserRole)
+def refresh_user_access(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+@receiver([post_save, post_delete], sender=Role)
+@receiver([post_save, post_delete], sender=Permission)
+def refresh_all_access(sender, **kwargs):
+    invalidate_all()
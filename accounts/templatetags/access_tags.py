@@ -0,0 +1,23 @@
+from django import template
+
+from accounts.permissions import get_access
+
+register = template.Library()
+
+
+@register.filter
+def has_role(user, role_names):
+    """{% if user|has_role:"Admin,Linguist" %} — any of the comma-separated roles"""
+    return get_access(user).has_role(*(name.strip() for name in role_names.split(',')))
+
+
+@register.filter
+def has_permission(user, permission_name):
+    """{% if user|has_permission:"manage_payments" %}"""
+    return get_access(user).has_permission(permission_name)
+
+
+@register.simple_tag
+def get_user_access(user):
+    """{% get_user_access user as access %} then access.roles / access.permissions"""
+    return get_access(user)
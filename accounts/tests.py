@@ -1,3 +1,160 @@
-from django.test import TestCase
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from .directory import assign_role, search_users
+from .importing import import_users
+from .models import Permission, Role, RolePermission, User, UserRole
+from .permissions import get_access, requires_permission, requires_role
+
+
+class AccessResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='linguist@example.com', username='linguist', password='x')
+        self.linguist = Role.objects.create(name='Linguist')
+        self.translate = Permission.objects.create(name='translate')
+        self.review = Permission.objects.create(name='review')
+        RolePermission.objects.create(role=self.linguist, permission=self.translate)
+        UserRole.objects.create(user=self.user, role=self.linguist)
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_roles_and_permissions_resolve_in_one_query_then_cache(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            access = get_access(user)
+            self.assertTrue(user.has_role('Linguist'))
+            self.assertTrue(user.has_role('Client'))   # assigned on creation
+            self.assertTrue(user.has_permission('translate'))
+            self.assertFalse(user.has_permission('review'))
+        self.assertEqual(access.roles, {'Client', 'Linguist'})
+        self.assertEqual(user.get_roles(), ['Client', 'Linguist'])
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_access(user).permissions, {'translate'})
+
+    def test_signals_invalidate_cached_access(self):
+        get_access(self.fresh_user())
+        RolePermission.objects.create(role=self.linguist, permission=self.review)
+        self.assertTrue(self.fresh_user().has_permission('review'))
+
+        UserRole.objects.filter(user=self.user, role=self.linguist).delete()  # queryset delete still sends post_delete
+        user = self.fresh_user()
+        self.assertFalse(user.has_role('Linguist'))
+        self.assertFalse(user.has_permission('translate'))
+
+    def test_decorators_and_template_filters(self):
+        view = requires_role('Admin')(lambda request: HttpResponse('ok'))
+        request = RequestFactory().get('/admin-only/')
+        request.user = self.fresh_user()
+        with self.assertRaises(PermissionDenied):
+            view(request)
+        permitted = requires_permission('translate')(lambda request: HttpResponse('ok'))
+        self.assertEqual(permitted(request).status_code, 200)
+
+        rendered = Template(
+            '{% load access_tags %}{% if user|has_role:"Admin, Linguist" %}staff{% endif %}'
+            '{% if user|has_permission:"review" %}review{% endif %}'
+        ).render(Context({'user': request.user}))
+        self.assertEqual(rendered, 'staff')
+
+
+class UserImportTests(TestCase):
+    def setUp(self):
+        Role.objects.create(name='Linguist')
+        User.objects.create_user(email='taken@example.com', username='taken', password='x')
+
+    def test_csv_import_bulk_creates_users_and_roles(self):
+        rows = ["email,username,password,role"] + [f"s{n}@school.tz,student{n},pw{n}," for n in range(30)] + [
+            "teacher@school.tz,teacher,pw,Linguist",
+            "not-an-email,bad,pw,",
+            "taken@example.com,someone,pw,",
+            "s1@school.tz,again,pw,",
+            "ghost@school.tz,ghost,pw,Wizard",
+        ]
+        # Two role lookups, then per chunk: 2 duplicate checks, user insert, id lookup, UserRole insert, savepoint pair
+        with self.assertNumQueries(2 + 2 * 7):
+            result = import_users(io.StringIO("\n".join(rows)), workers=0, chunk_size=20)
+
+        self.assertEqual((result.rows, result.created), (35, 31))
+        self.assertEqual([line for line, _ in result.errors], [33, 34, 35, 36])
+        teacher = User.objects.get(email='teacher@school.tz')
+        self.assertTrue(teacher.check_password('pw'))
+        self.assertEqual(teacher.get_roles(), ['Client', 'Linguist'])
+        self.assertEqual(UserRole.objects.filter(role__name='Client', user__email__endswith='@school.tz').count(), 31)
+
+    def test_jsonl_command_and_admin_upload(self):
+        path = self.tmp_file('\n'.join(json.dumps({'email': f'j{n}@school.tz', 'username': f'j{n}'}) for n in range(3)) + '\nnot json\n')
+        out = io.StringIO()
+        call_command('import_users', path, '--workers', '0', stdout=out)
+        self.assertIn('Imported 3 of 4 rows', out.getvalue())
+        self.assertIn('line 4: Invalid JSON', out.getvalue())
+        self.assertFalse(User.objects.get(email='j0@school.tz').has_usable_password())
+
+        admin_user = User.objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        self.client.force_login(admin_user)
+        upload = SimpleUploadedFile('users.csv', b'email,username\nadmin1@school.tz,admin1\n', content_type='text/csv')
+        with mock.patch('accounts.importing.ProcessPoolExecutor') as pool:
+            response = self.client.post(reverse('admin:accounts_user_import'), {'file': upload}, follow=True)
+        pool.assert_not_called()
+        self.assertContains(response, 'Imported 1 of 1 rows')
+        self.assertTrue(User.objects.filter(email='admin1@school.tz').exists())
+
+    def tmp_file(self, content):
+        import tempfile
+        handle = tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False)
+        self.addCleanup(__import__('os').unlink, handle.name)
+        with handle:
+            handle.write(content)
+        return handle.name
+
+
+class RolePickerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        self.users = [
+            User.objects.create_user(email=f'{name.lower()}@school.tz', username=name, password='x')
+            for name in ('Amina', 'amani', 'Baraka', 'Amos', 'zawadi')
+        ]
+        self.linguist = Role.objects.create(name='Linguist')
+
+    def test_prefix_search_is_case_insensitive_and_keyset_paginated(self):
+        users, cursor = search_users('am', page_size=2)
+        self.assertEqual([u.username for u in users], ['amani', 'Amina'])
+        users, cursor = search_users('am', cursor, page_size=2)
+        self.assertEqual([u.username for u in users], ['Amos'])
+        self.assertIsNone(cursor)
+        self.assertEqual([u.username for u in search_users('ZAWADI@')[0]], ['zawadi'])
+
+        self.client.force_login(self.admin)
+        data = self.client.get(reverse('accounts:user-search-api'), {'q': 'b'}).json()
+        self.assertEqual(data, {'results': [{'id': self.users[2].pk, 'username': 'Baraka', 'email': 'baraka@school.tz'}], 'next': None})
+
+    def test_search_requires_admin(self):
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.client.get(reverse('accounts:user-search-api')).status_code, 403)
+
+    def test_bulk_assignment_is_one_upsert(self):
+        UserRole.objects.create(user=self.users[0], role=self.linguist)
+        get_access(self.users[1])  # cached before the assignment
+        ids = [u.pk for u in self.users]
+        with self.assertNumQueries(3):  # existing users, existing roles, upsert
+            self.assertEqual(assign_role(ids, self.linguist), (4, 1))
+        self.assertEqual(UserRole.objects.filter(role=self.linguist).count(), 5)
+        self.assertTrue(User.objects.get(pk=self.users[1].pk).has_role('Linguist'))
+
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('accounts:assign-role'), {'user_ids': ids[:2], 'role_id': self.linguist.pk}, follow=True)
+        self.assertContains(response, 'assigned to 0 user(s); 2 already had it')
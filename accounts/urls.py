@@ -12,6 +12,7 @@ urlpatterns = [
     
     # User management URLs
     path('assign-role/', views.assign_role_view, name='assign-role'),
+    path('api/users/', views.user_search_api, name='user-search-api'),
     path('services/', views.services_view, name='services'),
     
     # ✅ Password Reset URLs (Fixed)
@@ -5,11 +5,13 @@ from django.contrib.auth import authenticate, login, logout # Make sure you impo
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy # For more robust URL handling
-from django.utils import timezone
+from django.http import JsonResponse
 
 # Import your custom forms
 from .forms import CustomUserCreationForm, CustomAuthenticationForm 
-from .models import User, Role, UserRole # Ensure your User, Role, UserRole models are imported
+from .directory import MAX_PAGE_SIZE, PAGE_SIZE, assign_role, search_users, serialize_user
+from .permissions import requires_role
+from .models import Role
 
 def register_view(request):
     login_form = CustomAuthenticationForm(request) # Instantiate login form for the template
@@ -75,44 +77,38 @@ def logout_view(request):
     return redirect(reverse_lazy('accounts:login')) # Redirect to the login page after logout
 
 
-@login_required
+@requires_role('Admin')
 def assign_role_view(request):
     if request.method == 'POST':
-        user_id = request.POST.get('user_id')
-        role_id = request.POST.get('role_id')
-
         try:
-            user = User.objects.get(id=int(user_id)) # Ensure user_id is an integer
-            role = Role.objects.get(id=int(role_id)) # Ensure role_id is an integer
-
-            # Using update_or_create to ensure 'updated_at' is always current
-            # Assuming 'UserRole' model has auto_now=True for 'updated_at'
-            user_role, created = UserRole.objects.update_or_create(
-                user=user, 
-                role=role, 
-                defaults={
-                    # 'created_at': timezone.now(), # Only set on creation, better to use auto_now_add in model
-                    'updated_at': timezone.now() # This will be updated on create or update
-                }
-            )
-
-            if created:
-                messages.success(request, f'Role "{role.name}" assigned to {user.username}')
-            else:
-                messages.info(request, f'Role "{role.name}" was already assigned to {user.username} (updated timestamp).')
-
-        except User.DoesNotExist:
-            messages.error(request, 'User not found.')
+            user_ids = [int(pk) for pk in request.POST.getlist('user_ids')]
+            role = Role.objects.get(id=int(request.POST.get('role_id')))
         except Role.DoesNotExist:
             messages.error(request, 'Role not found.')
-        except ValueError:
+        except (TypeError, ValueError):
             messages.error(request, 'Invalid user or role ID provided.')
+        else:
+            assigned, already_had = assign_role(user_ids, role)
+            if assigned or already_had:
+                messages.success(request, f'Role "{role.name}" assigned to {assigned} user(s); {already_had} already had it.')
+            else:
+                messages.error(request, 'Select at least one user.')
+
+        return redirect(reverse_lazy('accounts:assign-role'))
+
+    roles = Role.objects.only('id', 'name').order_by('name')
+    return render(request, 'accounts/assign_role.html', {'roles': roles, 'page_size': PAGE_SIZE})
 
-        return redirect(reverse_lazy('assign-role'))
 
-    users = User.objects.all()
-    roles = Role.objects.all()
-    return render(request, 'accounts/assign_role.html', {'users': users, 'roles': roles})
+@requires_role('Admin')
+def user_search_api(request):
+    """Typeahead for the role picker: ?q=<prefix>&after=<cursor>&limit=<n>"""
+    try:
+        page_size = max(1, min(int(request.GET.get('limit', PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        page_size = PAGE_SIZE
+    users, next_cursor = search_users(request.GET.get('q', ''), request.GET.get('after'), page_size)
+    return JsonResponse({'results': [serialize_user(user) for user in users], 'next': next_cursor})
 
 
 def services_view(request):
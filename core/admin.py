@@ -2,8 +2,15 @@ from django.contrib import admin
 from django import forms
 from django.urls import path
 from django.shortcuts import render, redirect
+from django.db.models import Q
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import format_html
 from .models import SEO, ContactMessage, Notification
 from .models import Message, Conversation
+from .models import SEOAuditResult, SEOAuditRun, DailyViewSketch, RatingSummary, Tag
+from . import ratings
+from .utils.hyperloglog import HyperLogLog
+from .utils.seo_audit import DESCRIPTION_MAX_LENGTH, TITLE_MAX_LENGTH
 
 class ReplyForm(forms.Form):
     reply = forms.CharField(widget=forms.Textarea, required=True)
@@ -161,8 +168,8 @@ class SEOAdmin(admin.ModelAdmin):
         form = super().get_form(request, obj, **kwargs)
         
         # Add help text
-        form.base_fields['meta_title'].help_text = 'Keep under 60 characters for best SEO results'
-        form.base_fields['meta_description'].help_text = 'Keep under 160 characters for best SEO results'
+        form.base_fields['meta_title'].help_text = f'Keep under {TITLE_MAX_LENGTH} characters for best SEO results'
+        form.base_fields['meta_description'].help_text = f'Keep under {DESCRIPTION_MAX_LENGTH} characters for best SEO results'
         form.base_fields['canonical_url'].help_text = 'Leave blank to use default URL'
         form.base_fields['og_image_url'].help_text = 'Recommended size: 1200x630 pixels'
         
@@ -182,3 +189,107 @@ class NotificationAdmin(admin.ModelAdmin):
         updated = queryset.update(status='read')
         self.message_user(request, f"{updated} notification(s) marked as read.")
     mark_as_read.short_description = "Mark selected notifications as read"
+
+
+class HasIssuesFilter(admin.SimpleListFilter):
+    title = 'has issues'
+    parameter_name = 'has_issues'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Yes'), ('no', 'No'))
+
+    def queryset(self, request, queryset):
+        flagged = ~Q(issues=[]) | Q(duplicate_title=True) | Q(duplicate_description=True)
+        if self.value() == 'yes':
+            return queryset.filter(flagged)
+        if self.value() == 'no':
+            return queryset.exclude(flagged)
+        return queryset
+
+
+@admin.register(SEOAuditResult)
+class SEOAuditResultAdmin(admin.ModelAdmin):
+    list_display = ['label', 'source', 'issue_list', 'duplicate_title', 'duplicate_description', 'source_link', 'audited_at']
+    list_filter = [HasIssuesFilter, 'source', 'duplicate_title', 'duplicate_description']
+    search_fields = ['label']
+    readonly_fields = [field.name for field in SEOAuditResult._meta.fields]
+
+    def issue_list(self, obj):
+        return ', '.join(issue.replace('_', ' ') for issue in obj.all_issues) or '—'
+    issue_list.short_description = 'Issues'
+
+    def source_link(self, obj):
+        model_name = 'seo' if obj.source == 'seo' else 'blogpost'
+        app_label = 'core' if obj.source == 'seo' else 'content'
+        try:
+            url = reverse(f'admin:{app_label}_{model_name}_change', args=[obj.object_id])
+        except NoReverseMatch:
+            return '—'
+        return format_html('<a href="{}">Edit</a>', url)
+    source_link.short_description = 'Source'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SEOAuditRun)
+class SEOAuditRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'finished_at', 'incremental', 'scanned', 'flagged']
+    list_filter = ['incremental']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyViewSketch)
+class DailyViewSketchAdmin(admin.ModelAdmin):
+    list_display = ['post_id', 'day', 'views', 'unique_visitors']
+    list_filter = ['day']
+    search_fields = ['post_id']
+    exclude = ['registers']
+    readonly_fields = ['post_id', 'day', 'views', 'unique_visitors']
+
+    def unique_visitors(self, obj):
+        return f"≈ {HyperLogLog.from_bytes(obj.registers).count()}"
+    unique_visitors.short_description = "Unique visitors"
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'post_count']
+    search_fields = ['name', 'slug']
+    readonly_fields = ['slug', 'post_count']
+    ordering = ['-post_count', 'name']
+
+    def has_add_permission(self, request):
+        # Tags come from BlogPost.tags; see core.tags
+        return False
+
+
+@admin.register(RatingSummary)
+class RatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'stars_5', 'stars_4', 'stars_3', 'stars_2', 'stars_1', 'updated_at']
+    actions = ['recount']
+
+    @admin.action(description="Recount from all ratings")
+    def recount(self, request, queryset):
+        ratings.rebuild()
+        self.message_user(request, "Rating summary recounted.")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
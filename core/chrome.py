@@ -0,0 +1,55 @@
+# core/chrome.py
+"""
+Fragment cache for the base layout's chrome (navigation, account menu, footer).
+
+base.html wraps its fragments in {% chrome_cache %} (core.templatetags.chrome_tags):
+
+- Shared fragments ('nav', 'nav-guest', 'footer') are keyed by language
+  and DEPLOY_VERSION, so they render once per language per deploy.
+- Per-user fragments ('nav-user') also carry the user's chrome version,
+  which core.signals bumps when their messages, notifications or account
+  change; the unread badge is recounted only then.
+
+DEPLOY_VERSION is settings.DEPLOY_VERSION (e.g. a release tag or commit),
+or the process start time if unset. Set CHROME_CACHE = False to render
+everything inline, e.g. when editing the layout or benchmarking it.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import translation
+
+from core.utils.cache_versions import bump_on_commit, get_version
+
+DEFAULT_TIMEOUT = 24 * 60 * 60
+DEPLOY_VERSION = getattr(settings, 'DEPLOY_VERSION', None) or str(int(time.time()))
+
+
+def enabled():
+    return getattr(settings, 'CHROME_CACHE', True)
+
+
+def backend():
+    return caches[getattr(settings, 'CHROME_CACHE_ALIAS', 'default')]
+
+
+def timeout():
+    return getattr(settings, 'CHROME_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _user_version_name(user_id):
+    return f"core:chrome:user:{user_id}"
+
+
+def fragment_key(name, user=None):
+    key = f"chrome:{name}:{translation.get_language()}:{DEPLOY_VERSION}"
+    if user is not None and user.is_authenticated:
+        key += f":{user.pk}:{get_version(_user_version_name(user.pk))}"
+    return key
+
+
+def bump_users(*user_ids):
+    """Re-render these users' chrome on their next request"""
+    for user_id in set(user_ids):
+        bump_on_commit(_user_version_name(user_id))
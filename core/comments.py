@@ -0,0 +1,180 @@
+# core/comments.py
+"""
+Threaded blog comments from materialised paths.
+
+Every BlogComment has a CommentNode whose path is its ancestors' ids and
+its own, each as SEGMENT fixed-width hex digits. Sorting a post's nodes by
+path therefore lists each thread depth-first with siblings oldest first,
+so a post's approved discussion is one query on (post_id, approved, path),
+assembled into a tree in a single pass.
+
+Threads paginate by top-level comment: a page of roots is a contiguous
+path range, fetched with the same index.
+
+core.signals keeps nodes in step with comment saves; moving a comment to
+another parent rewrites its subtree's paths in one UPDATE.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Length, Substr
+
+from .models import CommentNode
+from .page_cache import purge_on_commit
+
+SEGMENT = 8
+MAX_DEPTH = 255 // SEGMENT - 1
+THREADS_PER_PAGE = 10
+MODERATION_PAGE_SIZE = 50
+
+
+def segment(pk):
+    return format(pk, f'0{SEGMENT}x')
+
+
+def _blog_comments():
+    return apps.get_model('content', 'BlogComment')._default_manager
+
+
+def _place(comment, parent_node):
+    """(path, depth) for a comment under parent_node; replies past MAX_DEPTH join the deepest level"""
+    if parent_node is None:
+        return segment(comment.pk), 0
+    if parent_node.depth >= MAX_DEPTH:
+        return parent_node.path[:-SEGMENT] + segment(comment.pk), parent_node.depth
+    return parent_node.path + segment(comment.pk), parent_node.depth + 1
+
+
+def sync_comment(comment):
+    """Create or refresh the comment's node, re-rooting its replies if its parent changed"""
+    parent_node = None
+    if comment.parent_id:
+        parent_node = CommentNode.objects.filter(comment_id=comment.parent_id).first()
+        if parent_node is None:
+            parent_node = sync_comment(comment.parent)
+    path, depth = _place(comment, parent_node)
+    node = CommentNode.objects.filter(comment_id=comment.pk).first()
+    if node is None:
+        return CommentNode.objects.create(
+            comment_id=comment.pk, post_id=comment.post_id, path=path, depth=depth, approved=comment.approved,
+        )
+    if node.path != path:
+        with transaction.atomic():
+            # Descendants keep their own tail and take the new prefix
+            CommentNode.objects.filter(path__startswith=node.path, post_id=node.post_id).exclude(pk=node.pk).update(
+                path=Concat(Value(path), Substr('path', len(node.path) + 1)),
+                depth=Length(Concat(Value(path), Substr('path', len(node.path) + 1))) / SEGMENT - 1,
+            )
+            node.path, node.depth = path, depth
+            node.approved = comment.approved
+            node.save()
+    elif node.approved != comment.approved or node.post_id != comment.post_id:
+        node.approved, node.post_id = comment.approved, comment.post_id
+        node.save(update_fields=['approved', 'post_id'])
+    return node
+
+
+def rebuild():
+    """Recreate every node from the parent links; returns the number of comments"""
+    rows = {pk: (parent_id, post_id, approved) for pk, parent_id, post_id, approved in
+            _blog_comments().values_list('pk', 'parent_id', 'post_id', 'approved').iterator(chunk_size=2000)}
+    placed = {}
+
+    def place(pk):
+        if pk not in placed:
+            chain, current = [], pk
+            while current is not None and current not in placed:
+                chain.append(current)
+                current = rows[current][0]
+            parent = placed.get(current)
+            for current in reversed(chain):
+                if parent is None:
+                    parent = placed[current] = (segment(current), 0)
+                elif parent[1] >= MAX_DEPTH:
+                    parent = placed[current] = (parent[0][:-SEGMENT] + segment(current), parent[1])
+                else:
+                    parent = placed[current] = (parent[0] + segment(current), parent[1] + 1)
+        return placed[pk]
+
+    nodes = []
+    for pk, (_, post_id, approved) in rows.items():
+        path, depth = place(pk)
+        nodes.append(CommentNode(comment_id=pk, post_id=post_id, path=path, depth=depth, approved=approved))
+    with transaction.atomic():
+        CommentNode.objects.all().delete()
+        CommentNode.objects.bulk_create(nodes, batch_size=1000)
+    return len(nodes)
+
+
+def build_tree(comments):
+    """
+    Nest comments that arrive in path order: each gets a `children` list and
+    the roots are returned. A reply whose parent is missing (e.g. not yet
+    approved) is dropped with it.
+    """
+    roots, by_pk = [], {}
+    for comment in comments:
+        comment.children = []
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in by_pk:
+            by_pk[comment.parent_id].children.append(comment)
+        else:
+            continue
+        by_pk[comment.pk] = comment
+    return roots
+
+
+def _thread_nodes(post_id):
+    return (
+        CommentNode.objects.filter(post_id=post_id, approved=True)
+        .select_related('comment__author')
+        .order_by('path')
+    )
+
+
+def approved_thread(post_id):
+    """The post's approved comments as a tree (one query)"""
+    return build_tree(node.comment for node in _thread_nodes(post_id))
+
+
+def thread_page(post_id, page=1, per_page=THREADS_PER_PAGE):
+    """(roots with nested children, has_next) for one page of top-level comments, in two queries"""
+    offset = (page - 1) * per_page
+    root_paths = list(
+        CommentNode.objects.filter(post_id=post_id, approved=True, depth=0)
+        .order_by('path').values_list('path', flat=True)[offset:offset + per_page + 1]
+    )
+    has_next = len(root_paths) > per_page
+    root_paths = root_paths[:per_page]
+    if not root_paths:
+        return [], False
+    # Every descendant of the page's roots sorts between the first root and the last root's subtree end
+    nodes = _thread_nodes(post_id).filter(path__gte=root_paths[0], path__lt=root_paths[-1] + 'g')
+    return build_tree(node.comment for node in nodes), has_next
+
+
+def moderation_queue(limit=MODERATION_PAGE_SIZE):
+    """Unapproved comments, oldest first, from the (approved, comment) index"""
+    nodes = CommentNode.objects.filter(approved=False).select_related('comment__author', 'comment__post').order_by('comment_id')
+    return [node.comment for node in nodes[:limit]]
+
+
+def pending_count():
+    return CommentNode.objects.filter(approved=False).count()
+
+
+def moderate(comment_ids, approve):
+    """Approve or delete comments in bulk; returns how many were changed"""
+    comments = _blog_comments().filter(pk__in=list(comment_ids))
+    with transaction.atomic():
+        if not approve:
+            changed = comments.count()
+            comments.delete()  # replies and nodes go with them
+            return changed
+        # update() skips post_save, so mirror the flag onto the nodes and purge the pages here
+        post_ids = set(comments.filter(approved=False).values_list('post_id', flat=True))
+        changed = comments.filter(approved=False).update(approved=True)
+        CommentNode.objects.filter(comment__in=comments).update(approved=True)
+        purge_on_commit(*(f'blog:{post_id}' for post_id in post_ids))
+    return changed
@@ -1,6 +1,8 @@
 # context_processors.py
 from .models import SEO
 from django.contrib.contenttypes.models import ContentType
+from django.utils.functional import SimpleLazyObject
+from . import ratings
 
 def seo_context(request):
     """Add global SEO data to all templates"""
@@ -12,6 +14,8 @@ def seo_context(request):
             'theme_color': '#3b82f6',
         }
     }
+    # Only looked up by templates that render an aggregate rating
+    context['aggregate_rating'] = SimpleLazyObject(lambda: ratings.aggregate_rating(context['seo']))
     
     # Try to get page-specific SEO
     try:
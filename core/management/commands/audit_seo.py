@@ -0,0 +1,25 @@
+# core/management/commands/audit_seo.py
+from django.core.management.base import BaseCommand
+
+from core.utils.seo_audit import SEOAuditor
+
+
+class Command(BaseCommand):
+    help = 'Audit SEO records and blog posts for length, duplicate, canonical and robots problems'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only re-audit rows changed since the last completed run',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per read/write batch')
+
+    def handle(self, *args, **options):
+        run = SEOAuditor(batch_size=options['batch_size']).run(incremental=options['incremental'])
+        seconds = (run.finished_at - run.started_at).total_seconds()
+        kind = 'Incremental' if run.incremental else 'Full'
+        self.stdout.write(f"{kind} audit: {run.scanned} rows scanned in {seconds:.2f}s")
+        if run.flagged:
+            self.stdout.write(self.style.WARNING(f"{run.flagged} record(s) flagged — see SEO Audit Results in admin"))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ No SEO issues found'))
@@ -0,0 +1,50 @@
+# core/management/commands/benchmark_chrome.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.template.loader import get_template
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = 'Time base.html renders with and without chrome fragment caching (runs in a rolled-back transaction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=500)
+        parser.add_argument('--template', default='base.html')
+
+    def handle(self, *args, **options):
+        template = get_template(options['template'])
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email='chrome-benchmark@example.com', username='chrome-benchmark', password=None,
+            )
+            other = get_user_model().objects.create_user(
+                email='chrome-benchmark-2@example.com', username='chrome-benchmark-2', password=None,
+            )
+            conversation = Conversation.objects.create(participant1=user, participant2=other)
+            Message.objects.create(conversation=conversation, sender=other, body='Habari!')
+
+            for label, visitor in (('anonymous', AnonymousUser()), ('logged in', user)):
+                for enabled in (False, True):
+                    with override_settings(CHROME_CACHE=enabled):
+                        self.time(f"{label}, {'cached' if enabled else 'uncached'}", template, visitor, options['renders'])
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark finished, data rolled back'))
+
+    def time(self, label, template, user, renders):
+        request = RequestFactory().get('/services/')
+        request.user = user
+        template.render({}, request)  # warm up: template loading and, when enabled, the fragment cache
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(renders):
+                template.render({}, request)
+            per_render = (time.perf_counter() - started) / renders * 1000
+        self.stdout.write(f"{label:24} {per_render:7.3f} ms/render {len(queries) / renders:5.1f} queries/render")
@@ -0,0 +1,68 @@
+# core/management/commands/benchmark_search.py
+import random
+import time
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import SearchDocument
+from core.search import search
+
+SYLLABLES = 'ka ri mu so ta ne li po ba zu fe gi ho ja ve wa yo da mi te'.split()
+LANGUAGES = ('English', 'Swahili', 'French')
+CATEGORIES = ('Grammar Guide', 'Vocabulary', 'Cultural Insights', 'Learning Methods', 'A1 - A2 Beginner')
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains scans with the full-text index on synthetic documents (runs in a rolled-back transaction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--words', type=int, default=300, help='Body length per document')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        # Zipf-distributed vocabulary, queried with mid-frequency words like real searches
+        vocabulary = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(30_000)})
+        rng.shuffle(vocabulary)
+        weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+        queries = [' '.join(rng.sample(vocabulary[50:2000], rng.choice((1, 2)))) for _ in range(options['queries'])]
+        with transaction.atomic():
+            self.seed(rng, vocabulary, weights, options['documents'], options['words'])
+            self.time('icontains', queries, lambda q: self.scan(q))
+            self.time('full-text', queries, lambda q: search(q, limit=20))
+            self.time('full-text + facet', queries, lambda q: search(q, language='Swahili', limit=20))
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark finished, data rolled back'))
+
+    def seed(self, rng, vocabulary, weights, count, words):
+        started = time.perf_counter()
+        batch = []
+        for n in range(count):
+            batch.append(SearchDocument(
+                kind='post', object_id=10_000_000 + n,
+                title=' '.join(rng.choices(vocabulary, cum_weights=weights, k=6)).title(),
+                body=' '.join(rng.choices(vocabulary, cum_weights=weights, k=words)),
+                language=rng.choice(LANGUAGES), category=rng.choice(CATEGORIES),
+            ))
+            if len(batch) == 5000:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {count} documents in {time.perf_counter() - started:.1f}s")
+
+    def scan(self, query):
+        documents = SearchDocument.objects.all()
+        for word in query.split():
+            documents = documents.filter(Q(title__icontains=word) | Q(body__icontains=word))
+        return list(documents[:20]), documents.count()
+
+    def time(self, label, queries, func):
+        started = time.perf_counter()
+        for query in queries:
+            func(query)
+        per_query = (time.perf_counter() - started) / len(queries) * 1000
+        self.stdout.write(f"{label:18} {per_query:9.2f} ms/query")
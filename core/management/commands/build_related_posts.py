@@ -0,0 +1,30 @@
+# core/management/commands/build_related_posts.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.recommendations import BLOCK_SIZE, NUMPY_AVAILABLE, TOP_K, rebuild, refresh_stale
+
+
+class Command(BaseCommand):
+    help = 'Recompute TF-IDF related-post recommendations for every published blog post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='Neighbours stored per post')
+        parser.add_argument('--block-size', type=int, default=BLOCK_SIZE, help='Rows per sparse matrix product')
+        parser.add_argument(
+            '--stale', action='store_true',
+            help='Only refresh the lists affected by posts saved or deleted since the last run (for cron)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        engine = 'NumPy/SciPy' if NUMPY_AVAILABLE else 'pure Python (install numpy and scipy for large blogs)'
+        self.stdout.write(f"Similarity engine: {engine}")
+        if options['stale']:
+            stale, posts = refresh_stale(top_k=options['top_k'], block_size=options['block_size'])
+            summary = f"{stale} changed post(s) refreshed {posts} list(s)"
+        else:
+            posts = rebuild(top_k=options['top_k'], block_size=options['block_size'])
+            summary = f"Related posts computed for {posts} posts"
+        self.stdout.write(self.style.SUCCESS(f"✓ {summary} in {time.perf_counter() - started:.1f}s"))
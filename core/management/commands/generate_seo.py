@@ -0,0 +1,48 @@
+# core/management/commands/generate_seo.py
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.seo_generator import BulkSEOGenerator
+
+
+class Command(BaseCommand):
+    help = 'Generate or refresh SEO records in bulk for blog posts, courses and videos'
+
+    default_models = ['content.BlogPost', 'lessons.Course', 'content.Video']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*',
+            help=f"Models to process as app_label.ModelName (default: {' '.join(self.default_models)})",
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Objects per read/upsert batch')
+        parser.add_argument('--page-type', help='Force this page_type instead of deriving it from the model')
+        parser.add_argument('--dry-run', action='store_true', help='Compute changes without writing them')
+        parser.add_argument('--diff', action='store_true', help='Print every created or changed field')
+
+    def handle(self, *args, **options):
+        labels = options['models'] or self.default_models
+        try:
+            models = [apps.get_model(label) for label in labels]
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        generator = BulkSEOGenerator(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            diff=options['diff'],
+            stdout=self.stdout,
+        )
+
+        for model in models:
+            stats = generator.run(model._default_manager.all(), page_type=options['page_type'])
+            self.stdout.write(
+                f"{model._meta.label}: {stats['scanned']} scanned, {stats['created']} created, "
+                f"{stats['updated']} updated, {stats['unchanged']} unchanged "
+                f"in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)"
+            )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: no SEO records were written.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ SEO generation complete'))
@@ -0,0 +1,33 @@
+# core/management/commands/page_cache_stats.py
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from core import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Show page cache hits and misses per view, or purge cached pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+        parser.add_argument('--purge', nargs='*', metavar='TAG',
+                            help='Purge pages depending on these tags (all pages if none are given)')
+
+    def handle(self, *args, **options):
+        if options['purge'] is not None:
+            tags = options['purge'] or [page_cache.ALL_PAGES]
+            page_cache.purge(*tags)
+            self.stdout.write(self.style.SUCCESS(f"✓ Purged pages tagged {', '.join(tags)}"))
+            return
+
+        get_resolver().url_patterns  # import every view so decorated ones register
+        for view, counts in sorted(page_cache.stats().items()):
+            served = counts['hit'] + counts['miss']
+            ratio = f"{counts['hit'] / served:.0%}" if served else '-'
+            self.stdout.write(
+                f"{view:<50} hits {counts['hit']:>8}  misses {counts['miss']:>8}  "
+                f"bypassed {counts['bypass']:>8}  hit rate {ratio:>5}"
+            )
+        if options['reset']:
+            page_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('✓ Counters reset'))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+
+def remove_duplicate_object_seo(apps, schema_editor):
+    """Keep the most recently updated SEO row for each linked object"""
+    SEO = apps.get_model('core', 'SEO')
+    seen = set()
+    duplicates = []
+    rows = (
+        SEO.objects.filter(content_type__isnull=False, object_id__isnull=False)
+        .order_by('content_type_id', 'object_id', '-updated_at', '-id')
+        .values_list('id', 'content_type_id', 'object_id')
+    )
+    for pk, content_type_id, object_id in rows.iterator():
+        key = (content_type_id, object_id)
+        if key in seen:
+            duplicates.append(pk)
+        else:
+            seen.add(key)
+    if duplicates:
+        SEO.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0004_alter_seo_options_alter_seo_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_object_seo, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='seo',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_seo_per_object'),
+        ),
+    ]
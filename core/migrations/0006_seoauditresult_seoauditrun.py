@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_seo_unique_seo_per_object'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SEOAuditRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('incremental', models.BooleanField(default=False)),
+                ('scanned', models.PositiveIntegerField(default=0)),
+                ('flagged', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'SEO Audit Run',
+                'verbose_name_plural': 'SEO Audit Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SEOAuditResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('seo', 'SEO Settings'), ('blog', 'Blog Post')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('label', models.CharField(max_length=200)),
+                ('title_hash', models.CharField(blank=True, max_length=40)),
+                ('description_hash', models.CharField(blank=True, max_length=40)),
+                ('issues', models.JSONField(blank=True, default=list)),
+                ('duplicate_title', models.BooleanField(default=False)),
+                ('duplicate_description', models.BooleanField(default=False)),
+                ('source_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('audited_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'SEO Audit Result',
+                'verbose_name_plural': 'SEO Audit Results',
+                'ordering': ['source', 'object_id'],
+                'indexes': [models.Index(fields=['source', 'title_hash'], name='core_seoaud_source_9aa37c_idx'), models.Index(fields=['source', 'description_hash'], name='core_seoaud_source_8bf374_idx'), models.Index(fields=['source', 'audited_at'], name='core_seoaud_source_2e2dfb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'object_id'), name='unique_seo_audit_record')],
+            },
+        ),
+    ]
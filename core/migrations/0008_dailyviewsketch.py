@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('registers', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Daily View Sketch',
+                'verbose_name_plural': 'Daily View Sketches',
+                'ordering': ['-day', 'post_id'],
+                'constraints': [models.UniqueConstraint(fields=('post_id', 'day'), name='unique_daily_view_sketch')],
+            },
+        ),
+    ]
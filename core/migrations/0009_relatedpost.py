@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_dailyviewsketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField()),
+                ('related_id', models.PositiveIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'Related Post',
+                'verbose_name_plural': 'Related Posts',
+                'ordering': ['post_id', 'rank'],
+                'indexes': [models.Index(fields=['post_id', 'rank'], name='core_relate_post_id_e6a43f_idx'), models.Index(fields=['related_id'], name='core_relate_related_dac3af_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post_id', 'related_id'), name='unique_related_post')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:11
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def parse(tags):
+    # Frozen copy of core.tags.parse
+    parsed = {}
+    for raw in (tags or '').split(','):
+        name = ' '.join(raw.split())[:100]
+        slug = slugify(name, allow_unicode=True)[:100]
+        if slug and slug not in parsed:
+            parsed[slug] = name
+    return parsed
+
+
+def backfill(apps, schema_editor):
+    BlogPost = apps.get_model('content', 'BlogPost')
+    Tag = apps.get_model('core', 'Tag')
+    PostTag = apps.get_model('core', 'PostTag')
+    names, links = {}, []
+    for pk, tags in BlogPost.objects.filter(status='published').exclude(tags='').values_list('pk', 'tags').iterator(chunk_size=1000):
+        for slug, name in parse(tags).items():
+            names.setdefault(slug, name)
+            links.append((pk, slug))
+    counts = Counter(slug for _, slug in links)
+    Tag.objects.bulk_create([Tag(slug=slug, name=name, post_count=counts[slug]) for slug, name in names.items()], batch_size=1000)
+    by_slug = dict(Tag.objects.values_list('slug', 'pk'))
+    PostTag.objects.bulk_create([PostTag(tag_id=by_slug[slug], post_id=pk) for pk, slug in links], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_video_price_videopurchase'),
+        ('core', '0009_relatedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(allow_unicode=True, max_length=100, unique=True)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Tag',
+                'verbose_name_plural': 'Tags',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['-post_count', 'name'], name='tag_cloud_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField()),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='core.tag')),
+            ],
+            options={
+                'verbose_name': 'Post Tag',
+                'verbose_name_plural': 'Post Tags',
+                'indexes': [models.Index(fields=['post_id'], name='core_postta_post_id_a85cba_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tag', 'post_id'), name='unique_post_tag')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
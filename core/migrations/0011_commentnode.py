@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEGMENT = 8
+MAX_DEPTH = 255 // SEGMENT - 1
+
+
+def backfill(apps, schema_editor):
+    # Frozen copy of core.comments.rebuild
+    BlogComment = apps.get_model('content', 'BlogComment')
+    CommentNode = apps.get_model('core', 'CommentNode')
+    rows = {pk: (parent_id, post_id, approved) for pk, parent_id, post_id, approved in
+            BlogComment.objects.values_list('pk', 'parent_id', 'post_id', 'approved').iterator(chunk_size=2000)}
+    placed = {}
+    for pk in rows:
+        chain, current = [], pk
+        while current is not None and current not in placed:
+            chain.append(current)
+            current = rows[current][0]
+        parent = placed.get(current)
+        for current in reversed(chain):
+            if parent is None:
+                parent = placed[current] = (format(current, f'0{SEGMENT}x'), 0)
+            elif parent[1] >= MAX_DEPTH:
+                parent = placed[current] = (parent[0][:-SEGMENT] + format(current, f'0{SEGMENT}x'), parent[1])
+            else:
+                parent = placed[current] = (parent[0] + format(current, f'0{SEGMENT}x'), parent[1] + 1)
+    CommentNode.objects.bulk_create(
+        [
+            CommentNode(comment_id=pk, post_id=post_id, path=placed[pk][0], depth=placed[pk][1], approved=approved)
+            for pk, (_, post_id, approved) in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_video_price_videopurchase'),
+        ('core', '0010_tag_posttag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentNode',
+            fields=[
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tree_node', serialize=False, to='content.blogcomment')),
+                ('post_id', models.PositiveIntegerField()),
+                ('path', models.CharField(max_length=255)),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('approved', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Comment Node',
+                'verbose_name_plural': 'Comment Nodes',
+                'indexes': [models.Index(fields=['post_id', 'approved', 'path'], name='comment_thread_idx'), models.Index(fields=['approved', 'comment'], name='comment_moderation_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:17
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill(apps, schema_editor):
+    Rating = apps.get_model('core', 'Rating')
+    RatingSummary = apps.get_model('core', 'RatingSummary')
+    SEO = apps.get_model('core', 'SEO')
+    per_score = dict(Rating.objects.values_list('score').annotate(n=Count('id')).order_by())
+    totals = Rating.objects.aggregate(count=Count('id'), total=Sum('score'))
+    RatingSummary.objects.create(
+        pk=1, count=totals['count'], total=totals['total'] or 0,
+        **{f'stars_{stars}': per_score.get(stars, 0) for stars in range(1, 6)},
+    )
+    # 4.8 from 127 reviews was a placeholder default, not real data
+    SEO.objects.filter(rating_value=4.8, review_count=127).update(rating_value=None, review_count=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_commentnode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Rating Summary',
+                'verbose_name_plural': 'Rating Summary',
+            },
+        ),
+        migrations.AlterField(
+            model_name='seo',
+            name='rating_value',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Leave blank to use the live rating summary', max_digits=3, null=True),
+        ),
+        migrations.AlterField(
+            model_name='seo',
+            name='review_count',
+            field=models.IntegerField(blank=True, help_text='Leave blank to use the live rating summary', null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_ratingsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleRelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField(unique=True)),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Stale Related Post',
+                'verbose_name_plural': 'Stale Related Posts',
+            },
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.conf import settings
 from django.db.models import Q # Import Q for complex queries
+from django.urls import reverse
 
 # Using settings.AUTH_USER_MODEL is the best practice for ForeignKey to User
 User = settings.AUTH_USER_MODEL 
@@ -173,8 +174,10 @@ class SEO(models.Model):
     instagram_url = models.URLField(default='https://instagram.com/langtouch', blank=True)
     
     # Ratings & Pricing
-    rating_value = models.DecimalField(max_digits=3, decimal_places=1, default=4.8)
-    review_count = models.IntegerField(default=127)
+    rating_value = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True,
+                                       help_text="Leave blank to use the live rating summary")
+    review_count = models.IntegerField(null=True, blank=True,
+                                       help_text="Leave blank to use the live rating summary")
     low_price = models.DecimalField(max_digits=10, decimal_places=2, default=50000, null=True, blank=True)
     high_price = models.DecimalField(max_digits=10, decimal_places=2, default=500000, null=True, blank=True)
     price_range = models.CharField(max_length=100, default='TZS 50,000 - 500,000', blank=True)
@@ -204,11 +207,17 @@ class SEO(models.Model):
             models.Index(fields=['page_type']),
             models.Index(fields=['is_active']),
         ]
+        constraints = [
+            # One SEO row per linked object; page-level rows (NULL object) are unaffected.
+            # Also the conflict target for bulk upserts in SEOGenerator.
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='unique_seo_per_object'),
+        ]
     
     def __str__(self):
         return f"SEO: {self.meta_title}"
     
-    def save(self, *args, **kwargs):
+    def fill_social_defaults(self):
+        """Copy meta title/description into empty Open Graph and Twitter fields"""
         # Auto-generate og_title and twitter_title if empty
         if not self.og_title and self.meta_title:
             self.og_title = self.meta_title
@@ -220,7 +229,9 @@ class SEO(models.Model):
             self.og_description = self.meta_description
         if not self.twitter_description and self.meta_description:
             self.twitter_description = self.meta_description
-            
+    
+    def save(self, *args, **kwargs):
+        self.fill_social_defaults()
         super().save(*args, **kwargs)
     
 # core/models.py
@@ -269,4 +280,254 @@ class Rating(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.user.username} - {self.score}★"
\ No newline at end of file
+        return f"{self.user.username} - {self.score}★"
+
+
+class RatingSummary(models.Model):
+    """Running count, sum and histogram of all Ratings; a single row kept current by core.ratings"""
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Rating Summary'
+        verbose_name_plural = 'Rating Summary'
+
+    def __str__(self):
+        return f"{self.average:.1f}★ from {self.count} ratings"
+
+    @property
+    def average(self):
+        return round(self.total / self.count, 1) if self.count else 0
+
+    @property
+    def histogram(self):
+        """[(stars, count, percent)] from 5 stars down to 1"""
+        rows = []
+        for stars in range(5, 0, -1):
+            n = getattr(self, f'stars_{stars}')
+            rows.append((stars, n, round(100 * n / self.count) if self.count else 0))
+        return rows
+
+
+class SEOAuditRun(models.Model):
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    incremental = models.BooleanField(default=False)
+    scanned = models.PositiveIntegerField(default=0)
+    flagged = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = 'SEO Audit Run'
+        verbose_name_plural = 'SEO Audit Runs'
+
+    def __str__(self):
+        kind = 'Incremental' if self.incremental else 'Full'
+        return f"{kind} audit at {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class SEOAuditResult(models.Model):
+    """Latest audit findings for one SEO record or blog post"""
+    SOURCE_CHOICES = (
+        ('seo', 'SEO Settings'),
+        ('blog', 'Blog Post'),
+    )
+
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    label = models.CharField(max_length=200)
+
+    # Normalized-text digests used to find duplicates with an indexed GROUP BY
+    title_hash = models.CharField(max_length=40, blank=True)
+    description_hash = models.CharField(max_length=40, blank=True)
+
+    issues = models.JSONField(default=list, blank=True)
+    duplicate_title = models.BooleanField(default=False)
+    duplicate_description = models.BooleanField(default=False)
+
+    source_updated_at = models.DateTimeField(null=True, blank=True)
+    audited_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['source', 'object_id']
+        verbose_name = 'SEO Audit Result'
+        verbose_name_plural = 'SEO Audit Results'
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'object_id'], name='unique_seo_audit_record'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'title_hash']),
+            models.Index(fields=['source', 'description_hash']),
+            models.Index(fields=['source', 'audited_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()} #{self.object_id}: {self.label}"
+
+    @property
+    def all_issues(self):
+        issues = list(self.issues)
+        if self.duplicate_title:
+            issues.append('duplicate_title')
+        if self.duplicate_description:
+            issues.append('duplicate_description')
+        return issues
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable item (blog post, course, video, service), kept in sync by core.signals.
+    On SQLite the title/body are mirrored into the core_searchdocument_fts FTS5 table by triggers.
+    """
+    KIND_CHOICES = (
+        ('post', 'Blog Post'),
+        ('course', 'Course'),
+        ('video', 'Video'),
+        ('service', 'Service'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    language = models.CharField(max_length=50, blank=True)
+    category = models.CharField(max_length=50, blank=True)
+    url = models.CharField(max_length=500, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+        indexes = [
+            models.Index(fields=['language', 'category']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+class DailyViewSketch(models.Model):
+    """Views of one blog post on one day, with a HyperLogLog sketch of its distinct visitors"""
+    post_id = models.PositiveIntegerField()
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    registers = models.BinaryField()
+
+    class Meta:
+        ordering = ['-day', 'post_id']
+        verbose_name = 'Daily View Sketch'
+        verbose_name_plural = 'Daily View Sketches'
+        constraints = [
+            models.UniqueConstraint(fields=['post_id', 'day'], name='unique_daily_view_sketch'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} on {self.day}: {self.views} views"
+
+
+class RelatedPost(models.Model):
+    """Precomputed text-similarity neighbour of a published blog post (see core.recommendations)"""
+    post_id = models.PositiveIntegerField()
+    related_id = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['post_id', 'rank']
+        verbose_name = 'Related Post'
+        verbose_name_plural = 'Related Posts'
+        constraints = [
+            models.UniqueConstraint(fields=['post_id', 'related_id'], name='unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post_id', 'rank']),
+            models.Index(fields=['related_id']),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} → {self.related_id} ({self.score:.2f})"
+
+
+class StaleRelatedPost(models.Model):
+    """Blog post changed since its related-post lists were computed; build_related_posts --stale clears it"""
+    post_id = models.PositiveIntegerField(unique=True)
+    marked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Stale Related Post'
+        verbose_name_plural = 'Stale Related Posts'
+
+    def __str__(self):
+        return f"Post {self.post_id} (changed {self.marked_at:%Y-%m-%d %H:%M})"
+
+
+class Tag(models.Model):
+    """Normalised blog post tag (see core.tags); post_count counts published posts"""
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True, allow_unicode=True)
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Tag'
+        verbose_name_plural = 'Tags'
+        indexes = [
+            models.Index(fields=['-post_count', 'name'], name='tag_cloud_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('core:tag_detail', args=[self.slug])
+
+
+class PostTag(models.Model):
+    """One tag on one published blog post, mirrored from BlogPost.tags"""
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_tags')
+    post_id = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = 'Post Tag'
+        verbose_name_plural = 'Post Tags'
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'post_id'], name='unique_post_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['post_id']),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id}: {self.tag}"
+
+
+class CommentNode(models.Model):
+    """
+    Materialised path of one blog comment (see core.comments).
+    Ordering a post's nodes by path gives its threads depth-first, oldest first.
+    """
+    comment = models.OneToOneField('content.BlogComment', on_delete=models.CASCADE, primary_key=True, related_name='tree_node')
+    post_id = models.PositiveIntegerField()
+    path = models.CharField(max_length=255)
+    depth = models.PositiveSmallIntegerField(default=0)
+    approved = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = 'Comment Node'
+        verbose_name_plural = 'Comment Nodes'
+        indexes = [
+            models.Index(fields=['post_id', 'approved', 'path'], name='comment_thread_idx'),
+            models.Index(fields=['approved', 'comment'], name='comment_moderation_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment {self.comment_id} at {self.path}"
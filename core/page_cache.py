@@ -0,0 +1,158 @@
+# core/page_cache.py
+"""
+Whole-response cache for anonymous GETs of public pages.
+
+@cache_anonymous_page('ratings') stores a view's rendered response keyed by
+view, language, host, path and sorted query string. Each entry records the
+version of every dependency tag it was built from; purge('ratings') bumps
+that tag's version (through core.utils.cache_versions), so every entry
+depending on it is stale on the next lookup without knowing its key.
+Views can add tags once they know them, e.g. add_tags(request, f'blog:{post.pk}').
+Every entry also depends on ALL_PAGES.
+
+Entries live in the cache alias named by settings.PAGE_CACHE_ALIAS
+('default' if unset): LocMemCache, FileBasedCache and RedisCache all work.
+Hits and misses are counted per view in the same cache; see page_cache_stats.
+
+Logged-in users, pending flash messages, non-GET requests and responses
+that set cookies (including a CSRF token) are never cached.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.http import urlencode
+
+from core.utils.cache_versions import bump_on_commit, bump_version, get_version
+
+DEFAULT_TIMEOUT = 300
+ALL_PAGES = 'all'
+STATUS_HEADER = 'X-Page-Cache'
+OUTCOMES = ('hit', 'miss', 'bypass')
+
+# Names of decorated views, for stats()
+VIEWS = set()
+
+
+def _backend():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def _version_name(tag):
+    return f"page:{tag}"
+
+
+def add_tags(request, *tags):
+    """Make the page being rendered for `request` depend on more tags"""
+    pending = getattr(request, '_page_cache_tags', None)
+    if pending is not None:
+        pending.update(tags)
+
+
+def purge(*tags):
+    for tag in tags:
+        bump_version(_version_name(tag))
+
+
+def purge_on_commit(*tags):
+    for tag in tags:
+        bump_on_commit(_version_name(tag))
+
+
+def _versions(tags):
+    return {tag: get_version(_version_name(tag)) for tag in tags}
+
+
+def _key(view_name, request):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    raw = f"{translation.get_language()}|{request.build_absolute_uri(request.path)}?{query}"
+    return f"page-cache:{view_name}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def _count(view_name, outcome):
+    backend, key = _backend(), f"page-cache:stats:{view_name}:{outcome}"
+    try:
+        backend.incr(key)
+    except ValueError:
+        if not backend.add(key, 1, None):
+            backend.incr(key)
+
+
+def stats():
+    """{view name: {'hit': n, 'miss': n, 'bypass': n}} for every decorated view"""
+    keys = {f"page-cache:stats:{view}:{outcome}": (view, outcome) for view in VIEWS for outcome in OUTCOMES}
+    found = _backend().get_many(keys)
+    result = {view: dict.fromkeys(OUTCOMES, 0) for view in VIEWS}
+    for key, n in found.items():
+        view, outcome = keys[key]
+        result[view][outcome] = n
+    return result
+
+
+def reset_stats():
+    _backend().delete_many([f"page-cache:stats:{view}:{outcome}" for view in VIEWS for outcome in OUTCOMES])
+
+
+def _cacheable_request(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and not len(get_messages(request))
+    )
+
+
+def _cacheable_response(request, response):
+    cache_control = response.get('Cache-Control', '')
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        and 'private' not in cache_control
+        and 'no-store' not in cache_control
+    )
+
+
+def cache_anonymous_page(*tags, timeout=None):
+    """View decorator: serve anonymous GETs from the page cache, invalidated by `tags`"""
+    def decorator(view_func):
+        view_name = f"{view_func.__module__}.{view_func.__name__}"
+        VIEWS.add(view_name)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                _count(view_name, 'bypass')
+                return view_func(request, *args, **kwargs)
+
+            backend, key = _backend(), _key(view_name, request)
+            entry = backend.get(key)
+            if entry is not None and _versions(entry['versions']) == entry['versions']:
+                _count(view_name, 'hit')
+                response = HttpResponse(entry['content'], status=entry['status'], headers=entry['headers'])
+                response[STATUS_HEADER] = 'hit'
+                return response
+
+            # Versions are read before rendering, so a purge during rendering leaves this entry stale
+            request._page_cache_tags = {ALL_PAGES, *tags}
+            versions = _versions(request._page_cache_tags)
+            response = view_func(request, *args, **kwargs)
+            _count(view_name, 'miss')
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            if _cacheable_response(request, response):
+                versions.update(_versions(request._page_cache_tags - versions.keys()))
+                backend.set(key, {
+                    'versions': versions,
+                    'content': response.content,
+                    'status': response.status_code,
+                    'headers': {k: v for k, v in response.headers.items() if k != STATUS_HEADER},
+                }, timeout if timeout is not None else getattr(settings, 'PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+                response[STATUS_HEADER] = 'miss'
+            return response
+        return wrapper
+    return decorator
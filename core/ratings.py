@@ -0,0 +1,56 @@
+# core/ratings.py
+"""
+Site rating summary.
+
+RatingSummary is one row holding the number of ratings, their sum and a
+1–5 histogram. core.signals adjusts it with a single `F()` UPDATE whenever a
+Rating is created, re-scored or deleted, so concurrent ratings never lose
+an increment and readers (the about page, JSON-LD, SEO aggregate rating)
+get the average and histogram from one primary-key lookup instead of
+aggregating the ratings table.
+"""
+from django.db.models import Count, F, Sum
+
+from .models import Rating, RatingSummary
+
+SUMMARY_PK = 1
+
+
+def get_summary():
+    try:
+        return RatingSummary.objects.get(pk=SUMMARY_PK)
+    except RatingSummary.DoesNotExist:
+        # An empty row would make every later apply() count from zero
+        rebuild()
+        return RatingSummary.objects.get(pk=SUMMARY_PK)
+
+
+def apply(score, delta):
+    """Add (delta=1) or remove (delta=-1) one rating of `score` stars"""
+    updated = RatingSummary.objects.filter(pk=SUMMARY_PK).update(
+        count=F('count') + delta,
+        total=F('total') + delta * score,
+        **{f'stars_{score}': F(f'stars_{score}') + delta},
+    )
+    if not updated:
+        # First rating ever, or the row was deleted: count from scratch, which includes this one
+        rebuild()
+
+
+def rebuild():
+    """Recount the summary from the Rating table"""
+    per_score = dict(Rating.objects.values_list('score').annotate(n=Count('id')).order_by())
+    totals = Rating.objects.aggregate(count=Count('id'), total=Sum('score'))
+    RatingSummary.objects.update_or_create(pk=SUMMARY_PK, defaults={
+        'count': totals['count'],
+        'total': totals['total'] or 0,
+        **{f'stars_{stars}': per_score.get(stars, 0) for stars in range(1, 6)},
+    })
+
+
+def aggregate_rating(seo=None):
+    """{'value', 'count'} for structured data: the SEO row's overrides if set, else the summary"""
+    if seo is not None and seo.rating_value is not None and seo.review_count is not None:
+        return {'value': seo.rating_value, 'count': seo.review_count}
+    summary = get_summary()
+    return {'value': summary.average, 'count': summary.count}
@@ -0,0 +1,230 @@
+# core/recommendations.py
+"""
+Related-post recommendations from TF-IDF cosine similarity.
+
+Published posts are tokenised (title counted twice), weighted with
+sublinear TF and smoothed IDF, and L2-normalised, so a dot product is the
+cosine similarity. Each post's top-K neighbours go into RelatedPost, and
+detail pages read them back with related_posts() in one indexed query.
+
+With NumPy and SciPy installed, neighbours come from blocked sparse matrix
+products (BLOCK_SIZE rows of X @ X.T at a time). Without them, a pure-Python
+inverted index gives the same result, which is fine for a few thousand posts.
+
+Saving or deleting a post only marks it stale (StaleRelatedPost); nothing
+is computed during the request. `build_related_posts --stale`, run from
+cron, loads the corpus once and recomputes only the lists the stale posts
+can change: their own, lists that named them, and lists they now outrank.
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import RelatedPost, StaleRelatedPost
+
+try:
+    import numpy as np
+    from scipy import sparse
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+TOP_K = 6
+BLOCK_SIZE = 512
+MIN_SCORE = 0.01
+TITLE_WEIGHT = 2
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}")
+STOPWORDS = frozenset(
+    "a about after all also an and any are as at be because been but by can could did do does for from had has "
+    "have he her his how if in into is it its just more most my no not of on one or our out so some than that the "
+    "their them then there these they this to up was we were what when which who will with would you your".split()
+)
+
+
+def tokens(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _blog_posts():
+    return apps.get_model('content', 'BlogPost')._default_manager
+
+
+def load_corpus():
+    """(post ids, term Counters) for every published post"""
+    ids, documents = [], []
+    rows = _blog_posts().filter(status='published').order_by('pk').values_list('pk', 'title', 'excerpt', 'content', 'tags')
+    for pk, title, excerpt, content, tags in rows.iterator(chunk_size=500):
+        counts = Counter(tokens(' '.join((excerpt or '', strip_tags(content or ''), (tags or '').replace(',', ' ')))))
+        for term in tokens(title):
+            counts[term] += TITLE_WEIGHT
+        ids.append(pk)
+        documents.append(counts)
+    return ids, documents
+
+
+class TfidfModel:
+    def __init__(self, documents):
+        df = Counter(term for counts in documents for term in counts)
+        n = len(documents)
+        self.vocabulary = {term: i for i, term in enumerate(sorted(df))}
+        idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self.vectors = []
+        for counts in documents:
+            vector = {self.vocabulary[t]: (1 + math.log(c)) * idf[t] for t, c in counts.items()}
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            self.vectors.append({i: w / norm for i, w in vector.items()})
+        self._postings = None
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def postings(self):
+        if self._postings is None:
+            self._postings = defaultdict(list)
+            for row, vector in enumerate(self.vectors):
+                for i, w in vector.items():
+                    self._postings[i].append((row, w))
+        return self._postings
+
+    def scores(self, row):
+        """{other row: cosine similarity} for every row sharing a term with `row`"""
+        postings = self.postings()
+        acc = defaultdict(float)
+        for i, w in self.vectors[row].items():
+            for other, w2 in postings[i]:
+                acc[other] += w * w2
+        acc.pop(row, None)
+        return acc
+
+    def neighbours(self, rows, top_k=TOP_K, block_size=BLOCK_SIZE):
+        """{row: [(other row, score), ...]} best first"""
+        if NUMPY_AVAILABLE and rows:
+            return self._numpy_neighbours(rows, top_k, block_size)
+        result = {}
+        for row in rows:
+            best = heapq.nlargest(top_k, self.scores(row).items(), key=lambda item: (item[1], -item[0]))
+            result[row] = [(other, score) for other, score in best if score >= MIN_SCORE]
+        return result
+
+    def matrix(self):
+        indptr, indices, data = [0], [], []
+        for vector in self.vectors:
+            indices.extend(vector)
+            data.extend(vector.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(self.vectors), len(self.vocabulary)))
+
+    def _numpy_neighbours(self, rows, top_k, block_size):
+        X = self.matrix()
+        XT = X.T.tocsr()
+        result = {}
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            # Stays sparse: only posts sharing a term with a row are ever stored or ranked
+            S = (X[block] @ XT).tocsr()
+            for r, row in enumerate(block):
+                cols = S.indices[S.indptr[r]:S.indptr[r + 1]]
+                scores = S.data[S.indptr[r]:S.indptr[r + 1]]
+                keep = (cols != row) & (scores >= MIN_SCORE)  # never recommend a post to itself
+                cols, scores = cols[keep], scores[keep]
+                if len(cols) > top_k:
+                    top = np.argpartition(-scores, top_k - 1)[:top_k]
+                    cols, scores = cols[top], scores[top]
+                result[row] = sorted(zip(cols.tolist(), scores.tolist()), key=lambda item: (-item[1], item[0]))
+        return result
+
+
+def _store(ids, neighbours):
+    """Replace the RelatedPost rows of the given rows' posts"""
+    post_ids = [ids[row] for row in neighbours]
+    RelatedPost.objects.filter(post_id__in=post_ids).delete()
+    RelatedPost.objects.bulk_create(
+        [
+            RelatedPost(post_id=ids[row], related_id=ids[other], rank=rank, score=score)
+            for row, pairs in neighbours.items()
+            for rank, (other, score) in enumerate(pairs, 1)
+        ],
+        batch_size=1000,
+    )
+
+
+def rebuild(top_k=TOP_K, block_size=BLOCK_SIZE):
+    """Recompute every published post's neighbours; returns the number of posts"""
+    started = timezone.now()
+    ids, documents = load_corpus()
+    model = TfidfModel(documents)
+    neighbours = model.neighbours(list(range(len(ids))), top_k, block_size)
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        _store(ids, neighbours)
+        StaleRelatedPost.objects.filter(marked_at__lte=started).delete()
+    return len(ids)
+
+
+def update_posts(post_ids, top_k=TOP_K, block_size=BLOCK_SIZE):
+    """Refresh the lists that changes to these posts can affect; returns the posts recomputed"""
+    post_ids = set(post_ids)
+    ids, documents = load_corpus()
+    row_of = {pk: row for row, pk in enumerate(ids)}
+    # Posts that listed a changed one must drop or re-rank it
+    affected = set(RelatedPost.objects.filter(related_id__in=post_ids).values_list('post_id', flat=True))
+
+    model = TfidfModel(documents)
+    # Each list's length and weakest score: a changed post gets in if it beats the weakest
+    thresholds = {
+        pk: (count, low)
+        for pk, count, low in RelatedPost.objects.values('post_id').annotate(n=Count('id'), low=Min('score'))
+        .values_list('post_id', 'n', 'low')
+    }
+    for post_id in post_ids:
+        row = row_of.get(post_id)
+        if row is None:
+            continue
+        affected.add(post_id)
+        for other, score in model.scores(row).items():
+            count, low = thresholds.get(ids[other], (0, 0.0))
+            if score >= MIN_SCORE and (count < top_k or score > low):
+                affected.add(ids[other])
+
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=post_ids).delete()
+        rows = sorted(row_of[pk] for pk in affected if pk in row_of)
+        _store(ids, model.neighbours(rows, top_k, block_size))
+    return len(affected)
+
+
+def mark_stale(post_id):
+    """Queue a saved or deleted post for the next `build_related_posts --stale`"""
+    StaleRelatedPost.objects.bulk_create(
+        [StaleRelatedPost(post_id=post_id, marked_at=timezone.now())],
+        update_conflicts=True, unique_fields=['post_id'], update_fields=['marked_at'],
+    )
+
+
+def refresh_stale(top_k=TOP_K, block_size=BLOCK_SIZE):
+    """(stale posts, posts recomputed); posts marked again while this runs stay queued"""
+    started = timezone.now()
+    post_ids = list(StaleRelatedPost.objects.values_list('post_id', flat=True))
+    if not post_ids:
+        return 0, 0
+    recomputed = update_posts(post_ids, top_k, block_size)
+    StaleRelatedPost.objects.filter(marked_at__lte=started).delete()
+    return len(post_ids), recomputed
+
+
+def related_posts(post_id, limit=TOP_K):
+    """The post's precomputed neighbours as BlogPost objects, best first, in one query"""
+    ranks = RelatedPost.objects.filter(post_id=post_id, related_id=OuterRef('pk')).values('rank')[:1]
+    return (
+        _blog_posts()
+        .filter(pk__in=RelatedPost.objects.filter(post_id=post_id, rank__lte=limit).values('related_id'), status='published')
+        .annotate(similarity_rank=Subquery(ranks))
+        .order_by('similarity_rank')
+    )
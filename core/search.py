@@ -0,0 +1,247 @@
+# core/search.py
+"""
+Site-wide search over blog posts, courses, videos and services.
+
+Each searchable object is flattened into one SearchDocument row by its
+indexer below; core.signals keeps the rows current on save/delete and
+`rebuild_search_index` recreates them. Queries use the backend's own
+full-text engine:
+
+- SQLite: the core_searchdocument_fts FTS5 table (maintained by triggers
+  from migration 0007), ranked with bm25() and highlighted with
+  highlight()/snippet().
+- PostgreSQL: a GIN index on a weighted tsvector, ranked with ts_rank_cd()
+  and highlighted with ts_headline().
+- Anything else falls back to icontains and is unranked.
+
+Every term is matched as a prefix, and all terms must match.
+"""
+import re
+from collections import Counter, namedtuple
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+from .models import SearchDocument
+
+MAX_TERMS = 8
+PAGE_SIZE = 20
+FACETS = ('kind', 'language', 'category')
+
+# Private-use markers survive escaping, then become <mark> tags
+MARK_START, MARK_END = '\ue000', '\ue001'
+
+FTS_TABLE = 'core_searchdocument_fts'
+PG_VECTOR = (
+    "(setweight(to_tsvector('simple', coalesce(d.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(d.body, '')), 'B'))"
+)
+
+SearchResults = namedtuple('SearchResults', 'hits total facets')
+
+
+def _url(name, *args):
+    try:
+        return reverse(name, args=args)
+    except NoReverseMatch:
+        return ''
+
+
+def _post(post):
+    if post.status != 'published':
+        return None
+    content = strip_tags(post.content)
+    # BlogPost.save() fills a blank excerpt from the content; don't index that twice
+    excerpt = '' if post.content.startswith(post.excerpt.rstrip('.')) else post.excerpt
+    return {
+        'title': post.title,
+        'body': ' '.join(filter(None, (excerpt, content, post.tags))),
+        'language': post.get_language_display(),
+        'category': post.get_category_display(),
+        'url': post.get_absolute_url(),
+    }
+
+
+def _course(course):
+    return {'title': course.title, 'body': course.description, 'url': _url('lessons:course_detail', course.pk)}
+
+
+def _video(video):
+    return {
+        'title': video.title,
+        'body': video.description,
+        'language': video.get_language_display(),
+        'category': video.get_section_display(),
+        'url': _url('content:video_learning'),
+    }
+
+
+def _service(service):
+    if not service.is_active:
+        return None
+    return {'title': service.name, 'body': service.description, 'url': _url('core:services')}
+
+
+# kind -> (model label, indexer returning document fields or None to leave it out)
+INDEXERS = {
+    'post': ('content.BlogPost', _post),
+    'course': ('lessons.Course', _course),
+    'video': ('content.Video', _video),
+    'service': ('services.Service', _service),
+}
+KIND_BY_LABEL = {label: kind for kind, (label, _) in INDEXERS.items()}
+
+
+def _document_fields(kind, instance):
+    fields = INDEXERS[kind][1](instance)
+    if fields is None:
+        return None
+    return {'title': '', 'body': '', 'language': '', 'category': '', 'url': '', **fields}
+
+
+def index_instance(instance):
+    """Create, refresh or drop the document for one object"""
+    kind = KIND_BY_LABEL[instance._meta.label]
+    fields = _document_fields(kind, instance)
+    if fields is None:
+        remove_instance(instance)
+    else:
+        SearchDocument.objects.update_or_create(kind=kind, object_id=instance.pk, defaults=fields)
+
+
+def remove_instance(instance):
+    SearchDocument.objects.filter(kind=KIND_BY_LABEL[instance._meta.label], object_id=instance.pk).delete()
+
+
+def rebuild(kinds=None, batch_size=1000):
+    """Recreate the documents of the given kinds (default: all); returns {kind: documents}"""
+    counts = {}
+    for kind in kinds or INDEXERS:
+        label, _ = INDEXERS[kind]
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            continue
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind).delete()
+            batch, counts[kind] = [], 0
+            for instance in model._default_manager.order_by('pk').iterator(chunk_size=batch_size):
+                fields = _document_fields(kind, instance)
+                if fields is not None:
+                    batch.append(SearchDocument(kind=kind, object_id=instance.pk, **fields))
+                if len(batch) >= batch_size:
+                    counts[kind] += len(SearchDocument.objects.bulk_create(batch))
+                    batch = []
+            counts[kind] += len(SearchDocument.objects.bulk_create(batch))
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return counts
+
+
+def terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def _marked_html(text):
+    return mark_safe(escape(text or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def _filters(kinds, language, category):
+    sql, params = [], []
+    if kinds:
+        sql.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params += list(kinds)
+    if language:
+        sql.append("d.language = %s")
+        params.append(language)
+    if category:
+        sql.append("d.category = %s")
+        params.append(category)
+    return ''.join(f" AND {clause}" for clause in sql), params
+
+
+def _facet_counts(rows):
+    facets = {name: Counter() for name in FACETS}
+    total = 0
+    for kind, language, category, n in rows:
+        total += n
+        for name, value in zip(FACETS, (kind, language, category)):
+            if value:
+                facets[name][value] += n
+    return total, {name: sorted(counter.items(), key=lambda item: (-item[1], item[0])) for name, counter in facets.items()}
+
+
+def search(query, kinds=None, language=None, category=None, limit=PAGE_SIZE, offset=0):
+    """
+    Ranked documents for `query` plus facet counts.
+
+    Each hit is a SearchDocument with `score`, `title_html` and `snippet_html`
+    (escaped, matches wrapped in <mark>).
+    """
+    words = terms(query)
+    if not words:
+        return SearchResults([], 0, {name: [] for name in FACETS})
+    where, params = _filters(kinds, language, category)
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{word}"*' for word in words)
+        source = f"{FTS_TABLE} JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH %s"
+        hits_sql = (
+            f"SELECT d.*, -bm25({FTS_TABLE}, 10.0, 1.0) AS score, "
+            f"highlight({FTS_TABLE}, 0, %s, %s) AS title_highlight, "
+            f"snippet({FTS_TABLE}, 1, %s, %s, '…', 24) AS snippet "
+            f"FROM {source}{where} ORDER BY score DESC LIMIT %s OFFSET %s"
+        )
+        hits_params = [MARK_START, MARK_END, MARK_START, MARK_END, match, *params, limit, offset]
+        facet_sql = f"SELECT d.kind, d.language, d.category, COUNT(*) FROM {source}{where} GROUP BY 1, 2, 3"
+        facet_params = [match, *params]
+    elif connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        headline = f"StartSel={MARK_START}, StopSel={MARK_END}"
+        source = f"core_searchdocument d, to_tsquery('simple', %s) q WHERE {PG_VECTOR} @@ q"
+        hits_sql = (
+            f"SELECT d.*, ts_rank_cd({PG_VECTOR}, q) AS score, "
+            f"ts_headline('simple', d.title, q, %s) AS title_highlight, "
+            f"ts_headline('simple', d.body, q, %s) AS snippet "
+            f"FROM {source}{where} ORDER BY score DESC, d.id LIMIT %s OFFSET %s"
+        )
+        hits_params = [f"{headline}, HighlightAll=true", f"{headline}, MaxWords=35, MinWords=15", tsquery, *params, limit, offset]
+        facet_sql = f"SELECT d.kind, d.language, d.category, COUNT(*) FROM {source}{where} GROUP BY 1, 2, 3"
+        facet_params = [tsquery, *params]
+    else:
+        return _fallback_search(words, kinds, language, category, limit, offset)
+
+    hits = list(SearchDocument.objects.raw(hits_sql, hits_params))
+    for hit in hits:
+        hit.title_html = _marked_html(hit.title_highlight)
+        hit.snippet_html = _marked_html(hit.snippet)
+    with connection.cursor() as cursor:
+        cursor.execute(facet_sql, facet_params)
+        total, facets = _facet_counts(cursor.fetchall())
+    return SearchResults(hits, total, facets)
+
+
+def _fallback_search(words, kinds, language, category, limit, offset):
+    documents = SearchDocument.objects.all()
+    for word in words:
+        documents = documents.filter(Q(title__icontains=word) | Q(body__icontains=word))
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    if language:
+        documents = documents.filter(language=language)
+    if category:
+        documents = documents.filter(category=category)
+    pattern = re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
+
+    hits = list(documents.order_by('-updated_at')[offset:offset + limit])
+    for hit in hits:
+        hit.score = 0
+        hit.title_html = _marked_html(pattern.sub(lambda m: f"{MARK_START}{m.group(0)}{MARK_END}", hit.title))
+        hit.snippet_html = _marked_html(pattern.sub(lambda m: f"{MARK_START}{m.group(0)}{MARK_END}", hit.body[:240]))
+    total, facets = _facet_counts(documents.values_list(*FACETS).annotate(n=Count('id')).order_by())
+    return SearchResults(hits, total, facets)
@@ -0,0 +1,103 @@
+# core/signals.py
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
+
+from . import chrome, comments, page_cache, ratings, recommendations, search, suggest, tags
+
+
+def index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    suggest.update_instance(instance, update_fields)
+    # BlogPost.increment_views() saves on every page view; the search document doesn't change
+    if not (update_fields and set(update_fields) <= suggest.WEIGHT_FIELDS):
+        search.index_instance(instance)
+        if instance._meta.label == 'content.BlogPost':
+            tags.sync_post(instance)
+            recommendations.mark_stale(instance.pk)
+
+
+def unindex_on_delete(sender, instance, **kwargs):
+    search.remove_instance(instance)
+    suggest.remove_instance(instance)
+    if instance._meta.label == 'content.BlogPost':
+        tags.remove_post(instance.pk)
+        recommendations.mark_stale(instance.pk)
+
+
+for label in search.KIND_BY_LABEL:
+    post_save.connect(index_on_save, sender=label, dispatch_uid=f'search-index-{label}')
+    post_delete.connect(unindex_on_delete, sender=label, dispatch_uid=f'search-unindex-{label}')
+
+
+def sync_comment_node(sender, instance, raw=False, **kwargs):
+    if not raw:
+        comments.sync_comment(instance)
+
+
+post_save.connect(sync_comment_node, sender='content.BlogComment', dispatch_uid='comment-tree-node')
+
+
+# model label -> page cache tags a change to one instance makes stale
+PAGE_TAGS = {
+    'core.Rating': lambda rating: ['ratings'],
+    'content.Testimonial': lambda testimonial: ['testimonials'],
+    'content.BlogPost': lambda post: ['blog', f'blog:{post.pk}'],
+    'content.BlogComment': lambda comment: [f'blog:{comment.post_id}'],
+}
+
+
+def purge_pages(sender, instance, raw=False, update_fields=None, **kwargs):
+    # A views-only save happens on every page view; cached pages may show a slightly old count
+    if raw or (update_fields and set(update_fields) <= suggest.WEIGHT_FIELDS):
+        return
+    page_cache.purge_on_commit(*PAGE_TAGS[sender._meta.label](instance))
+
+
+for label in PAGE_TAGS:
+    post_save.connect(purge_pages, sender=label, dispatch_uid=f'page-cache-save-{label}')
+    post_delete.connect(purge_pages, sender=label, dispatch_uid=f'page-cache-delete-{label}')
+
+
+def remember_rating_score(sender, instance, **kwargs):
+    # The score the summary currently counts for this rating (skip deferred loads)
+    instance._counted_score = instance.__dict__.get('score')
+
+
+def count_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        ratings.apply(instance.score, 1)
+    elif instance._counted_score != instance.score:
+        if instance._counted_score is not None:
+            ratings.apply(instance._counted_score, -1)
+        ratings.apply(instance.score, 1)
+    instance._counted_score = instance.score
+
+
+def uncount_rating(sender, instance, **kwargs):
+    ratings.apply(instance._counted_score or instance.score, -1)
+
+
+post_init.connect(remember_rating_score, sender='core.Rating', dispatch_uid='rating-summary-init')
+post_save.connect(count_rating, sender='core.Rating', dispatch_uid='rating-summary-save')
+post_delete.connect(uncount_rating, sender='core.Rating', dispatch_uid='rating-summary-delete')
+
+
+# model label -> ids of the users whose layout chrome a change to one instance affects
+CHROME_USERS = {
+    'core.Message': lambda message: (message.conversation.participant1_id, message.conversation.participant2_id),
+    'core.Notification': lambda notification: (notification.user_id,),
+    settings.AUTH_USER_MODEL: lambda user: (user.pk,),
+}
+
+
+def refresh_chrome(sender, instance, raw=False, **kwargs):
+    if not raw:
+        chrome.bump_users(*CHROME_USERS[sender._meta.label](instance))
+
+
+for label in CHROME_USERS:
+    post_save.connect(refresh_chrome, sender=label, dispatch_uid=f'chrome-save-{label}')
+    post_delete.connect(refresh_chrome, sender=label, dispatch_uid=f'chrome-delete-{label}')
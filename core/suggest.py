@@ -0,0 +1,238 @@
+# core/suggest.py
+"""
+Process-local typeahead over post titles and tags, course and video titles
+and service names.
+
+Each language has a sorted array of keys (every title is keyed from each of
+its word starts, so "gre" finds "Swahili greetings") searched with bisect,
+and completions are ranked by the owner's view count. Short prefixes match
+large ranges, so their top-K lists are memoised until the index changes.
+
+The index is built on first use in each process. Saves and deletes patch
+this process's copy after commit and bump a shared version, which makes
+other processes rebuild on their next lookup. View-count updates only
+re-weight the local copy.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+
+from core.utils.cache_versions import bump_version, get_version
+
+from .search import INDEXERS, KIND_BY_LABEL, _url
+from .tags import parse as parse_tags
+
+VERSION_NAME = 'core:suggest'
+TOP_K = 8
+MEMO_PREFIX_LENGTH = 3
+ALL_LANGUAGES = '*'
+PREFIX_END = '\U0010ffff'
+
+
+def _post(post):
+    if post.status != 'published':
+        return None
+    texts = [(post.title, post.get_absolute_url())]
+    texts += [(name, _url('core:tag_detail', slug)) for slug, name in parse_tags(post.tags).items()]
+    return post.get_language_display(), post.views, texts
+
+
+def _course(course):
+    return '', 0, [(course.title, _url('lessons:course_detail', course.pk))]
+
+
+def _video(video):
+    return video.get_language_display(), 0, [(video.title, _url('content:video_learning'))]
+
+
+def _service(service):
+    if not service.is_active:
+        return None
+    return '', 0, [(service.name, _url('core:services'))]
+
+
+# kind -> (fields to load, source returning (language, weight, [(text, url)]) or None)
+SOURCES = {
+    'post': (('id', 'title', 'slug', 'tags', 'language', 'views', 'status'), _post),
+    'course': (('id', 'title'), _course),
+    'video': (('id', 'title', 'language'), _video),
+    'service': (('id', 'name', 'is_active'), _service),
+}
+WEIGHT_FIELDS = {'views'}
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def word_keys(text):
+    """The text keyed from each word start: 'a b c' -> 'a b c', 'b c', 'c'"""
+    words = normalize(text).split(' ')
+    return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class PrefixIndex:
+    def __init__(self, version):
+        self.version = version
+        self._keys = defaultdict(list)       # language -> sorted keys
+        self._entries = defaultdict(list)    # language -> (text, kind, url, owner), parallel to _keys
+        self._owned = defaultdict(list)      # owner -> [(language, key, entry)]
+        self._weights = {}                   # owner -> weight
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _postings(self, owner, language, weight, texts):
+        self._weights[owner] = weight
+        for text, url in texts:
+            entry = (text, owner[0], url, owner)
+            for key in word_keys(text):
+                for bucket in {language, ALL_LANGUAGES}:
+                    self._owned[owner].append((bucket, key, entry))
+                    yield bucket, key, entry
+
+    def load(self, items):
+        """Bulk-build from (owner, language, weight, texts): one sort per language"""
+        postings = defaultdict(list)
+        for item in items:
+            for bucket, key, entry in self._postings(*item):
+                postings[bucket].append((key, entry))
+        for bucket, pairs in postings.items():
+            pairs.sort(key=lambda pair: pair[0])
+            self._keys[bucket] = [key for key, _ in pairs]
+            self._entries[bucket] = [entry for _, entry in pairs]
+
+    def add(self, owner, language, weight, texts):
+        with self._lock:
+            for bucket, key, entry in self._postings(owner, language, weight, texts):
+                position = bisect_left(self._keys[bucket], key)
+                self._keys[bucket].insert(position, key)
+                self._entries[bucket].insert(position, entry)
+            self._memo.clear()
+
+    def remove(self, owner):
+        with self._lock:
+            for bucket, key, entry in self._owned.pop(owner, ()):
+                keys, entries = self._keys[bucket], self._entries[bucket]
+                position = bisect_left(keys, key)
+                while position < len(keys) and keys[position] == key:
+                    if entries[position] is entry:
+                        del keys[position], entries[position]
+                        break
+                    position += 1
+            self._weights.pop(owner, None)
+            self._memo.clear()
+
+    def add_weight(self, owner, delta):
+        if owner in self._weights:
+            self._weights[owner] += delta
+            self._memo.clear()
+
+    def set_weight(self, owner, weight):
+        if owner in self._weights and self._weights[owner] != weight:
+            self._weights[owner] = weight
+            self._memo.clear()
+
+    def complete(self, prefix, language=None, limit=TOP_K):
+        """Top `limit` (text, kind, url) completions of `prefix`, heaviest first"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        memo_key = (prefix, language, limit) if len(prefix) <= MEMO_PREFIX_LENGTH else None
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        best = {}
+        for bucket in ((language, '') if language else (ALL_LANGUAGES,)):
+            keys, entries = self._keys.get(bucket, ()), self._entries.get(bucket, ())
+            lo, hi = bisect_left(keys, prefix), bisect_left(keys, prefix + PREFIX_END)
+            for entry in entries[lo:hi]:
+                weight = self._weights.get(entry[3], 0)
+                seen = best.get(entry[0].lower())
+                if seen is None or weight > seen[0]:
+                    best[entry[0].lower()] = (weight, entry)
+        top = heapq.nsmallest(limit, best.values(), key=lambda item: (-item[0], item[1][0].lower()))
+        result = [entry[:3] for _, entry in top]
+        if memo_key:
+            self._memo[memo_key] = result
+        return result
+
+
+def _load(kind):
+    fields, source = SOURCES[kind]
+    try:
+        model = apps.get_model(INDEXERS[kind][0])
+    except LookupError:
+        return
+    for instance in model._default_manager.only(*fields).iterator(chunk_size=2000):
+        item = source(instance)
+        if item:
+            yield ((kind, instance.pk), *item)
+
+
+def build_index(version):
+    index = PrefixIndex(version)
+    index.load(item for kind in SOURCES for item in _load(kind))
+    return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    version = get_version(VERSION_NAME)
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = build_index(version)
+            index = _index
+    return index
+
+
+def complete(prefix, language=None, limit=TOP_K):
+    return get_index().complete(prefix, language, limit)
+
+
+def _publish():
+    """Bump the shared version; keep our copy if it was current, since it already has the change"""
+    version = bump_version(VERSION_NAME)
+    index = _index
+    if index is not None and index.version == version - 1:
+        index.version = version
+
+
+def _apply(kind, pk, item):
+    index = _index
+    if index is not None:
+        index.remove((kind, pk))
+        if item:
+            index.add((kind, pk), *item)
+    _publish()
+
+
+def add_weight(kind, pk, delta):
+    """Re-weight one object in this process's copy, e.g. after a buffered view-count flush"""
+    index = _index
+    if index is not None:
+        index.add_weight((kind, pk), delta)
+
+
+def update_instance(instance, update_fields=None):
+    kind = KIND_BY_LABEL[instance._meta.label]
+    if update_fields and set(update_fields) <= WEIGHT_FIELDS:
+        if _index is not None:
+            _index.set_weight((kind, instance.pk), instance.views)
+        return
+    item = SOURCES[kind][1](instance)
+    transaction.on_commit(lambda: _apply(kind, instance.pk, item))
+
+
+def remove_instance(instance):
+    kind, pk = KIND_BY_LABEL[instance._meta.label], instance.pk
+    transaction.on_commit(lambda: _apply(kind, pk, None))
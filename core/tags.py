@@ -0,0 +1,111 @@
+# core/tags.py
+"""
+Normalised blog post tags.
+
+BlogPost.tags stays the comma-separated field authors edit; core.signals
+mirrors it into Tag/PostTag rows for published posts on every save. Tags are
+keyed by slug, so "Grammar", " grammar " and "GRAMMAR" are one tag, and a
+filter is an exact match on the unique (tag, post_id) index instead of an
+icontains scan that also finds "grammar" inside "grammarly".
+
+Tag.post_count is kept current for the tags a save touches, so tag clouds
+read one indexed table and never count rows per render.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+from .models import PostTag, Tag
+
+PAGE_SIZE = 12
+CLOUD_SIZE = 30
+
+
+def parse(tags):
+    """{slug: display name} from a comma-separated string, first spelling wins"""
+    parsed = {}
+    for raw in (tags or '').split(','):
+        name = ' '.join(raw.split())[:100]
+        slug = slugify(name, allow_unicode=True)[:100]
+        if slug and slug not in parsed:
+            parsed[slug] = name
+    return parsed
+
+
+def _blog_posts():
+    return apps.get_model('content', 'BlogPost')._default_manager
+
+
+def get_or_create_tags(names):
+    """{slug: Tag} for {slug: name}, creating missing tags in one insert"""
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(slug=slug, name=name) for slug, name in names.items()], ignore_conflicts=True)
+    return {tag.slug: tag for tag in Tag.objects.filter(slug__in=names)}
+
+
+def recount(tag_ids):
+    counts = PostTag.objects.filter(tag=OuterRef('pk')).order_by().values('tag').annotate(n=Count('id')).values('n')
+    Tag.objects.filter(pk__in=tag_ids).update(post_count=Coalesce(Subquery(counts), Value(0)))
+
+
+def sync_post(post):
+    """Make the post's PostTag rows match its tags string (none unless published)"""
+    wanted = parse(post.tags) if post.status == 'published' else {}
+    current = dict(PostTag.objects.filter(post_id=post.pk).values_list('tag__slug', 'tag_id'))
+    if wanted.keys() == current.keys():
+        return
+    with transaction.atomic():
+        removed = [tag_id for slug, tag_id in current.items() if slug not in wanted]
+        PostTag.objects.filter(post_id=post.pk, tag_id__in=removed).delete()
+        added = get_or_create_tags({slug: name for slug, name in wanted.items() if slug not in current})
+        PostTag.objects.bulk_create([PostTag(tag=tag, post_id=post.pk) for tag in added.values()], ignore_conflicts=True)
+        recount(removed + [tag.pk for tag in added.values()])
+
+
+def remove_post(post_id):
+    with transaction.atomic():
+        tag_ids = list(PostTag.objects.filter(post_id=post_id).values_list('tag_id', flat=True))
+        PostTag.objects.filter(post_id=post_id).delete()
+        recount(tag_ids)
+
+
+def rebuild(batch_size=1000):
+    """Recreate every PostTag row from BlogPost.tags; returns (posts, tags)"""
+    posts = _blog_posts().filter(status='published').exclude(tags='').order_by('pk').values_list('pk', 'tags')
+    names, links = {}, []
+    for pk, tags in posts.iterator(chunk_size=batch_size):
+        parsed = parse(tags)
+        for slug, name in parsed.items():
+            names.setdefault(slug, name)
+        links.extend((pk, slug) for slug in parsed)
+    with transaction.atomic():
+        PostTag.objects.all().delete()
+        by_slug = get_or_create_tags(names)
+        PostTag.objects.bulk_create([PostTag(tag=by_slug[slug], post_id=pk) for pk, slug in links], batch_size=batch_size)
+        recount(Tag.objects.values('pk'))
+    return len({pk for pk, _ in links}), len(by_slug)
+
+
+def tags_for_posts(post_ids):
+    """{post_id: [Tag, ...]} for many posts in one query, e.g. for a list page"""
+    result = {pk: [] for pk in post_ids}
+    for link in PostTag.objects.filter(post_id__in=result).select_related('tag').order_by('tag__name'):
+        result[link.post_id].append(link.tag)
+    return result
+
+
+def posts_tagged(tag):
+    """Published posts carrying `tag`, newest first, selected through the (tag, post_id) index"""
+    return (
+        _blog_posts()
+        .filter(status='published', pk__in=PostTag.objects.filter(tag=tag).values('post_id'))
+        .order_by('-published_at', '-pk')
+    )
+
+
+def tag_cloud(limit=CLOUD_SIZE):
+    """The most used tags, read from the denormalised counts"""
+    return list(Tag.objects.filter(post_count__gt=0).order_by('-post_count', 'name')[:limit])
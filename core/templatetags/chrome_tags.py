@@ -0,0 +1,42 @@
+# core/templatetags/chrome_tags.py
+from django import template
+
+from core import chrome
+
+register = template.Library()
+
+
+class ChromeCacheNode(template.Node):
+    def __init__(self, nodelist, name, user):
+        self.nodelist = nodelist
+        self.name = name
+        self.user = user
+
+    def render(self, context):
+        if not chrome.enabled():
+            return self.nodelist.render(context)
+        user = self.user.resolve(context) if self.user else None
+        key = chrome.fragment_key(self.name.resolve(context), user)
+        cache = chrome.backend()
+        html = cache.get(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set(key, html, chrome.timeout())
+        return html
+
+
+@register.tag
+def chrome_cache(parser, token):
+    """
+    Cache a layout fragment per language and deploy, or per user as well:
+
+        {% chrome_cache 'footer' %}...{% endchrome_cache %}
+        {% chrome_cache 'nav-user' user %}...{% endchrome_cache %}
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and an optional user")
+    nodelist = parser.parse(('endchrome_cache',))
+    parser.delete_first_token()
+    user = parser.compile_filter(bits[2]) if len(bits) == 3 else None
+    return ChromeCacheNode(nodelist, parser.compile_filter(bits[1]), user)
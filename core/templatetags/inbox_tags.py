@@ -1,4 +1,5 @@
 from django import template
+from django.db.models import Q
 from core.models import Message  # adjust if your model is in another app
 
 register = template.Library()
@@ -7,5 +8,10 @@ register = template.Library()
 def get_unread_count(user):
     """Return number of unread messages for a user."""
     if user.is_authenticated:
-        return Message.objects.filter(receiver=user, is_read=False).count()
+        # The recipient is implied by the conversation, so count others' unread messages in the user's conversations
+        return (
+            Message.objects.filter(Q(conversation__participant1=user) | Q(conversation__participant2=user), is_read=False)
+            .exclude(sender=user)
+            .count()
+        )
     return 0
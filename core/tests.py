@@ -1,3 +1,636 @@
-from django.test import TestCase
+import io
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from content.models import BlogComment, BlogPost, Video
+from lessons.models import Course
+from services.models import Service
+
+from . import chrome, comments, page_cache, ratings, recommendations, search, suggest, tags, view_counts
+from .models import SEO, CommentNode, ContactMessage, Conversation, Message, Notification, DailyViewSketch, Rating, RatingSummary, PostTag, RelatedPost, SearchDocument, StaleRelatedPost, SEOAuditResult, Tag
+from .utils.hyperloglog import HyperLogLog
+from .utils.seo_audit import SEOAuditor
+from .utils.seo_generator import BulkSEOGenerator, SEOGenerator
+
+
+class BulkSEOGeneratorTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            ContactMessage.objects.create(
+                name=f"Sender {i}", email=f"s{i}@example.com", subject=f"Subject {i}", message="Hi"
+            )
+        self.queryset = ContactMessage.objects.all()
+
+    def test_first_run_creates_one_row_per_object(self):
+        stats = BulkSEOGenerator(batch_size=2).run(self.queryset)
+
+        self.assertEqual(stats['created'], 5)
+        self.assertEqual(SEO.objects.count(), 5)
+        seo = SEO.objects.get(object_id=self.queryset.first().pk)
+        self.assertEqual(seo.og_title, seo.meta_title)
+
+    def test_second_run_is_idempotent(self):
+        BulkSEOGenerator(batch_size=2).run(self.queryset)
+        before = list(SEO.objects.order_by('pk').values_list('pk', 'updated_at'))
+
+        stats = BulkSEOGenerator(batch_size=2).run(self.queryset)
+
+        self.assertEqual((stats['created'], stats['updated'], stats['unchanged']), (0, 0, 5))
+        self.assertEqual(list(SEO.objects.order_by('pk').values_list('pk', 'updated_at')), before)
+
+    def test_changed_objects_are_upserted_in_place(self):
+        BulkSEOGenerator().run(self.queryset)
+        message = self.queryset.first()
+        message.subject = "Renamed"
+        message.save()
+
+        stats = BulkSEOGenerator().run(self.queryset)
+
+        self.assertEqual((stats['created'], stats['updated']), (0, 1))
+        self.assertEqual(SEO.objects.count(), 5)
+        self.assertEqual(SEO.objects.get(object_id=message.pk).meta_title, str(message))
+
+    def test_matches_create_for_object(self):
+        message = self.queryset.first()
+        SEOGenerator.create_for_object(message)
+
+        stats = BulkSEOGenerator().run(self.queryset)
+
+        self.assertEqual((stats['created'], stats['unchanged']), (4, 1))
+        content_type = ContentType.objects.get_for_model(ContactMessage)
+        self.assertEqual(SEO.objects.filter(content_type=content_type, object_id=message.pk).count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        stats = BulkSEOGenerator(dry_run=True).run(self.queryset)
+
+        self.assertEqual(stats['created'], 5)
+        self.assertFalse(SEO.objects.exists())
+
+
+class SEOAuditorTests(TestCase):
+    def make_seo(self, **kwargs):
+        values = {
+            'meta_title': 'Certified translation in Dar es Salaam',
+            'meta_description': 'Fast certified translations.',
+            'meta_keywords': 'translation',
+            'canonical_url': 'https://langtouch.info/translation/',
+        }
+        values.update(kwargs)
+        return SEO.objects.create(**values)
+
+    def result_for(self, seo):
+        return SEOAuditResult.objects.get(source='seo', object_id=seo.pk)
+
+    def test_flags_length_canonical_and_robots_problems(self):
+        seo = self.make_seo(
+            meta_title='x' * 61,
+            canonical_url='',
+            robots_meta='index, noindex, follow',
+        )
+
+        SEOAuditor().run()
+
+        self.assertEqual(
+            self.result_for(seo).issues,
+            ['title_too_long', 'canonical_missing', 'robots_conflict'],
+        )
+
+    def test_duplicates_ignore_case_and_whitespace(self):
+        first = self.make_seo(meta_title='Learn  Swahili', meta_description='One')
+        second = self.make_seo(meta_title='learn swahili', meta_description='Two')
+        unique = self.make_seo(meta_title='Learn French', meta_description='Three')
+
+        run = SEOAuditor().run()
+
+        self.assertTrue(self.result_for(first).duplicate_title)
+        self.assertTrue(self.result_for(second).duplicate_title)
+        self.assertFalse(self.result_for(unique).duplicate_title)
+        self.assertEqual(run.flagged, 2)
+
+    def test_incremental_run_only_rescans_changed_rows(self):
+        first = self.make_seo(meta_title='Same title')
+        second = self.make_seo(meta_title='Same title')
+        self.make_seo(meta_title='Other title')
+        SEOAuditor().run()
+
+        second.meta_title = 'Fixed title'
+        second.save()
+        run = SEOAuditor().run(incremental=True)
+
+        self.assertTrue(run.incremental)
+        self.assertEqual(run.scanned, 1)
+        self.assertFalse(self.result_for(first).duplicate_title)
+        self.assertFalse(self.result_for(second).duplicate_title)
+
+    def test_deleted_rows_are_dropped_from_results(self):
+        seo = self.make_seo()
+        SEOAuditor().run()
+
+        seo.delete()
+        SEOAuditor().run(incremental=True)
+
+        self.assertFalse(SEOAuditResult.objects.exists())
+
+
+class SiteSearchTests(TestCase):
+    def setUp(self):
+        author = get_user_model().objects.create_user(email='editor@example.com', username='editor', password='x')
+        self.post = BlogPost.objects.create(
+            created_by=author,
+            title='Swahili greetings for travellers', content='<p>Say <b>habari</b> & smile.</p>',
+            language='sw', category='vocabulary', status='published', tags='travel, greetings',
+        )
+        self.draft = BlogPost.objects.create(created_by=author, title='Swahili draft', content='Unfinished', language='sw')
+        self.course = Course.objects.create(
+            title='Business English', description='Meetings and greetings in Swahili offices', price=0, duration_weeks=4,
+        )
+        self.video = Video.objects.create(
+            title='Numbers in French', url='https://example.com/v', section='A1-A2', language='French',
+            description='Count from one to ten',
+        )
+        self.service = Service.objects.create(name='Swahili interpreting', description='On-site interpreters')
+
+    def test_signals_index_only_public_objects(self):
+        self.assertEqual(
+            set(SearchDocument.objects.values_list('kind', 'object_id')),
+            {('post', self.post.pk), ('course', self.course.pk), ('video', self.video.pk), ('service', self.service.pk)},
+        )
+        self.service.is_active = False
+        self.service.save()
+        self.video.delete()
+        self.assertEqual(search.search('interpreting').total, 0)
+        self.assertEqual(search.search('numbers').total, 0)
+
+    def test_ranked_prefix_search_with_snippets_and_facets(self):
+        results = search.search('swahili greet')
+        self.assertEqual([hit.kind for hit in results.hits], ['post', 'course'])  # title match ranks first
+        self.assertEqual(results.total, 2)
+        self.assertEqual(results.facets['kind'], [('course', 1), ('post', 1)])
+        self.assertEqual(results.facets['language'], [('Swahili', 1)])
+        self.assertIn('<mark>Swahili</mark>', results.hits[0].title_html)
+
+        hit = search.search('habari').hits[0]
+        self.assertIn('<mark>habari</mark> &amp; smile', hit.snippet_html)  # markup stripped, text escaped
+
+        self.assertEqual([h.kind for h in search.search('swahili', kinds=['service']).hits], ['service'])
+        self.assertEqual(search.search('swahili', language='French').total, 0)
+        self.assertEqual(search.search('"*(').total, 0)
+
+    def test_rebuild_and_view(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(search.rebuild(), {'post': 1, 'course': 1, 'video': 1, 'service': 1})
+        self.assertEqual(search.search('french').total, 1)
+
+        response = self.client.get(reverse('core:search'), {'q': 'swahili', 'kind': 'course'})
+        self.assertContains(response, 'Business English')
+        self.assertNotContains(response, 'Swahili interpreting')
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        suggest._index = None
+        self.author = get_user_model().objects.create_user(email='writer@example.com', username='writer', password='x')
+        self.popular = self.post('Swahili greetings', tags='greetings, travel', views=500)
+        self.quiet = self.post('Swahili grammar basics', views=3)
+        self.french = Video.objects.create(title='Greetings in French', url='https://example.com/v', section='A1-A2', language='French')
+        Service.objects.create(name='Swahili interpreting')
+
+    def post(self, title, **fields):
+        return BlogPost.objects.create(created_by=self.author, title=title, content='-', language='sw', status='published', **fields)
+
+    def texts(self, prefix, language=None):
+        return [text for text, _, _ in suggest.complete(prefix, language)]
+
+    def test_word_prefixes_ranked_by_views(self):
+        self.assertEqual(self.texts('swa'), ['Swahili greetings', 'Swahili grammar basics', 'Swahili interpreting'])
+        self.assertEqual(self.texts('GREET'), ['greetings', 'Swahili greetings', 'Greetings in French'])  # equal views: alphabetical
+        self.assertEqual(self.texts('greet', language='French'), ['Greetings in French'])
+        with self.assertNumQueries(0):  # served from memory; only the cached version stamp is read
+            self.texts('gram')
+
+    def test_saves_patch_the_index_after_commit(self):
+        suggest.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiet.title = 'Swahili verbs'
+            self.quiet.save()
+            Service.objects.filter(name='Swahili interpreting').delete()
+        index = suggest.get_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts('swahili v'), ['Swahili verbs'])
+            self.assertEqual(self.texts('interp'), [])
+        self.assertIs(suggest.get_index(), index)
+
+        self.quiet.views = 10_000
+        self.quiet.save(update_fields=['views'])
+        self.assertEqual(self.texts('swa')[0], 'Swahili verbs')
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('core:suggest'), {'q': 'trav'})
+        self.assertEqual(response.json()['suggestions'], [{'text': 'travel', 'kind': 'post', 'url': '/tags/travel/'}])
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        author = get_user_model().objects.create_user(email='blogger@example.com', username='blogger', password='x')
+        self.posts = [
+            BlogPost.objects.create(created_by=author, title=f'Post {n}', content='-', language='en', status='published')
+            for n in range(3)
+        ]
+        self.buffer = view_counts.ViewBuffer(interval=3600, max_pending=10_000)
+
+    def test_hyperloglog_estimates_and_merges(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        for n in range(5000):
+            a.add(f'visitor-{n}')
+            b.add(f'visitor-{n + 2500}')
+            a.add(f'visitor-{n}')  # repeats don't count
+        self.assertAlmostEqual(a.count(), 5000, delta=5000 * 0.1)
+        self.assertAlmostEqual(HyperLogLog.from_bytes(a.to_bytes()).merge(b).count(), 7500, delta=7500 * 0.1)
+        self.assertEqual(HyperLogLog().count(), 0)
+
+    def test_views_are_buffered_then_flushed_in_batches(self):
+        first, second, third = self.posts
+        with self.assertNumQueries(0):
+            for n in range(5):
+                self.buffer.record(first.pk, f'visitor-{n % 3}')
+                self.buffer.record(second.pk, f'visitor-{n}')
+            self.buffer.record(third.pk, 'visitor-0')
+        self.assertEqual(self.buffer.pending(first.pk), 5)
+
+        # first and second share an increment: two post UPDATEs, a sketch insert and read,
+        # two sketch view UPDATEs and one register merge per sketch (+ savepoint pair)
+        with self.assertNumQueries(11):
+            self.assertEqual(self.buffer.flush(), 11)
+        self.assertEqual([p.views for p in BlogPost.objects.order_by('pk')], [5, 5, 1])
+        sketch = DailyViewSketch.objects.get(post_id=first.pk)
+        self.assertEqual((sketch.views, HyperLogLog.from_bytes(sketch.registers).count()), (5, 3))
+
+        self.buffer.record(first.pk, 'visitor-9')
+        self.buffer.flush()
+        sketch.refresh_from_db()
+        self.assertEqual((sketch.views, HyperLogLog.from_bytes(sketch.registers).count()), (6, 4))
+
+    def test_concurrent_flushes_keep_every_view_and_visitor(self):
+        post = self.posts[0]
+        self.buffer.record(post.pk, 'visitor-1')
+        self.buffer.flush()
+        stale = bytes(DailyViewSketch.objects.get(post_id=post.pk).registers)
+
+        # Another process flushes between this one's read and its write
+        other = view_counts.ViewBuffer(interval=3600, max_pending=10_000)
+        for n in range(2, 6):
+            other.record(post.pk, f'visitor-{n}')
+        other.flush()
+        sketch = HyperLogLog()
+        sketch.add('visitor-6')
+        view_counts._merge_registers(DailyViewSketch.objects.get(post_id=post.pk).pk, stale, sketch)
+
+        row = DailyViewSketch.objects.get(post_id=post.pk)
+        self.assertEqual((row.views, HyperLogLog.from_bytes(row.registers).count()), (5, 6))
+
+    def test_flush_when_due_and_unique_visitor_estimate(self):
+        buffer = view_counts.ViewBuffer(interval=3600, max_pending=3)
+        for n in range(3):
+            buffer.record(self.posts[0].pk, f'visitor-{n}')
+        self.assertEqual(buffer.pending(self.posts[0].pk), 0)
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views, 3)
+
+        view_counts._buffer = buffer
+        self.addCleanup(setattr, view_counts, '_buffer', None)
+        buffer.record(self.posts[0].pk, 'visitor-7')  # unflushed, still counted
+        self.assertEqual(view_counts.unique_visitors(self.posts[0].pk), 4)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(email='writer@example.com', username='writer', password='x')
+        self.greetings = self.post('Swahili greetings', 'Jambo and habari are common greetings in Swahili conversation.')
+        self.more_greetings = self.post('Polite Swahili greetings', 'Shikamoo is a respectful Swahili greeting for elders.')
+        self.verbs = self.post('English irregular verbs', 'Irregular verbs like go, went and gone need practice.')
+        self.tenses = self.post('English verb tenses', 'Tenses change the verb form: irregular verbs break the rules.')
+        recommendations.rebuild()
+
+    def post(self, title, content, **fields):
+        fields = {'language': 'en', 'status': 'published', **fields}
+        return BlogPost.objects.create(created_by=self.author, title=title, content=content, **fields)
+
+    def related(self, post):
+        return [p.pk for p in recommendations.related_posts(post.pk)]
+
+    def test_similar_posts_rank_first(self):
+        self.assertEqual(self.related(self.greetings)[0], self.more_greetings.pk)
+        self.assertEqual(self.related(self.verbs)[0], self.tenses.pk)
+        self.assertNotIn(self.greetings.pk, self.related(self.greetings))
+        with self.assertNumQueries(1):
+            list(recommendations.related_posts(self.tenses.pk))
+
+    def test_edits_are_queued_and_refreshed_offline(self):
+        with self.assertNumQueries(1):
+            recommendations.mark_stale(self.greetings.pk)
+        StaleRelatedPost.objects.all().delete()
+
+        new = self.post('Swahili greetings for mornings', 'Habari za asubuhi: Swahili morning greetings.')
+        self.assertNotIn(new.pk, self.related(self.greetings))
+        self.assertEqual(list(StaleRelatedPost.objects.values_list('post_id', flat=True)), [new.pk])
+
+        call_command('build_related_posts', '--stale', stdout=io.StringIO())
+        self.assertIn(new.pk, self.related(self.greetings))
+        self.assertFalse(StaleRelatedPost.objects.exists())
+
+        self.more_greetings.status = 'draft'
+        self.more_greetings.save()
+        self.assertEqual(recommendations.refresh_stale()[0], 1)
+        self.assertNotIn(self.more_greetings.pk, self.related(self.greetings))
+        self.assertFalse(RelatedPost.objects.filter(post_id=self.more_greetings.pk).exists())
+
+    @skipUnless(recommendations.NUMPY_AVAILABLE, 'numpy and scipy are not installed')
+    def test_pure_python_and_numpy_paths_agree(self):
+        ids, documents = recommendations.load_corpus()
+        model = recommendations.TfidfModel(documents)
+        rows = list(range(len(ids)))
+        with mock.patch.object(recommendations, 'NUMPY_AVAILABLE', False):
+            expected = model.neighbours(rows, top_k=2)
+        actual = model._numpy_neighbours(rows, top_k=2, block_size=3)
+        for row in rows:
+            self.assertEqual([c for c, _ in actual[row]], [c for c, _ in expected[row]])
+            self.assertEqual([round(s, 6) for _, s in actual[row]], [round(s, 6) for _, s in expected[row]])
+
+
+class TagTests(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(email='tagger@example.com', username='tagger', password='x')
+
+    def post(self, title, tags, **fields):
+        fields = {'language': 'en', 'status': 'published', **fields}
+        return BlogPost.objects.create(created_by=self.author, title=title, content='-', tags=tags, **fields)
+
+    def counts(self):
+        return {tag.slug: tag.post_count for tag in Tag.objects.all()}
+
+    def test_tags_are_normalised_and_counted(self):
+        self.assertEqual(tags.parse(' Grammar , grammar,,Swahili  verbs, '), {'grammar': 'Grammar', 'swahili-verbs': 'Swahili verbs'})
+        first = self.post('One', 'Grammar, Verbs')
+        self.post('Two', 'grammar,grammarly')
+        draft = self.post('Three', 'grammar', status='draft')
+        self.assertEqual(self.counts(), {'grammar': 2, 'verbs': 1, 'grammarly': 1})
+
+        first.tags = 'verbs, travel'
+        first.save()
+        draft.status = 'published'
+        draft.save()
+        self.assertEqual(self.counts(), {'grammar': 2, 'verbs': 1, 'grammarly': 1, 'travel': 1})
+        first.delete()
+        self.assertEqual(self.counts(), {'grammar': 2, 'verbs': 0, 'grammarly': 1, 'travel': 0})
+        self.assertEqual([tag.slug for tag in tags.tag_cloud()], ['grammar', 'grammarly'])
+
+    def test_rebuild_matches_signals(self):
+        self.post('One', 'Grammar, Verbs')
+        self.post('Two', 'grammar')
+        expected = sorted(PostTag.objects.values_list('tag__slug', 'post_id'))
+        PostTag.objects.all().delete()
+        self.assertEqual(tags.rebuild(), (2, 2))
+        self.assertEqual(sorted(PostTag.objects.values_list('tag__slug', 'post_id')), expected)
+
+    def test_tag_page_paginates_exact_matches(self):
+        posts = [self.post(f'Grammar {n}', 'grammar') for n in range(tags.PAGE_SIZE + 1)]
+        self.post('Near miss', 'grammarly')
+        url = reverse('core:tag_detail', args=['grammar'])
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['posts']), tags.PAGE_SIZE)
+        self.assertTrue(response.context['has_next'])
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual([p.pk for p in response.context['posts']], [posts[0].pk])
+        self.assertEqual(tags.tags_for_posts([posts[0].pk])[posts[0].pk][0].slug, 'grammar')
+        self.assertEqual(self.client.get(reverse('core:tag_detail', args=['missing'])).status_code, 404)
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='reader@example.com', username='reader', password='x')
+        self.post = BlogPost.objects.create(created_by=self.user, title='Threads', content='-', language='en', status='published')
+
+    def comment(self, text, parent=None, approved=True):
+        return BlogComment.objects.create(post=self.post, author=self.user, content=text, parent=parent, approved=approved)
+
+    def shape(self, roots):
+        return [(c.content, self.shape(c.children)) for c in roots]
+
+    def test_thread_loads_in_one_query_in_path_order(self):
+        first = self.comment('first')
+        second = self.comment('second')
+        reply = self.comment('reply', parent=first)
+        self.comment('nested', parent=reply)
+        self.comment('hidden', parent=second, approved=False)
+        self.comment('reply 2', parent=first)
+        with self.assertNumQueries(1):
+            roots = comments.approved_thread(self.post.pk)
+            self.assertEqual(self.shape(roots), [
+                ('first', [('reply', [('nested', [])]), ('reply 2', [])]),
+                ('second', []),
+            ])
+            self.assertEqual(roots[0].children[0].author.username, 'reader')
+
+    def test_pages_by_top_level_comment(self):
+        roots = [self.comment(f'root {n}') for n in range(3)]
+        self.comment('deep', parent=self.comment('child', parent=roots[1]))
+        with self.assertNumQueries(2):
+            page, has_next = comments.thread_page(self.post.pk, page=1, per_page=2)
+        self.assertEqual(self.shape(page), [('root 0', []), ('root 1', [('child', [('deep', [])])])])
+        self.assertTrue(has_next)
+        self.assertEqual(self.shape(comments.thread_page(self.post.pk, page=2, per_page=2)[0]), [('root 2', [])])
+
+    def test_reparenting_moves_the_subtree_and_rebuild_agrees(self):
+        a, b = self.comment('a'), self.comment('b')
+        child = self.comment('child', parent=a)
+        self.comment('grandchild', parent=child)
+        child.parent = b
+        child.save()
+        self.assertEqual(self.shape(comments.approved_thread(self.post.pk)), [('a', []), ('b', [('child', [('grandchild', [])])])])
+        expected = sorted(CommentNode.objects.values_list('comment_id', 'path', 'depth'))
+        self.assertEqual(comments.rebuild(), 4)
+        self.assertEqual(sorted(CommentNode.objects.values_list('comment_id', 'path', 'depth')), expected)
+
+    def test_moderation_queue(self):
+        pending = self.comment('spam?', approved=False)
+        doomed = self.comment('spam!', approved=False)
+        self.comment('fine')
+        url = reverse('core:comment_moderation')
+        self.assertEqual(self.client.get(url).status_code, 302)  # login first
+
+        admin = get_user_model().objects.create_superuser(email='mod@example.com', username='mod', password='x')
+        self.client.force_login(admin)
+        response = self.client.get(url)
+        self.assertEqual([c.pk for c in response.context['comments']], [pending.pk, doomed.pk])
+        self.client.post(url, {'comment_ids': [pending.pk], 'action': 'approve'})
+        self.client.post(url, {'comment_ids': [doomed.pk], 'action': 'delete'})
+        self.assertEqual(self.shape(comments.approved_thread(self.post.pk)), [('spam?', []), ('fine', [])])
+        self.assertFalse(BlogComment.objects.filter(pk=doomed.pk).exists())
+        self.assertEqual(comments.pending_count(), 0)
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email='rater@example.com', username='rater', password='x')
+
+    def status(self, response):
+        return response.get(page_cache.STATUS_HEADER)
+
+    def test_anonymous_pages_are_cached_per_query_string(self):
+        url = reverse('core:services')
+        self.assertEqual(self.status(self.client.get(url)), 'miss')
+        response = self.client.get(url)
+        self.assertEqual((self.status(response), response.status_code), ('hit', 200))
+        self.assertEqual(self.status(self.client.get(url, {'b': 2, 'a': 1})), 'miss')
+        self.assertEqual(self.status(self.client.get(f'{url}?a=1&b=2')), 'hit')
+
+        self.client.force_login(self.user)
+        self.assertIsNone(self.status(self.client.get(url)))
+        self.assertEqual(page_cache.stats()['core.views.services_view'], {'hit': 2, 'miss': 2, 'bypass': 1})
+
+    def test_model_changes_purge_tagged_pages(self):
+        url = reverse('core:about')
+        self.client.get(url)
+        self.assertEqual(self.status(self.client.get(url)), 'hit')
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.user, score=5, feedback='Great teachers')
+        response = self.client.get(url)
+        self.assertEqual(self.status(response), 'miss')
+        self.assertContains(response, 'Great teachers')
+
+        index = reverse('core:index')
+        self.client.get(index)
+        page_cache.purge('ratings')
+        self.assertEqual(self.status(self.client.get(index)), 'hit')  # doesn't depend on ratings
+        page_cache.purge(page_cache.ALL_PAGES)
+        self.assertEqual(self.status(self.client.get(index)), 'miss')
+
+    def test_pages_issuing_a_csrf_token_are_not_stored(self):
+        @page_cache.cache_anonymous_page()
+        def form_view(request):
+            return HttpResponse(get_token(request))
+
+        def get():
+            request = RequestFactory().get('/form/')
+            request.user = AnonymousUser()
+            return form_view(request)
+
+        self.assertIsNone(self.status(get()))
+        self.assertIsNone(self.status(get()))
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('core:about')), 'csrfmiddlewaretoken')
+
+
+class RatingSummaryTests(TestCase):
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(email=f'rater{n}@example.com', username=f'rater{n}', password='x')
+            for n in range(4)
+        ]
+
+    def rate(self, user, score):
+        return Rating.objects.create(user=user, score=score)
+
+    def test_summary_follows_creates_rescores_and_deletes(self):
+        five, four, _ = self.rate(self.users[0], 5), self.rate(self.users[1], 4), self.rate(self.users[2], 4)
+        summary = ratings.get_summary()
+        self.assertEqual((summary.count, summary.total, summary.average), (3, 13, 4.3))
+        self.assertEqual(summary.histogram[:2], [(5, 1, 33), (4, 2, 67)])
+
+        four = Rating.objects.get(pk=four.pk)
+        four.score = 1
+        four.save()
+        five.delete()
+        summary.refresh_from_db()
+        self.assertEqual((summary.count, summary.total, summary.stars_4, summary.stars_1), (2, 5, 1, 1))
+
+        expected = [getattr(summary, f) for f in ('count', 'total', 'stars_1', 'stars_4', 'stars_5')]
+        RatingSummary.objects.all().delete()
+        self.rate(self.users[3], 5)  # the row is recounted when missing
+        summary = ratings.get_summary()
+        self.assertEqual([summary.count, summary.total, summary.stars_1, summary.stars_4, summary.stars_5],
+                         [expected[0] + 1, expected[1] + 5, expected[2], expected[3], expected[4] + 1])
+
+    def test_missing_summary_is_recounted_on_read(self):
+        self.rate(self.users[0], 5)
+        self.rate(self.users[1], 2)
+        RatingSummary.objects.all().delete()
+
+        summary = ratings.get_summary()
+        self.assertEqual((summary.count, summary.total), (2, 7))
+        self.rate(self.users[2], 4)
+        summary.refresh_from_db()
+        self.assertEqual((summary.count, summary.total), (3, 11))
+
+        admin_user = get_user_model().objects.create_superuser(email='boss@example.com', username='boss', password='x')
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:core_ratingsummary_delete', args=[summary.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_about_page_and_structured_data_read_the_summary(self):
+        self.rate(self.users[0], 5)
+        self.rate(self.users[1], 3)
+        response = self.client.get(reverse('core:about'))
+        self.assertEqual(response.context['summary'].average, 4.0)
+        self.assertContains(response, '2 Reviews')
+
+        self.assertEqual(ratings.aggregate_rating(), {'value': 4.0, 'count': 2})
+        seo = SEO(meta_title='Home', rating_value=4.9, review_count=300)
+        self.assertEqual(ratings.aggregate_rating(seo), {'value': 4.9, 'count': 300})
+        with self.assertNumQueries(1):
+            ratings.aggregate_rating(SEO(meta_title='Home'))
+
+
+class ChromeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(email='learner@example.com', username='learner', password='x')
+        self.teacher = User.objects.create_user(email='teacher@example.com', username='teacher', password='x')
+        self.conversation = Conversation.objects.create(participant1=self.user, participant2=self.teacher)
+
+    def render(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return render_to_string('base.html', request=request)
+
+    def test_shared_chrome_renders_once(self):
+        first = self.render(AnonymousUser())
+        for name in ('nav', 'nav-guest', 'footer'):
+            self.assertIsNotNone(cache.get(chrome.fragment_key(name)))
+        cache.set(chrome.fragment_key('footer'), '<footer>cached</footer>')
+        self.assertIn('<footer>cached</footer>', self.render(AnonymousUser()))
+        with override_settings(CHROME_CACHE=False):
+            self.assertEqual(self.render(AnonymousUser()), first)
+        self.assertIn('Register', first)
+
+    def test_user_chrome_is_refreshed_by_new_messages_and_notifications(self):
+        self.render(self.user)
+        with self.assertNumQueries(0):
+            html = self.render(self.user)
+        self.assertIn('Logout', html)
+        self.assertNotIn('Register', html)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.create(conversation=self.conversation, sender=self.teacher, body='Habari!')
+        with self.assertNumQueries(1):  # the unread badge is recounted once
+            self.assertIn('1', self.render(self.user).split('Inbox', 1)[1].split('</a>', 1)[0])
+
+        keys = chrome.fragment_key('nav-user', self.user), chrome.fragment_key('nav-user', self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, message='Your lesson is confirmed')
+        self.assertNotEqual(chrome.fragment_key('nav-user', self.user), keys[0])
+        self.assertEqual(chrome.fragment_key('nav-user', self.teacher), keys[1])
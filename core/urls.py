@@ -10,6 +10,10 @@ urlpatterns = [
     path('about/', views.about_view, name='about'),
 
     path('services/', views.services_view, name='services'),
+    path('search/', views.search_view, name='search'),
+    path('api/suggest/', views.suggest_api, name='suggest'),
+    path('tags/<str:slug>/', views.tag_detail, name='tag_detail'),
+    path('moderation/comments/', views.comment_moderation, name='comment_moderation'),
     path('inbox/', views.inbox, name='inbox'),
     path('contact/', views.contact_form, name='contact_form'),
     path('test-gemini-api/', views.test_gemini_api, name='test_gemini_api'),
@@ -0,0 +1,43 @@
+# core/utils/cache_versions.py
+"""
+Version stamps shared across processes through the cache.
+
+Process-local caches remember the version they were built from and rebuild
+when get_version() moves on. Stamps start from the clock rather than 1, so
+an evicted key never comes back as a version someone already holds.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(name):
+    return f"version:{name}"
+
+
+def _fresh():
+    return time.time_ns()
+
+
+def get_version(name):
+    version = cache.get(_key(name))
+    if version is None:
+        cache.add(_key(name), _fresh(), None)
+        version = cache.get(_key(name))
+    return version
+
+
+def bump_version(name):
+    try:
+        return cache.incr(_key(name))
+    except ValueError:
+        version = _fresh()
+        cache.set(_key(name), version, None)
+        return version
+
+
+def bump_on_commit(name):
+    """Bump now and again after commit, so readers never keep pre-commit data"""
+    bump_version(name)
+    transaction.on_commit(lambda: bump_version(name))
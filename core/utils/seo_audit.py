@@ -0,0 +1,156 @@
+# core/utils/seo_audit.py
+import hashlib
+from itertools import islice
+
+from django.apps import apps
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import SEO, SEOAuditResult, SEOAuditRun
+
+TITLE_MAX_LENGTH = 60
+DESCRIPTION_MAX_LENGTH = 160
+
+# Robots tokens that cannot appear together in one directive
+ROBOTS_CONFLICTS = (
+    ('index', 'noindex'),
+    ('follow', 'nofollow'),
+    ('all', 'noindex'),
+    ('all', 'nofollow'),
+    ('none', 'index'),
+    ('none', 'follow'),
+)
+
+
+def text_hash(value):
+    """Digest of the case- and whitespace-normalized text ('' for blank values)"""
+    normalized = ' '.join((value or '').split()).casefold()
+    if not normalized:
+        return ''
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def robots_conflicts(robots_meta):
+    tokens = {token.strip().lower() for token in (robots_meta or '').split(',')}
+    return [pair for pair in ROBOTS_CONFLICTS if tokens.issuperset(pair)]
+
+
+def length_issues(title, description):
+    issues = []
+    if not title:
+        issues.append('title_missing')
+    elif len(title) > TITLE_MAX_LENGTH:
+        issues.append('title_too_long')
+    if not description:
+        issues.append('description_missing')
+    elif len(description) > DESCRIPTION_MAX_LENGTH:
+        issues.append('description_too_long')
+    return issues
+
+
+def audit_seo_row(row):
+    issues = length_issues(row['meta_title'], row['meta_description'])
+    if not row['canonical_url']:
+        issues.append('canonical_missing')
+    if robots_conflicts(row['robots_meta']):
+        issues.append('robots_conflict')
+    return row['meta_title'], row['meta_description'], issues
+
+
+def audit_blog_row(row):
+    # Mirrors BlogPost.get_seo_context(): meta fields fall back to title/excerpt
+    title = row['meta_title'] or row['title']
+    description = row['meta_description'] or row['excerpt']
+    return title, description, length_issues(title, description)
+
+
+class SEOAuditor:
+    """
+    Streams every SEO record and blog post once and stores the findings in
+    SEOAuditResult.
+
+    Per-record checks run while streaming; duplicates are found afterwards by
+    grouping the stored title/description hashes in the database, so an
+    incremental run only has to re-read rows changed since the last audit.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+
+    def get_sources(self):
+        BlogPost = apps.get_model('content', 'BlogPost')
+        return [
+            ('seo', SEO, ('meta_title', 'meta_description', 'canonical_url', 'robots_meta'), audit_seo_row),
+            ('blog', BlogPost, ('title', 'meta_title', 'meta_description', 'excerpt'), audit_blog_row),
+        ]
+
+    def run(self, incremental=False):
+        since = None
+        if incremental:
+            last_run = SEOAuditRun.objects.filter(finished_at__isnull=False).first()
+            since = last_run.started_at if last_run else None
+
+        run = SEOAuditRun.objects.create(incremental=since is not None)
+        for source, model, fields, audit in self.get_sources():
+            queryset = model._default_manager.all()
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+            run.scanned += self._scan(source, queryset, fields, audit)
+            self._remove_stale(source, model, run, full=since is None)
+            self._flag_duplicates(source)
+
+        run.flagged = SEOAuditResult.objects.filter(
+            ~Q(issues=[]) | Q(duplicate_title=True) | Q(duplicate_description=True)
+        ).count()
+        run.finished_at = timezone.now()
+        run.save()
+        return run
+
+    def _scan(self, source, queryset, fields, audit):
+        rows = queryset.order_by('pk').values('pk', 'updated_at', *fields).iterator(chunk_size=self.batch_size)
+        scanned = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return scanned
+            results = []
+            for row in batch:
+                title, description, issues = audit(row)
+                results.append(SEOAuditResult(
+                    source=source,
+                    object_id=row['pk'],
+                    label=(title or '')[:200],
+                    title_hash=text_hash(title),
+                    description_hash=text_hash(description),
+                    issues=issues,
+                    source_updated_at=row['updated_at'],
+                ))
+            SEOAuditResult.objects.bulk_create(
+                results,
+                update_conflicts=True,
+                unique_fields=['source', 'object_id'],
+                update_fields=['label', 'title_hash', 'description_hash', 'issues', 'source_updated_at', 'audited_at'],
+            )
+            scanned += len(batch)
+
+    def _remove_stale(self, source, model, run, full):
+        results = SEOAuditResult.objects.filter(source=source)
+        if full:
+            # Every live row was re-audited during this run
+            results.filter(audited_at__lt=run.started_at).delete()
+        else:
+            results.exclude(object_id__in=model._default_manager.values('pk')).delete()
+
+    def _flag_duplicates(self, source):
+        results = SEOAuditResult.objects.filter(source=source)
+        for hash_field, flag_field in (('title_hash', 'duplicate_title'), ('description_hash', 'duplicate_description')):
+            duplicated = (
+                results.exclude(**{hash_field: ''})
+                .values(hash_field)
+                .annotate(total=Count('id'))
+                .filter(total__gt=1)
+                .values(hash_field)
+            )
+            in_group = Q(**{f'{hash_field}__in': duplicated})
+            results.filter(in_group, **{flag_field: False}).update(**{flag_field: True})
+            results.filter(~in_group, **{flag_field: True}).update(**{flag_field: False})
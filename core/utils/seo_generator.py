@@ -1,35 +1,59 @@
 # core/utils/seo_generator.py
+import time
+from itertools import islice
+
 from django.contrib.contenttypes.models import ContentType
 from core.models import SEO
 
 class SEOGenerator:
+    # Model name -> SEO.page_type for models whose name isn't a page type itself
+    PAGE_TYPE_MAP = {
+        'blogpost': 'blog',
+        'course': 'course',
+        'service': 'service',
+        'quoterequest': 'quote',
+        'booking': 'booking',
+    }
+
+    # Fields owned by the generator; everything else is left to editors
+    GENERATED_FIELDS = ('page_type', 'meta_title', 'meta_description', 'meta_keywords', 'canonical_url', 'is_active')
+
     @staticmethod
-    def create_for_object(obj, page_type=None, **kwargs):
-        """Create SEO for any model object"""
-        content_type = ContentType.objects.get_for_model(obj)
-        
-        # Default values
+    def build_defaults(obj, page_type=None, **kwargs):
+        """Compute generated SEO values for an object without touching the database"""
+        model_name = obj._meta.model_name
         defaults = {
-            'page_type': page_type or obj._meta.model_name,
+            'page_type': page_type or SEOGenerator.PAGE_TYPE_MAP.get(model_name, model_name),
             'meta_title': getattr(obj, 'seo_title', str(obj)),
             'meta_description': getattr(obj, 'seo_description', ''),
             'meta_keywords': getattr(obj, 'seo_keywords', ''),
             'canonical_url': getattr(obj, 'get_absolute_url', lambda: '')(),
             'is_active': True,
         }
-        
-        # Update with kwargs
         defaults.update(kwargs)
-        
+
+        # Trim to column sizes so one long title can't fail a whole batch
+        for name, value in defaults.items():
+            max_length = SEO._meta.get_field(name).max_length
+            if max_length and isinstance(value, str):
+                defaults[name] = value[:max_length]
+        return defaults
+
+    @staticmethod
+    def create_for_object(obj, page_type=None, **kwargs):
+        """Create SEO for any model object"""
+        content_type = ContentType.objects.get_for_model(obj)
+        defaults = SEOGenerator.build_defaults(obj, page_type, **kwargs)
+
         # Create or update SEO
         seo, created = SEO.objects.update_or_create(
             content_type=content_type,
             object_id=obj.id,
             defaults=defaults
         )
-        
+
         return seo
-    
+
     @staticmethod
     def get_for_object(obj):
         """Get SEO for an object"""
@@ -38,11 +62,97 @@ class SEOGenerator:
             return SEO.objects.get(content_type=content_type, object_id=obj.id, is_active=True)
         except SEO.DoesNotExist:
             return None
-    
+
     @staticmethod
     def get_for_page(page_type):
         """Get SEO for a page type"""
         try:
             return SEO.objects.get(page_type=page_type, is_active=True)
         except SEO.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
+
+
+class BulkSEOGenerator:
+    """
+    Backfill SEO rows for whole querysets.
+
+    Objects are streamed with iterator(), defaults are computed in memory and
+    each batch costs one read of the existing rows plus one upsert of the rows
+    that actually changed, so re-running over unchanged content writes nothing.
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, diff=False, stdout=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.diff = diff
+        self.stdout = stdout
+
+    def run(self, queryset, page_type=None, **kwargs):
+        """Generate SEO for every object in queryset and return the counts"""
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        stats = {'scanned': 0, 'created': 0, 'updated': 0, 'unchanged': 0}
+        started = time.monotonic()
+
+        objects = queryset.order_by('pk').iterator(chunk_size=self.batch_size)
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            self._process_batch(content_type, batch, page_type, kwargs, stats)
+
+        stats['seconds'] = time.monotonic() - started
+        stats['rows_per_second'] = stats['scanned'] / stats['seconds'] if stats['seconds'] else 0.0
+        return stats
+
+    def _process_batch(self, content_type, batch, page_type, kwargs, stats):
+        fields = SEOGenerator.GENERATED_FIELDS
+        existing = {
+            row['object_id']: row
+            for row in SEO.objects.filter(
+                content_type=content_type,
+                object_id__in=[obj.pk for obj in batch],
+            ).values('object_id', *fields)
+        }
+
+        pending = []
+        for obj in batch:
+            stats['scanned'] += 1
+            defaults = SEOGenerator.build_defaults(obj, page_type, **kwargs)
+            current = existing.get(obj.pk)
+
+            if current is None:
+                stats['created'] += 1
+                self._report(content_type, obj, 'create', defaults)
+            else:
+                changes = {
+                    name: (current[name], value)
+                    for name, value in defaults.items()
+                    if name in fields and current[name] != value
+                }
+                if not changes:
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated'] += 1
+                self._report(content_type, obj, 'update', changes)
+
+            seo = SEO(content_type=content_type, object_id=obj.pk, **defaults)
+            seo.fill_social_defaults()
+            pending.append(seo)
+
+        if pending and not self.dry_run:
+            SEO.objects.bulk_create(
+                pending,
+                update_conflicts=True,
+                unique_fields=['content_type', 'object_id'],
+                update_fields=[*fields, 'updated_at'],
+            )
+
+    def _report(self, content_type, obj, action, values):
+        if not (self.diff and self.stdout):
+            return
+        label = f"{content_type.model} #{obj.pk}"
+        if action == 'create':
+            self.stdout.write(f"+ {label}: {values['meta_title']!r}")
+            return
+        for name, (old, new) in values.items():
+            self.stdout.write(f"~ {label} {name}: {old!r} -> {new!r}")
@@ -0,0 +1,200 @@
+# core/view_counts.py
+"""
+Buffered blog post view counting.
+
+record_view() only touches a process-local buffer. The buffer is flushed
+every VIEW_COUNT_FLUSH_INTERVAL seconds (or after VIEW_COUNT_MAX_PENDING
+views, and at exit) by the request that notices it is due. Each flush is
+one `views = views + n` UPDATE per distinct n, for the posts and for the
+day's DailyViewSketch rows, so readers never queue behind a write per view
+and concurrent flushes can't overwrite each other's counts. Sketch
+registers are merged with a compare-and-swap UPDATE that retries when
+another process changed them first.
+
+Distinct visitors are estimated with a HyperLogLog sketch per post per day.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailyViewSketch
+from .utils.hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 10
+DEFAULT_MAX_PENDING = 1000
+
+
+def visitor_key(request):
+    """Identify a visitor as well as a request allows: user, then session, then address and agent"""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    if getattr(request, 'session', None) is not None and request.session.session_key:
+        return f"session:{request.session.session_key}"
+    return f"anon:{request.META.get('REMOTE_ADDR', '')}:{request.META.get('HTTP_USER_AGENT', '')}"
+
+
+class ViewBuffer:
+    def __init__(self, interval=None, max_pending=None):
+        self.interval = interval if interval is not None else getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        self.max_pending = max_pending or getattr(settings, 'VIEW_COUNT_MAX_PENDING', DEFAULT_MAX_PENDING)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+        self._last_flush = time.monotonic()
+
+    def _reset(self):
+        self._counts = Counter()      # post_id -> views
+        self._days = {}               # (post_id, day) -> [views, HyperLogLog]
+        self._pending = 0
+
+    def record(self, post_id, visitor=None, day=None):
+        key = (post_id, day or timezone.localdate())
+        with self._lock:
+            self._counts[post_id] += 1
+            entry = self._days.get(key)
+            if entry is None:
+                entry = self._days[key] = [0, HyperLogLog()]
+            entry[0] += 1
+            if visitor:
+                entry[1].add(visitor)
+            self._pending += 1
+            due = self._pending >= self.max_pending or time.monotonic() - self._last_flush >= self.interval
+        if due:
+            self.flush()
+
+    def pending(self, post_id):
+        return self._counts.get(post_id, 0)
+
+    def pending_sketches(self, post_id):
+        with self._lock:
+            return {day: entry[1] for (pid, day), entry in self._days.items() if pid == post_id}
+
+    def flush(self):
+        """Write buffered views; returns how many were written"""
+        if not self._flush_lock.acquire(blocking=False):
+            return 0  # another thread is flushing
+        try:
+            with self._lock:
+                counts, days = self._counts, self._days
+                self._reset()
+                self._last_flush = time.monotonic()
+            if not counts:
+                return 0
+            try:
+                _write(counts, days)
+            except DatabaseError:
+                logger.exception("Could not flush %s buffered views; keeping them for the next flush", sum(counts.values()))
+                self._restore(counts, days)
+                return 0
+            _reweight_suggestions(counts)
+            return sum(counts.values())
+        finally:
+            self._flush_lock.release()
+
+    def _restore(self, counts, days):
+        with self._lock:
+            self._counts.update(counts)
+            for key, (views, sketch) in days.items():
+                entry = self._days.setdefault(key, [0, HyperLogLog()])
+                entry[0] += views
+                entry[1].merge(sketch)
+            self._pending += sum(counts.values())
+
+
+def _add_views(queryset, counts):
+    """`views = views + n` for each {pk: n}, one UPDATE per distinct n"""
+    by_increment = defaultdict(list)
+    for pk, n in counts.items():
+        by_increment[n].append(pk)
+    for n, pks in by_increment.items():
+        queryset.filter(pk__in=pks).update(views=F('views') + n)
+
+
+def _write(counts, days):
+    with transaction.atomic():
+        _add_views(apps.get_model('content', 'BlogPost').objects, counts)
+        _merge_sketches(days)
+
+
+def _merge_sketches(days):
+    # Rows another process inserted first are left alone; both then add to the same row
+    empty = HyperLogLog().to_bytes()
+    DailyViewSketch.objects.bulk_create(
+        [DailyViewSketch(post_id=post_id, day=day, views=0, registers=empty) for post_id, day in days],
+        ignore_conflicts=True, batch_size=500,
+    )
+    rows = {
+        (row.post_id, row.day): row
+        for row in DailyViewSketch.objects.filter(
+            post_id__in={post_id for post_id, _ in days}, day__in={day for _, day in days},
+        )
+    }
+    _add_views(DailyViewSketch.objects, {rows[key].pk: views for key, (views, _) in days.items()})
+    for key, (_, sketch) in days.items():
+        _merge_registers(rows[key].pk, bytes(rows[key].registers), sketch)
+
+
+def _merge_registers(pk, registers, sketch):
+    """Merge `sketch` into a row whose registers were last read as `registers`"""
+    while True:
+        merged = HyperLogLog.from_bytes(registers).merge(sketch).to_bytes()
+        if merged == registers:
+            return
+        # Only succeeds if nobody merged since the read; otherwise re-read and merge again
+        if DailyViewSketch.objects.filter(pk=pk, registers=registers).update(registers=merged):
+            return
+        registers = bytes(DailyViewSketch.objects.values_list('registers', flat=True).get(pk=pk))
+
+
+def _reweight_suggestions(counts):
+    # update() skips post_save, so tell the typeahead index about the new views
+    from . import suggest
+    for post_id, n in counts.items():
+        suggest.add_weight('post', post_id, n)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ViewBuffer()
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_view(request, post):
+    """Count one view of `post`; use instead of BlogPost.increment_views()"""
+    get_buffer().record(post.pk, visitor_key(request))
+
+
+def flush():
+    return get_buffer().flush()
+
+
+def unique_visitors(post_id, days=30, today=None):
+    """Estimated distinct visitors over the last `days` days, including unflushed views"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    sketch = HyperLogLog()
+    for registers in DailyViewSketch.objects.filter(post_id=post_id, day__gte=start, day__lte=today).values_list('registers', flat=True):
+        sketch.merge(HyperLogLog.from_bytes(registers))
+    for day, pending in get_buffer().pending_sketches(post_id).items():
+        if start <= day <= today:
+            sketch.merge(pending)
+    return sketch.count()
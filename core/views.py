@@ -1,17 +1,24 @@
 # views_fixed.py
 
 from django.shortcuts import get_object_or_404, render, redirect
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse, JsonResponse
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.conf import settings
 import os
 import json
 import logging
 
-from .models import ContactMessage, Message, Conversation, Rating, User
+from accounts.permissions import requires_role
+
+from . import comments, search, suggest, tags
+from . import ratings as rating_summary
+from .page_cache import cache_anonymous_page
+from .models import ContactMessage, Message, Conversation, Rating, SearchDocument, Tag, User
 from .forms import ContactMessageForm, MessageForm, RatingForm
 
 logger = logging.getLogger(__name__)
@@ -222,27 +229,28 @@ def create_or_get_conversation(user_a, user_b):
 # ---------------------------
 # Basic Views (unchanged except defensive tweaks)
 # ---------------------------
+@cache_anonymous_page()
 def index_view(request):
     return render(request, "core/index.html")
 
+@cache_anonymous_page("ratings")
 def about_view(request):
     existing_rating = None
-    try:
+    if request.user.is_authenticated:
         existing_rating = Rating.objects.filter(user=request.user).first()
-    except Exception:
-        existing_rating = None
 
-    if request.method == "POST" and not existing_rating:
+    form = None
+    if request.method == "POST" and request.user.is_authenticated and not existing_rating:
         form = RatingForm(request.POST)
         if form.is_valid():
             rating = form.save(commit=False)
             rating.user = request.user
             rating.save()
             return redirect("core:about")
-    else:
-        form = RatingForm() if not existing_rating else None
+    elif request.user.is_authenticated and not existing_rating:
+        form = RatingForm()
 
-    ratings = Rating.objects.all().order_by("-created_at")[:6]
+    ratings = Rating.objects.select_related("user").order_by("-created_at")[:6]
     for r in ratings:
         r.filled_stars = range(r.score)
         r.empty_stars = range(5 - r.score)
@@ -250,12 +258,85 @@ def about_view(request):
     return render(
         request,
         "core/about.html",
-        {"form": form, "ratings": ratings, "existing_rating": existing_rating},
+        {"form": form, "ratings": ratings, "existing_rating": existing_rating, "summary": rating_summary.get_summary()},
     )
 
+@cache_anonymous_page()
 def services_view(request):
     return render(request, "core/services.html")
 
+def suggest_api(request):
+    """Typeahead completions: ?q=<prefix>&lang=<language>"""
+    completions = suggest.complete(request.GET.get("q", "")[:100], request.GET.get("lang") or None)
+    response = JsonResponse({
+        "suggestions": [{"text": text, "kind": kind, "url": url} for text, kind, url in completions],
+    })
+    patch_cache_control(response, public=True, max_age=60)
+    return response
+
+def search_view(request):
+    query = request.GET.get("q", "").strip()
+    kinds = [kind for kind in request.GET.getlist("kind") if kind in search.INDEXERS]
+    language = request.GET.get("language") or None
+    category = request.GET.get("category") or None
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+
+    results = search.search(
+        query, kinds=kinds, language=language, category=category,
+        limit=search.PAGE_SIZE, offset=(page - 1) * search.PAGE_SIZE,
+    )
+    labels = dict(SearchDocument.KIND_CHOICES)
+    return render(request, "core/search.html", {
+        "query": query,
+        "results": results,
+        "kinds": kinds,
+        "kind_facets": [(value, labels.get(value, value), count) for value, count in results.facets["kind"]],
+        "language": language,
+        "category": category,
+        "page": page,
+        "has_next": page * search.PAGE_SIZE < results.total,
+    })
+
+def tag_detail(request, slug):
+    tag = get_object_or_404(Tag, slug=slug)
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+    offset = (page - 1) * tags.PAGE_SIZE
+    posts = list(tags.posts_tagged(tag)[offset:offset + tags.PAGE_SIZE + 1])
+    return render(request, "core/tag_detail.html", {
+        "tag": tag,
+        "posts": posts[:tags.PAGE_SIZE],
+        "page": page,
+        "has_next": len(posts) > tags.PAGE_SIZE,
+        "cloud": tags.tag_cloud(),
+    })
+
+@requires_role('Admin', 'Moderator')
+def comment_moderation(request):
+    """Pending blog comments, oldest first; POST approves or deletes the ticked ones"""
+    if request.method == "POST":
+        try:
+            comment_ids = [int(pk) for pk in request.POST.getlist("comment_ids")]
+        except ValueError:
+            comment_ids = []
+        approve = request.POST.get("action") == "approve"
+        if comment_ids:
+            changed = comments.moderate(comment_ids, approve)
+            messages.success(request, f"{'Approved' if approve else 'Deleted'} {changed} comment{'s' if changed != 1 else ''}.")
+        else:
+            messages.error(request, "Select at least one comment.")
+        return redirect("core:comment_moderation")
+
+    return render(request, "core/comment_moderation.html", {
+        "comments": comments.moderation_queue(),
+        "pending": comments.pending_count(),
+    })
+
 def contact_form(request):
     if request.method == "POST":
         form = ContactMessageForm(request.POST)
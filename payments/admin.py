@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import Currency, PaymentMethod, Payment, PaymentTransaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.html import format_html
+
+from .confirmation import confirm_payments
+from .models import (
+    Currency, PaymentMethod, Payment, PaymentTransaction, FlutterwaveWebhookEvent, Entitlement,
+    DailyRevenueSummary,
+)
+from .revenue import dashboard_data
 
 
 @admin.register(PaymentTransaction)
@@ -11,19 +20,71 @@ class PaymentTransactionAdmin(admin.ModelAdmin):
     ordering = ['-transaction_date']
 
 
+class DuplicateReceiptFilter(admin.SimpleListFilter):
+    title = "duplicate receipt"
+    parameter_name = "duplicate_receipt"
+
+    def lookups(self, request, model_admin):
+        return [("yes", "Receipt also used on another payment")]
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(has_duplicate_receipt=True)
+        return queryset
+
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = [
         "reference_number", "user", "video", "course", "booking",
-        "amount", "currency", "status", "is_confirmed", "created_at"
+        "amount", "currency", "status", "is_confirmed", "receipt_preview", "duplicate_receipt", "created_at"
     ]
-    list_filter = ["status", "currency", "method", "is_confirmed"]
-    search_fields = ["reference_number", "user__email"]
+    list_filter = ["status", "currency", "method", "is_confirmed", DuplicateReceiptFilter]
+    list_select_related = ["user", "video", "course", "booking__user", "booking__service", "currency"]
+    search_fields = ["reference_number", "user__email", "receipt_hash"]
+    readonly_fields = ["receipt_thumbnail_preview", "receipt_hash", "receipt_processed_at"]
+    exclude = ["receipt_thumbnail"]
     actions = ["mark_as_confirmed"]
 
+    def get_queryset(self, request):
+        same_receipt = Payment.objects.filter(receipt_hash=OuterRef("receipt_hash")).exclude(pk=OuterRef("pk"))
+        return super().get_queryset(request).annotate(
+            has_duplicate_receipt=Exists(same_receipt) & ~Q(receipt_hash="")
+        )
+
+    @admin.display(description="Receipt")
+    def receipt_preview(self, obj):
+        # Thumbnails only; originals are opened from the change page
+        if obj.receipt_thumbnail:
+            return format_html('<img src="{}" alt="" style="height:48px;border-radius:4px">', obj.receipt_thumbnail.url)
+        if obj.receipt:
+            return "⏳"
+        return "—"
+
+    @admin.display(description="Duplicate", boolean=True, ordering="has_duplicate_receipt")
+    def duplicate_receipt(self, obj):
+        return obj.has_duplicate_receipt
+
+    @admin.display(description="Receipt preview")
+    def receipt_thumbnail_preview(self, obj):
+        if not obj.receipt:
+            return "—"
+        if not obj.receipt_thumbnail:
+            return format_html('<a href="{}" target="_blank">Open receipt</a> (thumbnail pending)', obj.receipt.url)
+        return format_html(
+            '<a href="{}" target="_blank"><img src="{}" alt="" style="max-height:240px"></a>',
+            obj.receipt.url, obj.receipt_thumbnail.url,
+        )
+
     def mark_as_confirmed(self, request, queryset):
-        updated = queryset.update(is_confirmed=True, status="Completed")
-        self.message_user(request, f"{updated} payment(s) marked as confirmed ✅")
+        stats = confirm_payments(queryset)
+        self.message_user(
+            request,
+            f"{stats['confirmed']} payment(s) marked as confirmed ✅ — "
+            f"{stats['enrollments']} enrollment(s), {stats['reactivated']} reactivated, "
+            f"{stats['purchases']} video purchase(s), {stats['bookings']} booking(s) confirmed, "
+            f"{stats['notifications']} user(s) notified",
+        )
     mark_as_confirmed.short_description = "Mark selected payments as confirmed"
 
 
@@ -41,3 +102,68 @@ class PaymentMethodAdmin(admin.ModelAdmin):
     list_filter = ['is_active']
     search_fields = ['name']
     ordering = ['name']
+
+
+@admin.register(FlutterwaveWebhookEvent)
+class FlutterwaveWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event_type', 'tx_ref', 'status', 'attempts', 'next_attempt_at', 'received_at', 'processed_at']
+    list_filter = ['status', 'event_type']
+    search_fields = ['event_id', 'tx_ref']
+    date_hierarchy = 'received_at'
+    readonly_fields = [f.name for f in FlutterwaveWebhookEvent._meta.fields]
+    actions = ['replay_events']
+
+    def has_add_permission(self, request):
+        return False
+
+    def replay_events(self, request, queryset):
+        requeued = queryset.update(status='received', attempts=0, error='', next_attempt_at=timezone.now(), processed_at=None)
+        self.message_user(request, f"{requeued} event(s) re-queued for processing 🔁")
+    replay_events.short_description = "Re-queue selected events"
+
+
+@admin.register(Entitlement)
+class EntitlementAdmin(admin.ModelAdmin):
+    list_display = ['user', 'product_type', 'object_id', 'source', 'granted_at']
+    list_filter = ['product_type', 'source']
+    search_fields = ['user__email', 'user__username']
+    raw_id_fields = ['user']
+
+
+def _bars(dates, values, unit=""):
+    peak = max((v for v in values if v), default=0)
+    return [
+        {"day": day, "value": value, "unit": unit, "pct": round(100 * value / peak, 1) if value and peak else 0}
+        for day, value in zip(dates, values)
+    ]
+
+
+@admin.register(DailyRevenueSummary)
+class DailyRevenueSummaryAdmin(admin.ModelAdmin):
+    list_display = ["day", "currency", "method", "product_type", "status", "count", "amount"]
+    list_filter = ["currency", "method", "product_type", "status"]
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        try:
+            days = max(7, min(int(request.GET.get("days", 30)), 365))
+        except ValueError:
+            days = 30
+        data = dashboard_data(days=days)
+        charts = []
+        for currency, values in data["revenue"].items():
+            charts.append({"title": f"Revenue ({currency})", "bars": _bars(data["dates"], values)})
+        for currency, values in data["refunds"].items():
+            if any(values):
+                charts.append({"title": f"Refunds ({currency})", "bars": _bars(data["dates"], values)})
+        charts.append({"title": "Checkout conversion", "bars": _bars(data["dates"], data["conversion"], "%")})
+        charts.append({"title": "Flutterwave success rate", "bars": _bars(data["dates"], data["gateway_conversion"], "%")})
+
+        extra_context = {**(extra_context or {}), "revenue_charts": charts, "chart_days": days}
+        return super().changelist_view(request, extra_context=extra_context)
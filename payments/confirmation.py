@@ -0,0 +1,157 @@
+# payments/confirmation.py
+"""
+Confirm many payments at once and hand out what they pay for.
+
+Everything is set-based: one UPDATE confirms the payments, the implied
+Enrollments and VideoPurchases go in with bulk_create(ignore_conflicts=True),
+pending bookings are confirmed in one UPDATE, and each user gets a single
+Notification listing all of their payments. Caches and the revenue summary
+are refreshed once at the end.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Booking
+from content.models import VideoPurchase
+from core.chrome import bump_users
+from core.models import Notification
+from lessons.models import Enrollment
+
+from .enrollments import invalidate_count
+from .entitlements import sync_users
+from .models import Payment
+from .revenue import refresh_days
+
+PAYMENT_FIELDS = ('id', 'user_id', 'reference_number', 'is_confirmed', 'status', 'created_at',
+                  'video_id', 'course_id', 'booking_id', 'quote_request_id')
+
+
+def _existing_pairs(model, field, pairs):
+    """Which (user_id, object_id) pairs already have a row"""
+    if not pairs:
+        return set()
+    users = {user_id for user_id, _ in pairs}
+    objects = {object_id for _, object_id in pairs}
+    return set(
+        model.objects.filter(user_id__in=users, **{f'{field}__in': objects})
+        .values_list('user_id', field)
+    ) & pairs
+
+
+def _inserted(model, field, rows):
+    """
+    How many of `rows` ({(user_id, object_id): payment_id}) now exist with
+    that payment: bulk_create(ignore_conflicts=True) doesn't say which rows
+    it skipped because another worker got there first.
+    """
+    if not rows:
+        return 0
+    found = model.objects.filter(
+        payment_id__in=set(rows.values()),
+        user_id__in={user_id for user_id, _ in rows},
+        **{f'{field}__in': {object_id for _, object_id in rows}},
+    ).values_list('user_id', field, 'payment_id')
+    return sum(1 for user_id, object_id, payment_id in found if rows.get((user_id, object_id)) == payment_id)
+
+
+def confirm_payments(queryset, notify=True):
+    """
+    Confirm every payment in `queryset` and create the grants they imply.
+
+    Returns a dict of counts: confirmed, enrollments, reactivated,
+    purchases, bookings, notifications.
+    """
+    stats = dict.fromkeys(('confirmed', 'enrollments', 'reactivated', 'purchases', 'bookings', 'notifications'), 0)
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Re-select by pk so annotations/joins on the caller's queryset don't end up in FOR UPDATE
+        rows = list(Payment.objects.filter(pk__in=queryset.values('pk')).select_for_update().values(*PAYMENT_FIELDS))
+        if not rows:
+            return stats
+
+        newly_confirmed = [r for r in rows if not (r['is_confirmed'] and r['status'] == 'Completed')]
+        if newly_confirmed:
+            stats['confirmed'] = Payment.objects.filter(pk__in=[r['id'] for r in newly_confirmed]).update(
+                is_confirmed=True, status='Completed', updated_at=now,
+            )
+
+        # Courses: new enrollments, and paid-for enrollments that had been deactivated
+        course_rows = {(r['user_id'], r['course_id']): r['id'] for r in rows if r['course_id']}
+        existing = _existing_pairs(Enrollment, 'course_id', set(course_rows))
+        new_courses = {pair: payment_id for pair, payment_id in course_rows.items() if pair not in existing}
+        Enrollment.objects.bulk_create(
+            [
+                Enrollment(user_id=user_id, course_id=course_id, payment_id=payment_id)
+                for (user_id, course_id), payment_id in new_courses.items()
+            ],
+            ignore_conflicts=True,
+        )
+        stats['enrollments'] = _inserted(Enrollment, 'course_id', new_courses)
+        if existing:
+            inactive = [
+                pk for pk, user_id, course_id in Enrollment.objects.filter(
+                    user_id__in={u for u, _ in existing}, course_id__in={c for _, c in existing}, is_active=False,
+                ).values_list('pk', 'user_id', 'course_id')
+                if (user_id, course_id) in existing
+            ]
+            if inactive:
+                stats['reactivated'] = Enrollment.objects.filter(pk__in=inactive).update(is_active=True)
+
+        # Videos
+        video_rows = {(r['user_id'], r['video_id']): r['id'] for r in rows if r['video_id']}
+        owned = _existing_pairs(VideoPurchase, 'video_id', set(video_rows))
+        new_videos = {pair: payment_id for pair, payment_id in video_rows.items() if pair not in owned}
+        VideoPurchase.objects.bulk_create(
+            [
+                VideoPurchase(user_id=user_id, video_id=video_id, payment_id=payment_id)
+                for (user_id, video_id), payment_id in new_videos.items()
+            ],
+            ignore_conflicts=True,
+        )
+        stats['purchases'] = _inserted(VideoPurchase, 'video_id', new_videos)
+
+        # Bookings are held until paid
+        booking_ids = [r['booking_id'] for r in rows if r['booking_id']]
+        if booking_ids:
+            stats['bookings'] = Booking.objects.filter(pk__in=booking_ids, status='pending').update(
+                status='confirmed', updated_at=now,
+            )
+
+        if notify and newly_confirmed:
+            notifications = Notification.objects.bulk_create(_notifications(newly_confirmed, now))
+            stats['notifications'] = len(notifications)
+            # The unread badge in each user's cached nav is refreshed by post_save, which bulk_create skips
+            bump_users(*(notification.user_id for notification in notifications))
+
+        # bulk_create/update() skip signals, so refresh the derived data once here
+        sync_users({r['user_id'] for r in rows})
+        for course_id in {course_id for _, course_id in course_rows}:
+            invalidate_count(course_id)
+        refresh_days({timezone.localdate(r['created_at']) for r in newly_confirmed})
+
+    return stats
+
+
+def _notifications(rows, now):
+    by_user = defaultdict(list)
+    for row in rows:
+        by_user[row['user_id']].append(row)
+
+    notifications = []
+    for user_id, payments in by_user.items():
+        unlocked = []
+        for label, field in (('course', 'course_id'), ('video', 'video_id'), ('booking', 'booking_id'), ('quote', 'quote_request_id')):
+            n = sum(1 for p in payments if p[field])
+            if n:
+                unlocked.append(f"{n} {label}{'s' if n > 1 else ''}")
+        references = ', '.join(p['reference_number'] for p in payments[:5])
+        if len(payments) > 5:
+            references += f" and {len(payments) - 5} more"
+        message = f"✅ Payment{'s' if len(payments) > 1 else ''} {references} confirmed."
+        if unlocked:
+            message += f" Now available: {', '.join(unlocked)}."
+        notifications.append(Notification(user_id=user_id, message=message, notification_type='Success', created_at=now))
+    return notifications
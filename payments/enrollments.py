@@ -0,0 +1,82 @@
+# payments/enrollments.py
+"""
+Enrollment lookups that never load the enrolled students.
+
+Membership is an indexed exists() on the (user, course) unique key, course
+counts are cached per course and dropped by the Enrollment signals in
+payments.signals, and list pages get everything for a page of courses in
+one query each via annotate_courses().
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from lessons.models import Enrollment
+
+DEFAULT_COUNT_TTL = 60 * 60 * 6
+
+
+def count_key(course_id):
+    return f"enrollments:count:{course_id}"
+
+
+def is_enrolled(user, course_id):
+    if not user.is_authenticated:
+        return False
+    return Enrollment.objects.filter(user=user, course_id=course_id, is_active=True).exists()
+
+
+def enrolled_course_ids(user, course_ids):
+    """The subset of course_ids the user is actively enrolled in (one query)"""
+    if not user.is_authenticated:
+        return set()
+    return set(
+        Enrollment.objects.filter(user=user, course_id__in=course_ids, is_active=True)
+        .values_list('course_id', flat=True)
+    )
+
+
+def enrollment_counts(course_ids):
+    """{course_id: active enrollments}; cache hits first, one grouped query for the rest"""
+    course_ids = list(course_ids)
+    cached = cache.get_many([count_key(course_id) for course_id in course_ids])
+    counts = {course_id: cached[count_key(course_id)] for course_id in course_ids if count_key(course_id) in cached}
+
+    missing = [course_id for course_id in course_ids if course_id not in counts]
+    if missing:
+        fresh = dict.fromkeys(missing, 0)
+        fresh.update(
+            Enrollment.objects.filter(course_id__in=missing, is_active=True)
+            .values('course_id')
+            .annotate(total=Count('id'))
+            .values_list('course_id', 'total')
+        )
+        cache.set_many(
+            {count_key(course_id): total for course_id, total in fresh.items()},
+            getattr(settings, 'ENROLLMENT_COUNT_TTL', DEFAULT_COUNT_TTL),
+        )
+        counts.update(fresh)
+    return counts
+
+
+def enrollment_count(course_id):
+    return enrollment_counts([course_id])[course_id]
+
+
+def annotate_courses(courses, user):
+    """Set .enrolled_count and .is_enrolled on each course of a page"""
+    courses = list(courses)
+    ids = [course.id for course in courses]
+    counts = enrollment_counts(ids)
+    mine = enrolled_course_ids(user, ids)
+    for course in courses:
+        course.enrolled_count = counts[course.id]
+        course.is_enrolled = course.id in mine
+    return courses
+
+
+def invalidate_count(course_id):
+    key = count_key(course_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,133 @@
+# payments/entitlements.py
+"""
+"Can this user watch/access X?" answered from one table.
+
+Entitlement rows are derived from confirmed Payments, VideoPurchases and
+active Enrollments by sync_users(), which the signals in payments.signals
+call whenever one of those changes. Readers load all of a user's grants in
+one query into an EntitlementSet, cached per user and memoised per request:
+
+    owned = get_entitlements(request).ids('video')
+    for video in videos:
+        video.is_purchased = video.id in owned
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from content.models import VideoPurchase
+from lessons.models import Enrollment
+
+from .models import Entitlement, Payment
+
+DEFAULT_CACHE_TTL = 60 * 60
+
+
+class EntitlementSet:
+    """Immutable set of (product_type, object_id) grants"""
+    __slots__ = ('_grants',)
+
+    def __init__(self, grants=()):
+        self._grants = frozenset(grants)
+
+    def has(self, product_type, object_id):
+        return (product_type, int(object_id)) in self._grants
+
+    def ids(self, product_type):
+        return {object_id for kind, object_id in self._grants if kind == product_type}
+
+    def __contains__(self, grant):
+        return grant in self._grants
+
+    def __len__(self):
+        return len(self._grants)
+
+
+def cache_key(user_id):
+    return f"entitlements:{user_id}"
+
+
+def load_entitlements(user_id):
+    """All grants for one user: a cache hit, or a single query"""
+    grants = cache.get(cache_key(user_id))
+    if grants is None:
+        grants = list(Entitlement.objects.filter(user_id=user_id).values_list('product_type', 'object_id'))
+        cache.set(cache_key(user_id), grants, getattr(settings, 'ENTITLEMENT_CACHE_TTL', DEFAULT_CACHE_TTL))
+    return EntitlementSet(grants)
+
+
+def get_entitlements(request):
+    """The current user's grants, loaded at most once per request"""
+    if not request.user.is_authenticated:
+        return EntitlementSet()
+    if not hasattr(request, '_entitlements'):
+        request._entitlements = load_entitlements(request.user.pk)
+    return request._entitlements
+
+
+def can_access(request, product_type, object_id):
+    return get_entitlements(request).has(product_type, object_id)
+
+
+def invalidate(user_ids):
+    """
+    Drop cached grants now, and again on commit in case another request
+    re-cached the pre-commit rows in between.
+    """
+    keys = [cache_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def derive_grants(user_ids):
+    """{(user_id, product_type, object_id): source} from the source tables"""
+    grants = {}
+
+    def add(rows, product_type, source):
+        for user_id, object_id in rows:
+            if object_id is not None:
+                grants.setdefault((user_id, product_type, object_id), source)
+
+    paid = Payment.objects.filter(user_id__in=user_ids, is_confirmed=True, status='Completed')
+    add(paid.filter(video__isnull=False).values_list('user_id', 'video_id'), 'video', 'payment')
+    add(paid.filter(course__isnull=False).values_list('user_id', 'course_id'), 'course', 'payment')
+    add(VideoPurchase.objects.filter(user_id__in=user_ids).values_list('user_id', 'video_id'), 'video', 'purchase')
+    add(
+        Enrollment.objects.filter(user_id__in=user_ids, is_active=True).values_list('user_id', 'course_id'),
+        'course', 'enrollment',
+    )
+    return grants
+
+
+def sync_users(user_ids):
+    """
+    Bring the Entitlement rows of these users in line with the source tables.
+
+    Returns (granted, revoked) row counts.
+    """
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return 0, 0
+
+    wanted = derive_grants(user_ids)
+    existing = {
+        (user_id, product_type, object_id): pk
+        for pk, user_id, product_type, object_id in Entitlement.objects.filter(user_id__in=user_ids)
+        .values_list('pk', 'user_id', 'product_type', 'object_id')
+    }
+
+    missing = [
+        Entitlement(user_id=user_id, product_type=product_type, object_id=object_id, source=source)
+        for (user_id, product_type, object_id), source in wanted.items()
+        if (user_id, product_type, object_id) not in existing
+    ]
+    stale = [pk for key, pk in existing.items() if key not in wanted]
+
+    if missing:
+        Entitlement.objects.bulk_create(missing, ignore_conflicts=True)
+    if stale:
+        Entitlement.objects.filter(pk__in=stale).delete()
+    if missing or stale:
+        invalidate(user_ids)
+    return len(missing), len(stale)
@@ -0,0 +1,168 @@
+# payments/flutterwave_stub.py
+"""
+Local stand-in for the parts of the Flutterwave v3 API we call.
+
+Used by the payments tests and benchmark commands; point FLW_BASE_URL at
+StubFlutterwaveServer.url to run the app against it.
+"""
+import itertools
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+STUB_BANKS = [
+    {"id": 1, "code": "CRDB", "name": "CRDB Bank"},
+    {"id": 2, "code": "NMB", "name": "NMB Bank"},
+    {"id": 3, "code": "NBC", "name": "National Bank of Commerce"},
+]
+
+
+def transaction_data(transaction_id, tx_ref, amount, currency='TZS', status='successful', **extra):
+    """A transaction object shaped like Flutterwave's verify/webhook "data" field"""
+    data = {
+        "id": transaction_id,
+        "tx_ref": tx_ref,
+        "flw_ref": f"FLW-STUB-{tx_ref}",
+        "amount": float(amount),
+        "charged_amount": float(amount),
+        "currency": currency,
+        "status": status,
+        "payment_type": "mobilemoneytz",
+    }
+    data.update(extra)
+    return data
+
+
+def webhook_payload(data, event='charge.completed'):
+    return {"event": event, "data": data}
+
+
+class StubFlutterwaveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without this Nagle plus
+        # delayed ACKs add ~40ms to every keep-alive response.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.stub.count('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def _respond(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, payload = self.server.stub.dispatch(method, self.path, body, self.headers)
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubFlutterwaveServer:
+    """Threaded HTTP server answering like Flutterwave, with injectable latency and failures"""
+
+    def __init__(self, latency=0.0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.fail_next = 0
+        self.transactions = {}
+        self._by_ref = {}
+        self.counters = {'requests': 0, 'connections': 0}
+        self._ids = itertools.count(100000)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), StubFlutterwaveHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.counters['requests']
+
+    @property
+    def connections(self):
+        return self.counters['connections']
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def add_transaction(self, tx_ref, amount, currency='TZS', status='successful', **extra):
+        """Register a transaction the stub will report on verify calls"""
+        data = transaction_data(next(self._ids), tx_ref, amount, currency, status, **extra)
+        with self._lock:
+            self.transactions[data["id"]] = data
+            self._by_ref[tx_ref] = data
+        return data
+
+    def dispatch(self, method, path, body, headers):
+        self.count('requests')
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return 503, {"status": "error", "message": "Service temporarily unavailable", "data": None}
+
+        if method == 'POST' and path == '/payments':
+            payload = json.loads(body or b'{}')
+            return 200, {
+                "status": "success",
+                "message": "Hosted Link",
+                "data": {"link": f"{self.url}/hosted/pay/{payload.get('tx_ref', '')}"},
+            }
+
+        url = urlsplit(path)
+        if method == 'GET' and url.path == '/transactions/verify_by_reference':
+            tx_ref = parse_qs(url.query).get('tx_ref', [''])[0]
+            data = self._by_ref.get(tx_ref)
+            if data is None:
+                return 404, {"status": "error", "message": "No transaction was found for this reference", "data": None}
+            return 200, {"status": "success", "message": "Transaction fetched successfully", "data": data}
+
+        match = re.fullmatch(r'/transactions/(\d+)/verify', path)
+        if method == 'GET' and match:
+            data = self.transactions.get(int(match.group(1)))
+            if data is None:
+                return 404, {"status": "error", "message": "No transaction was found for this id", "data": None}
+            return 200, {"status": "success", "message": "Transaction fetched successfully", "data": data}
+
+        match = re.fullmatch(r'/banks/([A-Z]{2})', path)
+        if method == 'GET' and match:
+            return 200, {"status": "success", "message": "Banks fetched successfully", "data": STUB_BANKS}
+
+        return 404, {"status": "error", "message": f"Unknown endpoint {method} {path}", "data": None}
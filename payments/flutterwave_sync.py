@@ -0,0 +1,110 @@
+# payments/flutterwave_sync.py
+"""
+Apply Flutterwave transaction results (from webhooks or verify calls) to
+FlutterwaveTransaction and Payment rows in set-based writes.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+from .confirmation import confirm_payments
+from .entitlements import sync_users
+from .models import FlutterwaveTransaction, Payment
+from .revenue import refresh_days
+
+# Flutterwave transaction status -> Payment.status
+PAYMENT_STATUS = {
+    'successful': 'Completed',
+    'failed': 'Rejected',
+}
+
+
+def _amount(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError):
+        return None
+
+
+def _covers(result, amount, currency):
+    """A successful charge only counts if it paid at least the expected amount in the expected currency"""
+    paid = _amount(result.get('amount'))
+    return (
+        paid is not None
+        and paid >= amount
+        and (result.get('currency') or '').upper() == (currency or '').upper()
+    )
+
+
+def apply_transaction_results(results):
+    """
+    Apply a batch of Flutterwave transaction payloads ("data" objects).
+
+    Returns {tx_ref: outcome} where outcome is one of 'successful', 'failed',
+    'pending', 'mismatch' (paid amount/currency doesn't match) or 'unknown'
+    (no local transaction or payment for that reference).
+    """
+    latest = {}
+    for result in results:
+        if result.get('tx_ref'):
+            latest[result['tx_ref']] = result
+    if not latest:
+        return {}
+
+    outcomes = {}
+    transactions = FlutterwaveTransaction.objects.filter(tx_ref__in=latest)
+    payments = {
+        row['reference_number']: row
+        for row in Payment.objects.filter(reference_number__in=latest).values(
+            'reference_number', 'amount', 'currency__code', 'is_confirmed', 'user_id', 'created_at'
+        )
+    }
+
+    now = timezone.now()
+    changed = []
+    for tx in transactions:
+        result = latest[tx.tx_ref]
+        status = result.get('status')
+        if status == 'successful' and not _covers(result, tx.amount, tx.currency):
+            outcomes[tx.tx_ref] = 'mismatch'
+            continue
+        outcomes[tx.tx_ref] = status if status in PAYMENT_STATUS else 'pending'
+        # 'successful' is terminal; a late 'failed' delivery must not undo it
+        if status in PAYMENT_STATUS and tx.status not in (status, 'successful'):
+            tx.status = status
+            tx.flw_transaction_id = result.get('id') or tx.flw_transaction_id
+            tx.payment_type = result.get('payment_type') or tx.payment_type
+            tx.updated_at = now   # bulk_update skips auto_now
+            changed.append(tx)
+    if changed:
+        FlutterwaveTransaction.objects.bulk_update(changed, ['status', 'flw_transaction_id', 'payment_type', 'updated_at'])
+
+    confirmed, rejected = [], []
+    for reference, payment in payments.items():
+        result = latest[reference]
+        status = result.get('status')
+        if status == 'successful':
+            if not _covers(result, payment['amount'], payment['currency__code']):
+                outcomes[reference] = 'mismatch'
+                continue
+            confirmed.append(reference)
+        elif status == 'failed' and not payment['is_confirmed']:
+            rejected.append(reference)
+        outcomes.setdefault(reference, status if status in PAYMENT_STATUS else 'pending')
+
+    if confirmed:
+        # Grants, notifications, caches and the summary for these come from the shared service
+        confirm_payments(Payment.objects.filter(reference_number__in=confirmed))
+    if rejected:
+        Payment.objects.filter(reference_number__in=rejected).update(status=PAYMENT_STATUS['failed'], updated_at=now)
+        # update() skips post_save, so refresh entitlements here
+        sync_users(payments[reference]['user_id'] for reference in rejected)
+
+    # ...and the revenue summary for every other day whose rows changed
+    days = {timezone.localdate(tx.created_at) for tx in changed}
+    days |= {timezone.localdate(payments[reference]['created_at']) for reference in rejected}
+    refresh_days(days)
+
+    for reference in latest:
+        outcomes.setdefault(reference, 'unknown')
+    return outcomes
@@ -1,23 +1,103 @@
 # payments/flutterwave_utils.py
+import logging
+import threading
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.flutterwave.com/v3"
+DEFAULT_TIMEOUT = (3.05, 15)          # (connect, read) seconds
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_POOL_SIZE = 10
+DEFAULT_BANKS_CACHE_TTL = 60 * 60 * 24
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(retries=None, backoff=None, pool_size=None):
+    """
+    Create a keep-alive session with a bounded connection pool.
+
+    Connection failures are retried for every method because the request
+    never reached Flutterwave; read timeouts and 5xx/429 answers are only
+    retried for GET, so a payment is never initiated twice.
+    """
+    retries = getattr(settings, 'FLW_MAX_RETRIES', DEFAULT_MAX_RETRIES) if retries is None else retries
+    backoff = getattr(settings, 'FLW_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF) if backoff is None else backoff
+    pool_size = getattr(settings, 'FLW_POOL_SIZE', DEFAULT_POOL_SIZE) if pool_size is None else pool_size
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Process-wide session shared by every FlutterwaveAPI instance"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
 
 class FlutterwaveAPI:
-    base_url = "https://api.flutterwave.com/v3"
-    
-    def __init__(self):
+    def __init__(self, session=None, timeout=None):
         self.public_key = settings.FLW_PUBLIC_KEY
         self.secret_key = settings.FLW_SECRET_KEY
         self.encryption_key = settings.FLW_ENCRYPTION_KEY
+        self.base_url = getattr(settings, 'FLW_BASE_URL', DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = timeout or getattr(settings, 'FLW_TIMEOUT', DEFAULT_TIMEOUT)
+        self.session = session or get_session()
         self.headers = {
             'Authorization': f'Bearer {self.secret_key}',
             'Content-Type': 'application/json'
         }
-    
+
+    def _request(self, method, path, **kwargs):
+        """
+        Call the API and return its JSON body.
+
+        Network failures and non-JSON answers come back in Flutterwave's own
+        error shape so callers only ever check response['status'].
+        """
+        url = f"{self.base_url}{path}"
+        try:
+            response = self.session.request(method, url, headers=self.headers, timeout=self.timeout, **kwargs)
+            return response.json()
+        except requests.JSONDecodeError:
+            # Subclasses RequestException, so it has to be caught first
+            logger.warning("Flutterwave %s %s returned non-JSON (HTTP %s)", method, path, response.status_code)
+            return {'status': 'error', 'message': f"Unexpected response (HTTP {response.status_code})", 'data': None}
+        except requests.RequestException as e:
+            logger.warning("Flutterwave %s %s failed: %s", method, path, e)
+            return {'status': 'error', 'message': f"Flutterwave request failed: {e}", 'data': None}
+
     def initiate_payment(self, data):
         """Initiate a payment transaction"""
-        url = f"{self.base_url}/payments"
         payload = {
             "tx_ref": data['tx_ref'],
             "amount": data['amount'],
@@ -34,18 +114,23 @@ class FlutterwaveAPI:
                 "logo": data.get('logo_url', 'https://yourdomain.com/logo.png')
             }
         }
-        
-        response = requests.post(url, headers=self.headers, json=payload)
-        return response.json()
-    
+        return self._request('POST', '/payments', json=payload)
+
     def verify_transaction(self, transaction_id):
         """Verify a transaction"""
-        url = f"{self.base_url}/transactions/{transaction_id}/verify"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
-    
+        return self._request('GET', f'/transactions/{transaction_id}/verify')
+
+    def verify_by_reference(self, tx_ref):
+        """Verify a transaction by our own tx_ref (when the Flutterwave id isn't known yet)"""
+        return self._request('GET', '/transactions/verify_by_reference', params={'tx_ref': tx_ref})
+
     def get_banks(self, country='TZ'):
-        """Get list of banks for a country"""
-        url = f"{self.base_url}/banks/{country}"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
\ No newline at end of file
+        """Get list of banks for a country (cached, the list rarely changes)"""
+        cache_key = f"flutterwave:banks:{country}"
+        banks = cache.get(cache_key)
+        if banks is None:
+            banks = self._request('GET', f'/banks/{country}')
+            if banks.get('status') == 'success':
+                ttl = getattr(settings, 'FLW_BANKS_CACHE_TTL', DEFAULT_BANKS_CACHE_TTL)
+                cache.set(cache_key, banks, ttl)
+        return banks
@@ -1,14 +1,61 @@
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+
 from .models import Payment
+from .registry import get_registry
+
+
+class RegistryChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField that validates against the reference-data registry instead of the database"""
+
+    def __init__(self, *args, lookup=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookup = lookup
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            obj = getattr(get_registry(), self.lookup)(int(value))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        return obj
+
 
 class PaymentForm(forms.ModelForm):
     class Meta:
         model = Payment
         fields = ['quote_request', 'amount', 'currency', 'method', 'reference_number', 'receipt']
+        field_classes = {'currency': RegistryChoiceField, 'method': RegistryChoiceField}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        registry = get_registry()
+        empty = [('', self.fields['currency'].empty_label)]
+        self.fields['currency'].lookup = 'currency_by_pk'
+        self.fields['currency'].choices = empty + registry.currency_choices()
+        self.fields['method'].lookup = 'method_by_pk'
+        self.fields['method'].choices = empty + registry.method_choices()
 
 
 class ReceiptUploadForm(forms.ModelForm):
     class Meta:
         model = Payment
         fields = ["receipt"]
-        labels = {"receipt": "Upload Receipt"}
\ No newline at end of file
+        labels = {"receipt": "Upload Receipt"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Payment.receipt is blank=True, but this form exists to upload one
+        self.fields["receipt"].required = True
+
+    def clean_receipt(self):
+        receipt = self.cleaned_data.get("receipt")
+        max_size = getattr(settings, "RECEIPT_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+        if receipt and receipt.size > max_size:
+            raise ValidationError(f"Receipt is too large; the limit is {filesizeformat(max_size)}.")
+        return receipt
@@ -0,0 +1,89 @@
+# payments/history.py
+"""
+Payment history pages for one user.
+
+Pages are keyset-paginated on (created_at, id) so every page is the same
+cheap index range scan on (user, created_at) however far back the user
+scrolls, and each page costs a fixed number of queries.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Count, Prefetch, Q, Sum
+
+from .models import Payment, PaymentTransaction
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(payment):
+    raw = f"{payment.created_at.isoformat()}|{payment.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """(created_at, pk) from a cursor, or None if it's missing or malformed"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def history_page(user, cursor=None, page_size=PAGE_SIZE):
+    """Return (payments, next_cursor); next_cursor is None on the last page"""
+    payments = (
+        Payment.objects.filter(user=user)
+        .select_related('currency', 'method', 'video', 'course', 'booking', 'quote_request')
+        .prefetch_related(
+            Prefetch('transactions', queryset=PaymentTransaction.objects.order_by('-transaction_date'))
+        )
+        .order_by('-created_at', '-id')
+    )
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        payments = payments.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = list(payments[:page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
+
+
+def history_totals(user):
+    """Amount and count per (currency, status), grouped in the database"""
+    return list(
+        Payment.objects.filter(user=user)
+        .values('currency__code', 'status')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by('currency__code', 'status')
+    )
+
+
+def serialize_payment(payment):
+    return {
+        'reference': payment.reference_number,
+        'amount': str(payment.amount),
+        'currency': payment.currency.code,
+        'method': payment.method.name,
+        'status': payment.status,
+        'confirmed': payment.is_confirmed,
+        'created_at': payment.created_at.isoformat(),
+        'video': payment.video.title if payment.video else None,
+        'course': payment.course.title if payment.course else None,
+        'booking_id': payment.booking_id,
+        'quote_request_id': payment.quote_request_id,
+        'transactions': [
+            {
+                'provider_reference': tx.provider_reference,
+                'provider_status': tx.provider_status,
+                'transaction_date': tx.transaction_date.isoformat(),
+            }
+            for tx in payment.transactions.all()
+        ],
+    }
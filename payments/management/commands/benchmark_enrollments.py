@@ -0,0 +1,83 @@
+# payments/management/commands/benchmark_enrollments.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+
+from lessons.models import Course, Enrollment
+from payments.enrollments import annotate_courses, enrollment_count, is_enrolled
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare enrollment checks that load every student with indexed/cached lookups (runs in a rolled-back transaction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enrollments', type=int, default=100_000, help='Enrollments per course')
+        parser.add_argument('--courses', type=int, default=2)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            courses, user = self.seed(options['enrollments'], options['courses'])
+            course = courses[0]
+            repeat = options['repeat']
+
+            self.compare(
+                'membership',
+                lambda: user in User.objects.filter(enrollments__course=course, enrollments__is_active=True),
+                lambda: is_enrolled(user, course.id),
+                repeat,
+            )
+            self.compare(
+                'count',
+                lambda: len(course.active_enrollments),
+                lambda: enrollment_count(course.id),
+                repeat,
+            )
+            self.compare(
+                'course list',
+                lambda: [
+                    (len(c.active_enrollments), user in User.objects.filter(enrollments__course=c))
+                    for c in Course.objects.filter(id__in=[c.id for c in courses])
+                ],
+                lambda: annotate_courses(Course.objects.filter(id__in=[c.id for c in courses]), user),
+                repeat,
+            )
+            transaction.set_rollback(True)
+        cache.delete_many([f"enrollments:count:{c.id}" for c in courses])
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark finished, data rolled back'))
+
+    def seed(self, per_course, course_count):
+        started = time.perf_counter()
+        prefix = f"bench-enrol-{int(time.time())}"
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}-{n}", email=f"{prefix}-{n}@example.com", password='!') for n in range(per_course)],
+            batch_size=5000,
+        )
+        if not users[0].pk:
+            users = list(User.objects.filter(username__startswith=prefix).order_by('pk'))
+        courses = Course.objects.bulk_create([
+            Course(title=f"Benchmark course {n}", description='-', price=0, duration_weeks=1) for n in range(course_count)
+        ])
+        if not courses[0].pk:
+            courses = list(Course.objects.filter(title__startswith='Benchmark course').order_by('-pk')[:course_count])
+        for course in courses:
+            Enrollment.objects.bulk_create(
+                [Enrollment(user=u, course=course) for u in users], batch_size=5000,
+            )
+        self.stdout.write(f"Seeded {per_course * course_count} enrollments in {time.perf_counter() - started:.1f}s")
+        return courses, users[-1]
+
+    def compare(self, label, before, after, repeat):
+        for name, func in (('load all', before), ('indexed/cached', after)):
+            reset_queries()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            per_call = (time.perf_counter() - started) / repeat * 1000
+            queries = len(connection.queries) / repeat if connection.queries_logged else float('nan')
+            self.stdout.write(f"{label:12} {name:15} {per_call:9.2f} ms/call  {queries:5.1f} queries/call")
@@ -0,0 +1,46 @@
+# payments/management/commands/benchmark_flutterwave.py
+import statistics
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from payments.flutterwave_stub import StubFlutterwaveServer
+from payments.flutterwave_utils import FlutterwaveAPI, build_session
+
+
+class Command(BaseCommand):
+    help = 'Compare per-call latency of the pooled Flutterwave client with one-connection-per-call requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Verify calls per client')
+        parser.add_argument('--latency', type=float, default=0.0, help='Artificial stub latency in seconds')
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        with StubFlutterwaveServer(latency=options['latency']) as stub:
+            tx = stub.add_transaction('BENCH-1', amount=1000)
+
+            api = FlutterwaveAPI(session=build_session())
+            api.base_url = stub.url
+            self.measure('pooled session', stub, calls, lambda: api.verify_transaction(tx['id']))
+
+            url = f"{stub.url}/transactions/{tx['id']}/verify"
+            self.measure('new connection per call', stub, calls,
+                         lambda: requests.get(url, headers=api.headers, timeout=api.timeout).json())
+
+    def measure(self, label, stub, calls, call):
+        connections_before = stub.connections
+        timings = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label:<26} mean {statistics.mean(timings):7.3f} ms  "
+            f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms  "
+            f"connections {stub.connections - connections_before}"
+        )
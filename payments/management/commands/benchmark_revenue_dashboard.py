@@ -0,0 +1,69 @@
+# payments/management/commands/benchmark_revenue_dashboard.py
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Mod, TruncDate
+from django.utils import timezone
+
+from payments.models import Currency, Payment, PaymentMethod
+from payments.revenue import dashboard_data, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Time the revenue dashboard against raw Payment aggregation as volume grows (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            name = f"bench-revenue-{int(time.time())}"
+            user = get_user_model().objects.create_user(email=f"{name}@example.com", username=name)
+            currency = Currency.objects.first() or Currency.objects.create(code='TZS', symbol='TSh')
+            methods = list(PaymentMethod.objects.all()[:3]) or [PaymentMethod.objects.create(name='Benchmark')]
+            now = timezone.now()
+            total = 0
+            for size in sorted(options['sizes']):
+                Payment.objects.bulk_create([
+                    Payment(
+                        user=user, amount=Decimal(random.randint(1, 500) * 100), currency=currency,
+                        method=random.choice(methods), reference_number=f"BENCH-{user.pk}-{n}",
+                        status=random.choice(['Completed', 'Completed', 'Pending', 'Rejected']),
+                    )
+                    for n in range(total, size)
+                ], batch_size=5000)
+                # auto_now_add overwrites created_at on insert, so spread rows over 90 days afterwards
+                bucket = Payment.objects.filter(user=user).annotate(bucket=Mod('id', 90))
+                for offset in range(90):
+                    bucket.filter(bucket=offset).update(created_at=now - timedelta(days=offset))
+                total = size
+                rebuild()
+
+                self.stdout.write(
+                    f"{size:>9} payments: dashboard {self.time(dashboard_data, options['repeat']):8.2f} ms, "
+                    f"raw scan {self.time(self.raw_scan, options['repeat']):8.2f} ms"
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark finished, data rolled back'))
+
+    def raw_scan(self):
+        since = timezone.now() - timedelta(days=30)
+        return list(
+            Payment.objects.filter(created_at__gte=since)
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'currency__code', 'status')
+            .annotate(n=Count('id'), total=Sum('amount'))
+        )
+
+    def time(self, func, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat * 1000
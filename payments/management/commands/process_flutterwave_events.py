@@ -0,0 +1,34 @@
+# payments/management/commands/process_flutterwave_events.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.webhooks import process_pending_events
+
+
+class Command(BaseCommand):
+    help = 'Apply stored Flutterwave webhook events to transactions and payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when no event is due')
+        parser.add_argument(
+            '--verify', action='store_true',
+            default=getattr(settings, 'FLW_WEBHOOK_VERIFY', False),
+            help='Re-fetch each transaction from Flutterwave instead of trusting the delivered body',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            handled = process_pending_events(batch_size=options['batch_size'], verify=options['verify'])
+            total += handled
+            if handled:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} webhook event(s) processed"))
@@ -0,0 +1,52 @@
+# payments/management/commands/process_receipts.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from payments.models import Payment
+from payments.receipts import process_receipt
+
+
+class Command(BaseCommand):
+    help = 'Strip metadata from, downscale and thumbnail uploaded payment receipts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds to sleep when nothing is waiting')
+
+    def handle(self, *args, **options):
+        processed = 0
+        last_pk = 0
+        while True:
+            pending = list(
+                Payment.objects.filter(receipt_processed_at__isnull=True, pk__gt=last_pk)
+                .exclude(receipt='').exclude(receipt__isnull=True)
+                .order_by('pk')[:options['batch_size']]
+            )
+            if not pending:
+                if not options['loop']:
+                    break
+                last_pk = 0
+                time.sleep(options['interval'])
+                continue
+
+            for payment in pending:
+                fields = process_receipt(payment)
+                # Only touch the receipt columns so a concurrent status change isn't overwritten
+                Payment.objects.filter(pk=payment.pk).update(**{f: getattr(payment, f) for f in fields})
+                processed += 1
+            last_pk = pending[-1].pk
+
+        duplicates = (
+            Payment.objects.exclude(receipt_hash='')
+            .values('receipt_hash')
+            .order_by()
+            .annotate(n=Count('id'))
+            .filter(n__gt=1)
+            .count()
+        )
+        self.stdout.write(self.style.SUCCESS(f"✓ {processed} receipt(s) processed"))
+        if duplicates:
+            self.stdout.write(self.style.WARNING(f"{duplicates} receipt image(s) are attached to more than one payment"))
@@ -0,0 +1,32 @@
+# payments/management/commands/rebuild_entitlements.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from payments.entitlements import sync_users
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the Entitlement table from payments, video purchases and enrollments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per batch')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+        granted = revoked = scanned = 0
+        last_pk = 0
+        started = time.perf_counter()
+        while True:
+            batch = list(users.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            added, removed = sync_users(batch)
+            granted += added
+            revoked += removed
+            scanned += len(batch)
+            last_pk = batch[-1]
+
+        self.stdout.write(f"{scanned} users checked in {time.perf_counter() - started:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"✓ {granted} entitlement(s) granted, {revoked} revoked"))
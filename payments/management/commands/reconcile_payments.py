@@ -0,0 +1,64 @@
+# payments/management/commands/reconcile_payments.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from payments.flutterwave_stub import StubFlutterwaveServer
+from payments.models import FlutterwaveTransaction
+from payments.reconciliation import SOURCES, Reconciler
+
+
+class Command(BaseCommand):
+    help = 'Verify pending Flutterwave transactions/payments against the provider and apply the results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', choices=[*SOURCES, 'all'], default='transactions',
+            help='"payments" also checks pending Payment references with no FlutterwaveTransaction row',
+        )
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent verify calls')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--min-age', type=int, default=10, help='Skip rows younger than this many minutes')
+        parser.add_argument('--limit', type=int, help='Stop after this many rows; the next run resumes')
+        parser.add_argument('--reset', action='store_true', help='Ignore the checkpoint and start from the first row')
+        parser.add_argument(
+            '--stub', action='store_true',
+            help='Run against a local stub provider that reports every pending transaction as paid',
+        )
+        parser.add_argument('--stub-latency', type=float, default=0.05, help='Seconds per stub call')
+
+    def handle(self, *args, **options):
+        stub = None
+        reconciler = Reconciler(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            min_age=timedelta(minutes=options['min_age']),
+        )
+        if options['stub']:
+            stub = StubFlutterwaveServer(latency=options['stub_latency']).start()
+            for tx in FlutterwaveTransaction.objects.filter(status='pending').iterator():
+                stub.add_transaction(tx.tx_ref, tx.amount, tx.currency)
+            reconciler.api.base_url = stub.url
+            self.stdout.write(f"Using stub provider at {stub.url}")
+
+        sources = list(SOURCES) if options['source'] == 'all' else [options['source']]
+        try:
+            for source in sources:
+                stats = reconciler.run(source, reset=options['reset'], limit=options['limit'])
+                self.report(source, stats)
+        finally:
+            if stub is not None:
+                stub.stop()
+
+    def report(self, source, stats):
+        self.stdout.write(
+            f"{source}: {stats.get('scanned', 0)} checked in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_second']:.0f} rows/s) — "
+            f"{stats.get('successful', 0)} successful, {stats.get('failed', 0)} failed, "
+            f"{stats.get('pending', 0)} still pending, {stats.get('mismatch', 0)} amount mismatch, "
+            f"{stats.get('unverified', 0)} not verifiable"
+        )
+        if stats['completed']:
+            self.stdout.write(self.style.SUCCESS(f"✓ {source} reconciled"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{source}: stopped early, the next run resumes from the checkpoint"))
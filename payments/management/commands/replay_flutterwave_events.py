@@ -0,0 +1,56 @@
+# payments/management/commands/replay_flutterwave_events.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from payments.models import FlutterwaveWebhookEvent
+from payments.webhooks import process_pending_events, record_event
+
+
+class Command(BaseCommand):
+    help = 'Re-queue stored Flutterwave webhook events, or load raw deliveries from a JSON-lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help='event_id values to replay')
+        parser.add_argument('--status', choices=['processed', 'ignored', 'failed'], help='Replay every event in this state')
+        parser.add_argument('--tx-ref', help='Replay every event for this tx_ref')
+        parser.add_argument('--since', help='Only events received at or after this ISO datetime')
+        parser.add_argument('--file', help='JSON-lines file of raw webhook bodies to ingest')
+        parser.add_argument('--process', action='store_true', help='Process the queue right away')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            loaded = 0
+            with open(options['file'], 'rb') as handle:
+                for line in handle:
+                    if line.strip() and record_event(line.strip()):
+                        loaded += 1
+            self.stdout.write(f"{loaded} delivery(ies) read from {options['file']} (duplicates are skipped)")
+
+        events = FlutterwaveWebhookEvent.objects.exclude(status='received')
+        selected = False
+        if options['event_ids']:
+            events, selected = events.filter(event_id__in=options['event_ids']), True
+        if options['status']:
+            events, selected = events.filter(status=options['status']), True
+        if options['tx_ref']:
+            events, selected = events.filter(tx_ref=options['tx_ref']), True
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+            events, selected = events.filter(received_at__gte=since), True
+
+        if selected:
+            requeued = events.update(
+                status='received', attempts=0, error='', next_attempt_at=timezone.now(), processed_at=None,
+            )
+            self.stdout.write(f"{requeued} event(s) re-queued")
+        elif not options['file']:
+            raise CommandError('Give event ids, --status, --tx-ref, --since or --file')
+
+        if options['process']:
+            total = 0
+            while handled := process_pending_events():
+                total += handled
+            self.stdout.write(self.style.SUCCESS(f"✓ {total} event(s) processed"))
@@ -0,0 +1,72 @@
+# payments/management/commands/send_stub_webhooks.py
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.flutterwave_stub import transaction_data, webhook_payload
+from payments.flutterwave_utils import build_session
+from payments.models import FlutterwaveTransaction
+
+
+class Command(BaseCommand):
+    help = 'Fire bursts of signed stub Flutterwave webhooks at an endpoint to load-test ingestion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/payments/webhooks/flutterwave/')
+        parser.add_argument('--count', type=int, default=500, help='Unique events to send')
+        parser.add_argument('--duplicates', type=float, default=0.2, help='Fraction of events delivered twice')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--secret-hash', default=getattr(settings, 'FLW_SECRET_HASH', ''))
+        parser.add_argument(
+            '--from-db', action='store_true',
+            help='Report pending FlutterwaveTransaction rows as successful instead of random references',
+        )
+
+    def handle(self, *args, **options):
+        bodies = [json.dumps(webhook_payload(data)).encode('utf-8') for data in self.build_events(options)]
+        bodies += random.sample(bodies, int(len(bodies) * options['duplicates']))
+        random.shuffle(bodies)
+
+        session = build_session(retries=0, pool_size=options['concurrency'])
+        headers = {'Content-Type': 'application/json', 'verif-hash': options['secret_hash']}
+
+        def send(body):
+            started = time.perf_counter()
+            try:
+                status = session.post(options['url'], data=body, headers=headers, timeout=(3, 10)).status_code
+            except requests.RequestException:
+                status = 'error'
+            return status, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            responses = list(pool.map(send, bodies))
+        elapsed = time.perf_counter() - started
+
+        statuses = Counter(status for status, _ in responses)
+        timings = sorted(ms for _, ms in responses)
+        self.stdout.write(f"{len(bodies)} deliveries in {elapsed:.2f}s ({len(bodies) / elapsed:.0f}/s)")
+        self.stdout.write(f"responses: {dict(statuses)}")
+        self.stdout.write(
+            f"latency p50 {statistics.median(timings):.1f} ms, "
+            f"p95 {timings[max(0, int(len(timings) * 0.95) - 1)]:.1f} ms, max {timings[-1]:.1f} ms"
+        )
+
+    def build_events(self, options):
+        if options['from_db']:
+            pending = FlutterwaveTransaction.objects.filter(status='pending').order_by('id')[:options['count']]
+            return [
+                transaction_data(900000 + tx.id, tx.tx_ref, tx.amount, tx.currency)
+                for tx in pending
+            ]
+        return [
+            transaction_data(800000 + n, f"STUB-{n}", random.randint(1, 100) * 1000)
+            for n in range(options['count'])
+        ]
@@ -0,0 +1,36 @@
+# payments/management/commands/warm_qr_cache.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.qr_cache import PAYMENT_NUMBERS, QRImageCache, qr_text
+from payments.views import PAYABLE
+
+
+class Command(BaseCommand):
+    help = 'Pre-render payment QR images to the on-disk QR cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--types', nargs='+', choices=list(PAYABLE), default=['course', 'video', 'booking'],
+            help='Object types to warm',
+        )
+        parser.add_argument('--methods', nargs='+', choices=list(PAYMENT_NUMBERS), default=list(PAYMENT_NUMBERS))
+
+    def handle(self, *args, **options):
+        # Only the disk tier outlives this process, so keep the memory tier tiny
+        qr_cache = QRImageCache(max_items=1)
+        started = time.perf_counter()
+        for obj_type in options['types']:
+            model, amount_field = PAYABLE[obj_type]
+            priced = model.objects.filter(**{f"{amount_field}__gt": 0}).values_list('id', amount_field)
+            for obj_id, amount in priced.iterator():
+                for method in options['methods']:
+                    qr_cache.get(qr_text(obj_type, obj_id, method, amount))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{qr_cache.stats['rendered']} rendered, {qr_cache.stats['disk']} already on disk "
+            f"in {elapsed:.2f}s ({qr_cache.directory})"
+        )
+        self.stdout.write(self.style.SUCCESS('✓ QR cache warm'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_alter_payment_options_payment_is_confirmed_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlutterwaveWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=120, unique=True)),
+                ('event_type', models.CharField(blank=True, max_length=50)),
+                ('tx_ref', models.CharField(blank=True, max_length=100)),
+                ('payload', models.TextField()),
+                ('status', models.CharField(choices=[('received', 'Received'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='received', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='payments_fl_status_c6cfc6_idx'), models.Index(fields=['tx_ref'], name='payments_fl_tx_ref_f57f00_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_reconciliationcheckpoint_flutterwave_status_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Entitlement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_type', models.CharField(choices=[('video', 'Video'), ('course', 'Course')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('source', models.CharField(choices=[('payment', 'Payment'), ('purchase', 'Video purchase'), ('enrollment', 'Enrollment')], max_length=10)),
+                ('granted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entitlements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'product_type', 'object_id'), name='unique_entitlement')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_amount'),
+        ('content', '0004_video_price_videopurchase'),
+        ('lessons', '0002_alter_enrollment_course_alter_enrollment_payment_and_more'),
+        ('payments', '0009_entitlement'),
+        ('quotes', '0002_quoterequest_amount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', 'created_at'], name='payment_user_created_idx'),
+        ),
+    ]
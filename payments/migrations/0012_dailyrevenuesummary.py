@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0011_payment_receipt_processing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=10)),
+                ('method', models.CharField(max_length=100)),
+                ('product_type', models.CharField(choices=[('video', 'Video'), ('course', 'Course'), ('booking', 'Booking'), ('quote', 'Quote'), ('other', 'Other')], max_length=10)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily revenue summaries',
+                'ordering': ['-day', 'currency', 'method', 'product_type', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'currency', 'method', 'product_type', 'status'), name='unique_daily_revenue_key')],
+            },
+        ),
+    ]
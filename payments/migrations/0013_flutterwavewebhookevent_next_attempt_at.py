@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0012_dailyrevenuesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flutterwavewebhookevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -53,12 +53,20 @@ class Payment(models.Model):
 
     # ✅ New fields
     receipt = models.ImageField(upload_to="receipts/", null=True, blank=True)
+    receipt_hash = models.CharField(max_length=64, blank=True, db_index=True)  # sha256 of the uploaded file
+    receipt_thumbnail = models.ImageField(upload_to="receipts/thumbs/", null=True, blank=True)
+    receipt_processed_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Pending")
     is_confirmed = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='payment_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.reference_number} ({self.status})"
     
@@ -102,5 +110,124 @@ class FlutterwaveTransaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),   # reconcile_payments keyset scan
+        ]
+
+    def __str__(self):
+        return f"{self.tx_ref} - {self.amount}"
+
+
+class FlutterwaveWebhookEvent(models.Model):
+    """Raw webhook delivery, stored on receipt and applied later by process_flutterwave_events"""
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    event_id = models.CharField(max_length=120, unique=True)  # dedupe key for redeliveries
+    event_type = models.CharField(max_length=50, blank=True)
+    tx_ref = models.CharField(max_length=100, blank=True)
+    payload = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Not picked up before this time: retry backoff, or a worker's lease while it verifies
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            models.Index(fields=['tx_ref']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} ({self.status})"
+
+
+class ReconciliationCheckpoint(models.Model):
+    """Last row reached by a reconcile_payments pass, so an interrupted run resumes"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+class Entitlement(models.Model):
+    """
+    One row per thing a user may access, whichever record granted it
+    (confirmed Payment, VideoPurchase or active Enrollment).
+    Maintained by payments.entitlements; read with get_entitlements().
+    """
+    PRODUCT_CHOICES = [
+        ('video', 'Video'),
+        ('course', 'Course'),
+    ]
+    SOURCE_CHOICES = [
+        ('payment', 'Payment'),
+        ('purchase', 'Video purchase'),
+        ('enrollment', 'Enrollment'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='entitlements')
+    product_type = models.CharField(max_length=10, choices=PRODUCT_CHOICES)
+    object_id = models.PositiveIntegerField()
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    granted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product_type', 'object_id'], name='unique_entitlement'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} → {self.product_type} #{self.object_id}"
+
+
+class DailyRevenueSummary(models.Model):
+    """
+    Per-day totals of payments, refunds and gateway transactions, kept current
+    by payments.revenue so reports never scan the raw tables.
+
+    Refund rows use status 'Refunded'; FlutterwaveTransaction rows use
+    method 'Flutterwave' and the gateway's lowercase statuses.
+    """
+    PRODUCT_CHOICES = [
+        ('video', 'Video'),
+        ('course', 'Course'),
+        ('booking', 'Booking'),
+        ('quote', 'Quote'),
+        ('other', 'Other'),
+    ]
+
+    day = models.DateField()
+    currency = models.CharField(max_length=10)
+    method = models.CharField(max_length=100)
+    product_type = models.CharField(max_length=10, choices=PRODUCT_CHOICES)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Daily revenue summaries"
+        ordering = ['-day', 'currency', 'method', 'product_type', 'status']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'currency', 'method', 'product_type', 'status'], name='unique_daily_revenue_key'
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.tx_ref} - {self.amount}"
\ No newline at end of file
+        return f"{self.day} {self.currency} {self.method} {self.product_type} {self.status}: {self.amount}"
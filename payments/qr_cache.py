@@ -0,0 +1,105 @@
+# payments/qr_cache.py
+"""
+Content-addressed cache for payment QR images.
+
+A QR image depends only on its text, so the sha256 of that text names the
+PNG: it's the in-memory key, the on-disk filename and the HTTP ETag. When a
+price changes the text changes too, so stale entries are never served and
+nothing has to be invalidated.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import qrcode
+from django.conf import settings
+
+# Numbers shown on the payment page and encoded in the QR images
+PAYMENT_NUMBERS = {
+    "mpesa": "68088449",
+    "airtel": "+255784567890",
+}
+
+DEFAULT_MEMORY_ITEMS = 512
+
+
+def qr_text(obj_type, obj_id, method, amount):
+    return f"PAY TO {PAYMENT_NUMBERS[method]} AMOUNT {amount} REFERENCE {obj_type.upper()}{obj_id}"
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def render_png(text):
+    buf = io.BytesIO()
+    qrcode.make(text).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class QRImageCache:
+    """Bounded LRU in memory, backed by PNG files under QR_CACHE_DIR"""
+
+    def __init__(self, directory=None, max_items=None):
+        self.directory = Path(directory or getattr(settings, 'QR_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'qr_cache'))
+        self.max_items = max_items or getattr(settings, 'QR_CACHE_MEMORY_ITEMS', DEFAULT_MEMORY_ITEMS)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory': 0, 'disk': 0, 'rendered': 0}
+
+    def path_for(self, digest):
+        return self.directory / digest[:2] / f"{digest}.png"
+
+    def get(self, text):
+        """Return (digest, png_bytes), rendering and storing the image on a miss"""
+        digest = text_digest(text)
+        with self._lock:
+            png = self._memory.get(digest)
+            if png is not None:
+                self._memory.move_to_end(digest)
+                self.stats['memory'] += 1
+                return digest, png
+
+        path = self.path_for(digest)
+        try:
+            png = path.read_bytes()
+            self.stats['disk'] += 1
+        except FileNotFoundError:
+            png = render_png(text)
+            self._write(path, png)
+            self.stats['rendered'] += 1
+
+        with self._lock:
+            self._memory[digest] = png
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return digest, png
+
+    def _write(self, path, png):
+        # Write to a temp file and rename so concurrent readers never see half a PNG
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(png)
+            os.replace(tmp, path)
+        except OSError:
+            pass   # a read-only disk just means we keep the memory tier
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_qr_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QRImageCache()
+    return _cache
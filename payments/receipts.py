@@ -0,0 +1,105 @@
+# payments/receipts.py
+"""
+Receipt uploads: hashed while they stream to disk, then shrunk later by
+process_receipts.
+
+Phone screenshots and WhatsApp photos arrive at full size with EXIF
+(sometimes GPS) attached. The background step applies the EXIF rotation,
+drops the metadata, caps the long edge, recompresses to JPEG and writes a
+small thumbnail for the admin list.
+"""
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+MAX_EDGE = 1600
+QUALITY = 80
+THUMBNAIL_EDGE = 240
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Streams the upload to a temp file and hashes each chunk on the way through"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        return upload
+
+
+def file_sha256(field_file):
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def _encode(image, max_edge, quality):
+    image = image.copy()
+    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    buf = io.BytesIO()
+    # A fresh save carries no EXIF/ICC/XMP unless we pass it along
+    image.save(buf, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def process_receipt(payment):
+    """
+    Shrink one payment's receipt and write its thumbnail.
+
+    Returns the list of changed field names; files Pillow can't read are only
+    hashed and marked processed.
+    """
+    max_edge = getattr(settings, 'RECEIPT_MAX_EDGE', MAX_EDGE)
+    quality = getattr(settings, 'RECEIPT_JPEG_QUALITY', QUALITY)
+    thumb_edge = getattr(settings, 'RECEIPT_THUMBNAIL_EDGE', THUMBNAIL_EDGE)
+
+    changed = ['receipt_processed_at']
+    if not payment.receipt_hash:
+        payment.receipt_hash = file_sha256(payment.receipt)
+        changed.append('receipt_hash')
+
+    try:
+        payment.receipt.open('rb')
+        with Image.open(payment.receipt) as original:
+            # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 instead of decoding every pixel
+            original.draft('RGB', (max_edge, max_edge))
+            image = ImageOps.exif_transpose(original).convert('RGB')
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning("Receipt for payment %s is not a readable image: %s", payment.pk, e)
+        payment.receipt_processed_at = timezone.now()
+        return changed
+    finally:
+        payment.receipt.close()
+
+    stem = os.path.splitext(os.path.basename(payment.receipt.name))[0]
+    old_name = payment.receipt.name
+    payment.receipt.save(f"{stem}.jpg", ContentFile(_encode(image, max_edge, quality)), save=False)
+    if payment.receipt.name != old_name:
+        payment.receipt.storage.delete(old_name)
+    if payment.receipt_thumbnail:
+        payment.receipt_thumbnail.delete(save=False)
+    payment.receipt_thumbnail.save(f"{stem}_thumb.jpg", ContentFile(_encode(image, thumb_edge, 70)), save=False)
+    payment.receipt_processed_at = timezone.now()
+    return changed + ['receipt', 'receipt_thumbnail']
@@ -0,0 +1,84 @@
+# payments/registry.py
+"""
+Process-local registry of currencies and active payment methods.
+
+These tables hold a handful of rows that change a few times a year, so each
+process keeps a snapshot and rebuilds it only when the shared version stamp
+moves. Saves and deletes bump the stamp through payments.signals.
+
+    registry = get_registry()
+    registry.default_currency
+    registry.method('M-Pesa')
+"""
+import threading
+
+from core.utils.cache_versions import bump_on_commit, get_version
+
+from .models import Currency, PaymentMethod
+
+VERSION_NAME = 'payments:registry'
+
+
+class ReferenceData:
+    """Immutable snapshot of the reference tables"""
+
+    def __init__(self, currencies, methods, version):
+        self.version = version
+        self.currencies = tuple(currencies)
+        self.methods = tuple(methods)
+        self._currencies_by_pk = {c.pk: c for c in self.currencies}
+        self._currencies_by_code = {c.code.upper(): c for c in self.currencies}
+        self._methods_by_pk = {m.pk: m for m in self.methods}
+        self._methods_by_name = {m.name.lower(): m for m in self.methods}
+        self.default_currency = next((c for c in self.currencies if c.is_default), None)
+        # Checkout's placeholder until the user picks a method
+        self.default_method = self.methods[0] if self.methods else None
+
+    def currency(self, code):
+        return self._currencies_by_code.get((code or '').upper())
+
+    def currency_by_pk(self, pk):
+        return self._currencies_by_pk.get(pk)
+
+    def method(self, name):
+        return self._methods_by_name.get((name or '').lower())
+
+    def method_by_pk(self, pk):
+        return self._methods_by_pk.get(pk)
+
+    def currency_choices(self):
+        return [(c.pk, str(c)) for c in self.currencies]
+
+    def method_choices(self):
+        return [(m.pk, str(m)) for m in self.methods]
+
+
+_registry = None
+_lock = threading.Lock()
+
+
+def load_registry(version):
+    return ReferenceData(
+        Currency.objects.order_by('code'),
+        PaymentMethod.objects.filter(is_active=True).order_by('id'),
+        version,
+    )
+
+
+def get_registry():
+    """The current snapshot; costs one cache read unless it has to reload"""
+    global _registry
+    version = get_version(VERSION_NAME)
+    registry = _registry
+    if registry is None or registry.version != version:
+        with _lock:
+            if _registry is None or _registry.version != version:
+                _registry = load_registry(version)
+            registry = _registry
+    return registry
+
+
+def invalidate():
+    global _registry
+    _registry = None
+    bump_on_commit(VERSION_NAME)
@@ -0,0 +1,198 @@
+# payments/revenue.py
+"""
+Maintain DailyRevenueSummary and read the admin revenue dashboard from it.
+
+Every source row (Payment, Refund, FlutterwaveTransaction) contributes a
+count and an amount to one summary key. The same grouped query computes a
+single row's contribution for the signal handlers and a whole range for
+rebuilds, so both paths always agree.
+
+Code that changes rows with update()/bulk_update() skips the signals and
+should call refresh_days() for the affected days.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, Count, F, Q, Sum, Value, When, Case
+from django.db.models.functions import Coalesce, NullIf, TruncDate
+from django.utils import timezone
+
+from .models import DailyRevenueSummary, FlutterwaveTransaction, Payment, Refund
+
+GATEWAY_METHOD = 'Flutterwave'
+REFUND_STATUS = 'Refunded'
+PAYMENT_STATUSES = ('Completed', 'Pending', 'Rejected')
+
+
+def product_type(prefix=''):
+    return Case(
+        When(**{f'{prefix}video__isnull': False}, then=Value('video')),
+        When(**{f'{prefix}course__isnull': False}, then=Value('course')),
+        When(**{f'{prefix}booking__isnull': False}, then=Value('booking')),
+        When(**{f'{prefix}quote_request__isnull': False}, then=Value('quote')),
+        default=Value('other'),
+        output_field=CharField(),
+    )
+
+
+def _payment_groups(queryset):
+    return (
+        queryset.annotate(day=TruncDate('created_at'), product=product_type())
+        .values_list('day', 'currency__code', 'method__name', 'product', 'status')
+        .annotate(n=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+
+
+def _refund_groups(queryset):
+    return (
+        queryset.annotate(day=TruncDate('refunded_at'), product=product_type('payment__'), kind=Value(REFUND_STATUS))
+        .values_list('day', 'payment__currency__code', 'payment__method__name', 'product', 'kind')
+        .annotate(n=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+
+
+def _gateway_groups(queryset):
+    return (
+        queryset.annotate(
+            day=TruncDate('created_at'),
+            product=Coalesce(NullIf('object_type', Value('')), Value('other')),
+            gateway=Value(GATEWAY_METHOD),
+        )
+        .values_list('day', 'currency', 'gateway', 'product', 'status')
+        .annotate(n=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+
+
+# model -> (date field, grouped query)
+SOURCES = {
+    Payment: ('created_at', _payment_groups),
+    Refund: ('refunded_at', _refund_groups),
+    FlutterwaveTransaction: ('created_at', _gateway_groups),
+}
+
+
+def contributions(model, queryset):
+    """{(day, currency, method, product_type, status): (count, amount)}"""
+    _, groups = SOURCES[model]
+    return {tuple(row[:5]): (row[5], row[6] or Decimal('0')) for row in groups(queryset)}
+
+
+def row_contribution(model, pk):
+    return contributions(model, model._default_manager.filter(pk=pk))
+
+
+def apply_deltas(deltas):
+    """Add (count, amount) deltas to their summary rows with F() updates"""
+    for key, (count, amount) in deltas.items():
+        if not count and not amount:
+            continue
+        lookup = dict(zip(('day', 'currency', 'method', 'product_type', 'status'), key))
+        rows = DailyRevenueSummary.objects.filter(**lookup)
+        if rows.update(count=F('count') + count, amount=F('amount') + amount):
+            continue
+        try:
+            with transaction.atomic():
+                DailyRevenueSummary.objects.create(**lookup, count=count, amount=amount)
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(count=F('count') + count, amount=F('amount') + amount)
+
+
+def diff(before, after):
+    deltas = defaultdict(lambda: (0, Decimal('0')))
+    for key, (count, amount) in before.items():
+        c, a = deltas[key]
+        deltas[key] = (c - count, a - amount)
+    for key, (count, amount) in after.items():
+        c, a = deltas[key]
+        deltas[key] = (c + count, a + amount)
+    return deltas
+
+
+def days_of(queryset, field='created_at'):
+    return set(queryset.annotate(summary_day=TruncDate(field)).values_list('summary_day', flat=True).distinct())
+
+
+def refresh_days(days):
+    """Recompute the summary rows of these days from the source tables"""
+    days = sorted(set(days))
+    if not days:
+        return 0
+    with transaction.atomic():
+        DailyRevenueSummary.objects.filter(day__in=days).delete()
+        rows = []
+        for model, (date_field, _) in SOURCES.items():
+            in_days = model._default_manager.filter(**{f'{date_field}__date__in': days})
+            rows += [
+                DailyRevenueSummary(
+                    day=key[0], currency=key[1] or '', method=key[2] or '', product_type=key[3], status=key[4],
+                    count=count, amount=amount,
+                )
+                for key, (count, amount) in contributions(model, in_days).items()
+            ]
+        DailyRevenueSummary.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild(since=None):
+    """Rebuild the whole table, or every day from `since` on; returns rows written"""
+    days = set()
+    for model, (date_field, _) in SOURCES.items():
+        queryset = model._default_manager.all()
+        if since:
+            queryset = queryset.filter(**{f'{date_field}__date__gte': since})
+        days |= days_of(queryset, date_field)
+    stale = DailyRevenueSummary.objects.all()
+    if since:
+        stale = stale.filter(day__gte=since)
+    stale.exclude(day__in=days).delete()
+    return refresh_days(days)
+
+
+def dashboard_data(days=30, today=None):
+    """Chart series for the last `days` days, read only from DailyRevenueSummary"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    summary = DailyRevenueSummary.objects.filter(day__gte=start, day__lte=today)
+
+    money = defaultdict(lambda: defaultdict(Decimal))     # currency -> day -> amount
+    refunds = defaultdict(lambda: defaultdict(Decimal))
+    attempts, completed = defaultdict(int), defaultdict(int)
+    gateway_attempts, gateway_successes = defaultdict(int), defaultdict(int)
+
+    rows = summary.filter(
+        Q(status__in=PAYMENT_STATUSES + (REFUND_STATUS,)) | Q(method=GATEWAY_METHOD)
+    ).values_list('day', 'currency', 'method', 'status').annotate(n=Sum('count'), total=Sum('amount')).order_by()
+    for day, currency, method, status, n, total in rows:
+        if status == 'Completed':
+            money[currency][day] += total
+        elif status == REFUND_STATUS:
+            refunds[currency][day] += total
+        if status in PAYMENT_STATUSES:
+            attempts[day] += n
+            completed[day] += n if status == 'Completed' else 0
+        elif method == GATEWAY_METHOD:
+            gateway_attempts[day] += n
+            gateway_successes[day] += n if status == 'successful' else 0
+
+    dates = [start + timedelta(days=n) for n in range(days)]
+
+    def series(values):
+        return [values.get(day, 0) for day in dates]
+
+    def rate(done, total):
+        return [round(100 * done[day] / total[day], 1) if total[day] else None for day in dates]
+
+    currencies = sorted(set(money) | set(refunds))
+    return {
+        'dates': dates,
+        'revenue': {currency: series(money[currency]) for currency in currencies},
+        'refunds': {currency: series(refunds[currency]) for currency in currencies},
+        'conversion': rate(completed, attempts),
+        'gateway_conversion': rate(gateway_successes, gateway_attempts),
+    }
@@ -0,0 +1,61 @@
+# payments/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import registry, revenue
+from .enrollments import invalidate_count
+from .entitlements import sync_users
+from .models import Currency, FlutterwaveTransaction, Payment, PaymentMethod, Refund
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def sync_payment_entitlements(sender, instance, **kwargs):
+    if instance.video_id or instance.course_id:
+        sync_users([instance.user_id])
+
+
+@receiver(post_save, sender='content.VideoPurchase')
+@receiver(post_delete, sender='content.VideoPurchase')
+@receiver(post_save, sender='lessons.Enrollment')
+@receiver(post_delete, sender='lessons.Enrollment')
+def sync_access_entitlements(sender, instance, **kwargs):
+    sync_users([instance.user_id])
+
+
+@receiver(post_save, sender='lessons.Enrollment')
+@receiver(post_delete, sender='lessons.Enrollment')
+def refresh_enrollment_count(sender, instance, **kwargs):
+    invalidate_count(instance.course_id)
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+@receiver(post_save, sender=PaymentMethod)
+@receiver(post_delete, sender=PaymentMethod)
+def refresh_registry(sender, **kwargs):
+    registry.invalidate()
+
+
+# Revenue summary: remember a row's contribution before the write, apply the difference after
+REVENUE_SOURCES = (Payment, Refund, FlutterwaveTransaction)
+
+
+def remember_revenue(sender, instance, **kwargs):
+    instance._revenue_before = revenue.row_contribution(sender, instance.pk) if instance.pk else {}
+
+
+def update_revenue(sender, instance, **kwargs):
+    before = getattr(instance, '_revenue_before', {})
+    revenue.apply_deltas(revenue.diff(before, revenue.row_contribution(sender, instance.pk)))
+
+
+def remove_revenue(sender, instance, **kwargs):
+    revenue.apply_deltas(revenue.diff(getattr(instance, '_revenue_before', {}), {}))
+
+
+for model in REVENUE_SOURCES:
+    pre_save.connect(remember_revenue, sender=model, dispatch_uid=f'revenue_pre_save_{model.__name__}')
+    post_save.connect(update_revenue, sender=model, dispatch_uid=f'revenue_post_save_{model.__name__}')
+    pre_delete.connect(remember_revenue, sender=model, dispatch_uid=f'revenue_pre_delete_{model.__name__}')
+    post_delete.connect(remove_revenue, sender=model, dispatch_uid=f'revenue_post_delete_{model.__name__}')
@@ -1,3 +1,832 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from bookings.models import Booking, Service as BookingService
+from content.models import Video, VideoPurchase
+from core.chrome import fragment_key
+from core.models import Notification
+from core.utils.cache_versions import bump_version
+from lessons.models import Course, Enrollment
+from PIL import Image
+import requests
+
+from . import registry
+from .confirmation import confirm_payments
+from .enrollments import annotate_courses, enrollment_count, is_enrolled
+from .entitlements import can_access, get_entitlements, load_entitlements
+from .flutterwave_stub import StubFlutterwaveServer, transaction_data, webhook_payload
+from .flutterwave_sync import apply_transaction_results
+from .flutterwave_utils import FlutterwaveAPI, build_session
+from .forms import PaymentForm
+from .models import (
+    Currency, DailyRevenueSummary, Entitlement, FlutterwaveTransaction, FlutterwaveWebhookEvent, Payment, PaymentMethod, PaymentTransaction,
+    ReconciliationCheckpoint, Refund,
+)
+from .qr_cache import QRImageCache, qr_text
+from .reconciliation import Reconciler
+from .revenue import dashboard_data, rebuild
+from .webhooks import process_pending_events
+
+User = get_user_model()
+
+
+class FlutterwaveStubMixin:
+    """Runs a local stub Flutterwave server and points FLW_BASE_URL at it"""
+
+    def setUp(self):
+        super().setUp()
+        self.stub = StubFlutterwaveServer().start()
+        self.addCleanup(self.stub.stop)
+        settings_override = override_settings(FLW_BASE_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+    def make_api(self, retries=2, timeout=(1, 2)):
+        return FlutterwaveAPI(session=build_session(retries=retries, backoff=0), timeout=timeout)
+
+
+class FlutterwaveAPITests(FlutterwaveStubMixin, SimpleTestCase):
+    def test_calls_reuse_one_keep_alive_connection(self):
+        tx = self.stub.add_transaction('TX-1', amount=5000)
+        api = self.make_api()
+
+        for _ in range(5):
+            response = api.verify_transaction(tx['id'])
+
+        self.assertEqual(response['data']['tx_ref'], 'TX-1')
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_get_is_retried_on_server_errors(self):
+        tx = self.stub.add_transaction('TX-2', amount=5000)
+        self.stub.fail_next = 2
+
+        response = self.make_api().verify_transaction(tx['id'])
+
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_payment_initiation_is_not_retried(self):
+        self.stub.fail_next = 1
+
+        response = self.make_api().initiate_payment({
+            'tx_ref': 'TX-3', 'amount': 1000, 'currency': 'TZS', 'redirect_url': 'https://example.com/',
+            'customer_email': 'a@example.com', 'customer_name': 'A',
+        })
+
+        self.assertEqual(response['status'], 'error')
+        self.assertEqual(self.stub.requests, 1)
+
+    def test_slow_provider_times_out_instead_of_hanging(self):
+        self.stub.latency = 0.5
+
+        response = self.make_api(retries=0, timeout=(1, 0.1)).verify_transaction(1)
+
+        self.assertEqual(response['status'], 'error')
+        self.assertIn('Flutterwave request failed', response['message'])
+
+    def test_non_json_answers_are_reported_as_unexpected(self):
+        page = requests.Response()
+        page.status_code, page._content = 502, b'<html>Bad gateway</html>'
+        session = mock.Mock(request=mock.Mock(return_value=page))
+
+        response = FlutterwaveAPI(session=session).verify_transaction(1)
+
+        self.assertEqual(response['status'], 'error')
+        self.assertEqual(response['message'], 'Unexpected response (HTTP 502)')
+
+    def test_banks_are_cached(self):
+        api = self.make_api()
+
+        first = api.get_banks('TZ')
+        second = api.get_banks('TZ')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['status'], 'success')
+        self.assertEqual(self.stub.requests, 1)
+
+    def test_failed_bank_lookups_are_not_cached(self):
+        self.stub.fail_next = 1
+        api = self.make_api(retries=0)
+
+        self.assertEqual(api.get_banks('TZ')['status'], 'error')
+        self.assertEqual(api.get_banks('TZ')['status'], 'success')
+
+
+@override_settings(FLW_SECRET_HASH='test-secret-hash')
+class FlutterwaveWebhookTests(FlutterwaveStubMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='payer', email='payer@example.com', password='x')
+        currency = Currency.objects.create(code='TZS', symbol='TSh')
+        method = PaymentMethod.objects.create(name='Flutterwave')
+        self.payment = Payment.objects.create(
+            user=self.user, amount=Decimal('5000'), currency=currency, method=method, reference_number='TX-100',
+        )
+        self.tx = FlutterwaveTransaction.objects.create(
+            user=self.user, tx_ref='TX-100', amount=Decimal('5000'), currency='TZS',
+        )
+
+    def post(self, data, secret='test-secret-hash'):
+        return self.client.post(
+            reverse('payments:flutterwave_webhook'), data=json.dumps(webhook_payload(data)),
+            content_type='application/json', HTTP_VERIF_HASH=secret,
+        )
+
+    def test_bad_signature_is_rejected(self):
+        response = self.post(transaction_data(1, 'TX-100', 5000), secret='wrong')
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(FlutterwaveWebhookEvent.objects.exists())
+
+    def test_redeliveries_are_stored_once(self):
+        data = transaction_data(1, 'TX-100', 5000)
+
+        for _ in range(3):
+            self.assertEqual(self.post(data).status_code, 200)
+
+        self.assertEqual(FlutterwaveWebhookEvent.objects.count(), 1)
+
+    def test_processing_confirms_transaction_and_payment(self):
+        self.post(transaction_data(1, 'TX-100', 5000))
+
+        self.assertEqual(process_pending_events(), 1)
+
+        self.tx.refresh_from_db()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.tx.status, 'successful')
+        self.assertEqual(self.tx.flw_transaction_id, 1)
+        self.assertTrue(self.payment.is_confirmed)
+        self.assertEqual(self.payment.status, 'Completed')
+        self.assertEqual(FlutterwaveWebhookEvent.objects.get().status, 'processed')
+        self.assertEqual(process_pending_events(), 0)
+
+    def test_underpayment_is_not_confirmed(self):
+        self.post(transaction_data(1, 'TX-100', 100))
+
+        process_pending_events()
+
+        self.payment.refresh_from_db()
+        self.assertFalse(self.payment.is_confirmed)
+        self.assertEqual(FlutterwaveWebhookEvent.objects.get().status, 'failed')
+
+    def test_late_failure_does_not_undo_success(self):
+        self.post(transaction_data(1, 'TX-100', 5000))
+        process_pending_events()
+        self.post(transaction_data(2, 'TX-100', 5000, status='failed'))
+        process_pending_events()
+
+        self.tx.refresh_from_db()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.tx.status, 'successful')
+        self.assertEqual(self.payment.status, 'Completed')
+
+    def test_data_that_is_not_an_object_is_rejected(self):
+        for data in ([1, 2], 'TX-100'):
+            response = self.client.post(
+                reverse('payments:flutterwave_webhook'), data=json.dumps({'event': 'charge.completed', 'data': data}),
+                content_type='application/json', HTTP_VERIF_HASH='test-secret-hash',
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(FlutterwaveWebhookEvent.objects.exists())
+
+    def test_odd_event_types_and_encodings_are_handled(self):
+        url = reverse('payments:flutterwave_webhook')
+        data = transaction_data(1, 'TX-100', 5000)
+        for event in (7, {'type': 'charge.completed'}):
+            response = self.client.post(
+                url, data=json.dumps({'event': event, 'data': data}),
+                content_type='application/json', HTTP_VERIF_HASH='test-secret-hash',
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlutterwaveWebhookEvent.objects.filter(event_type='7').count(), 1)
+
+        body = json.dumps({'event': 'charge.completed', 'data': data}).encode('utf-16')
+        response = self.client.post(url, data=body, content_type='application/json', HTTP_VERIF_HASH='test-secret-hash')
+        self.assertEqual(response.status_code, 400)
+
+    def test_verify_answer_without_transaction_data_is_retried(self):
+        self.post(self.stub.add_transaction('TX-100', 5000))
+
+        with mock.patch.object(FlutterwaveAPI, 'verify_transaction', return_value={'status': 'success', 'data': []}):
+            self.assertEqual(process_pending_events(verify=True), 0)
+
+        event = FlutterwaveWebhookEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('received', 1))
+        self.assertEqual(event.error, 'Verification failed')
+
+    def test_stored_event_with_bad_data_does_not_block_the_queue(self):
+        FlutterwaveWebhookEvent.objects.create(event_id='legacy', payload=json.dumps({'data': ['TX-100']}))
+        self.post(transaction_data(1, 'TX-100', 5000))
+
+        self.assertEqual(process_pending_events(), 2)
+
+        bad = FlutterwaveWebhookEvent.objects.get(event_id='legacy')
+        self.assertEqual(bad.status, 'ignored')
+        self.assertIn('not a JSON object', bad.error)
+        self.payment.refresh_from_db()
+        self.assertTrue(self.payment.is_confirmed)
+
+    @mock.patch('payments.flutterwave_utils._session', build_session(retries=0, backoff=0))
+    def test_failed_verification_backs_off(self):
+        self.post(self.stub.add_transaction('TX-100', 5000))
+        self.stub.fail_next = 1
+
+        self.assertEqual(process_pending_events(verify=True), 0)
+        self.assertEqual(process_pending_events(verify=True), 0)
+
+        event = FlutterwaveWebhookEvent.objects.get()
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual((event.status, event.attempts), ('received', 1))
+        self.assertGreater(event.next_attempt_at, timezone.now())
+
+        FlutterwaveWebhookEvent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_pending_events(verify=True), 1)
+
+        self.payment.refresh_from_db()
+        self.assertTrue(self.payment.is_confirmed)
+        self.assertEqual(FlutterwaveWebhookEvent.objects.get().status, 'processed')
+
+
+class ReconcilerTests(FlutterwaveStubMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='payer', email='payer@example.com', password='x')
+        for n in range(1, 6):
+            FlutterwaveTransaction.objects.create(
+                user=self.user, tx_ref=f"TX-{n}", amount=Decimal('1000'), currency='TZS',
+            )
+
+    def make_reconciler(self, **kwargs):
+        return Reconciler(workers=3, batch_size=2, min_age=timedelta(0), api=self.make_api(), **kwargs)
+
+    def test_applies_provider_results(self):
+        self.stub.add_transaction('TX-1', amount=1000)
+        self.stub.add_transaction('TX-2', amount=1000, status='failed')
+        self.stub.add_transaction('TX-3', amount=10)
+
+        stats = self.make_reconciler().run('transactions')
+
+        statuses = dict(FlutterwaveTransaction.objects.values_list('tx_ref', 'status'))
+        self.assertEqual(statuses['TX-1'], 'successful')
+        self.assertEqual(statuses['TX-2'], 'failed')
+        self.assertEqual(statuses['TX-3'], 'pending')
+        self.assertEqual(stats['scanned'], 5)
+        self.assertEqual(stats['mismatch'], 1)
+        self.assertEqual(stats['unverified'], 2)
+        self.assertTrue(stats['completed'])
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        reconciler = self.make_reconciler()
+
+        first = reconciler.run('transactions', limit=3)
+        second = reconciler.run('transactions')
+
+        self.assertFalse(first['completed'])
+        self.assertEqual(second['scanned'], 2)
+        self.assertEqual(self.stub.requests, 5)
+        checkpoint = ReconciliationCheckpoint.objects.get(name='transactions')
+        self.assertIsNotNone(checkpoint.completed_at)
+        self.assertEqual(checkpoint.processed, 5)
+
+    def test_recent_rows_are_skipped(self):
+        stats = Reconciler(workers=2, min_age=timedelta(minutes=10), api=self.make_api()).run('transactions')
+
+        self.assertNotIn('scanned', stats)
+        self.assertEqual(self.stub.requests, 0)
+
+
+class PaymentQRTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        qr_cache_override = override_settings(QR_CACHE_DIR=self.media.name)
+        qr_cache_override.enable()
+        self.addCleanup(qr_cache_override.disable)
+        patcher = mock.patch('payments.views.get_qr_cache', return_value=QRImageCache())
+        self.qr_cache = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.course = Course.objects.create(title='Swahili 101', description='-', price=Decimal('25000'), duration_weeks=4)
+        self.url = reverse('payments:generate_qr', args=['course', self.course.id, 'mpesa'])
+
+    def test_image_is_rendered_once_and_revalidated_with_etag(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Content-Type'], 'image/png')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(self.qr_cache.stats, {'memory': 1, 'disk': 0, 'rendered': 1})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], first['ETag'])
+        self.assertIn('no-cache', first['Cache-Control'])
+
+    def test_price_change_changes_the_etag(self):
+        before = self.client.get(self.url)
+        Course.objects.filter(id=self.course.id).update(price=Decimal('30000'))
+
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=before['ETag'])
+
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after['ETag'], before['ETag'])
+
+    def test_disk_tier_survives_a_cold_memory_cache(self):
+        text = qr_text('course', self.course.id, 'mpesa', self.course.price)
+        QRImageCache().get(text)
+
+        cold = QRImageCache()
+        cold.get(text)
+
+        self.assertEqual(cold.stats['disk'], 1)
+        self.assertEqual(cold.stats['rendered'], 0)
+
+    def test_unknown_objects_and_methods(self):
+        self.assertEqual(self.client.get(reverse('payments:generate_qr', args=['course', 999, 'mpesa'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('payments:generate_qr', args=['course', self.course.id, 'cash'])).status_code, 400)
+
+
+class EntitlementTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.currency = Currency.objects.create(code='TZS', symbol='TSh')
+        self.method = PaymentMethod.objects.create(name='M-Pesa')
+        self.videos = [
+            Video.objects.create(title=f"Lesson {n}", url='https://example.com/v', section='A1-A2', language='English')
+            for n in range(3)
+        ]
+        self.course = Course.objects.create(title='Swahili 101', description='-', price=Decimal('25000'), duration_weeks=4)
+
+    def request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return request
+
+    def pay_for(self, video, **kwargs):
+        return Payment.objects.create(
+            user=self.user, video=video, amount=Decimal('1000'), currency=self.currency, method=self.method,
+            reference_number=f"VID-{video.id}", **kwargs,
+        )
+
+    def test_grants_follow_payments_purchases_and_enrollments(self):
+        payment = self.pay_for(self.videos[0])
+        VideoPurchase.objects.create(user=self.user, video=self.videos[1])
+        Enrollment.objects.create(user=self.user, course=self.course)
+        self.assertFalse(load_entitlements(self.user.id).has('video', self.videos[0].id))
+
+        payment.status, payment.is_confirmed = 'Completed', True
+        payment.save()
+
+        grants = load_entitlements(self.user.id)
+        self.assertEqual(grants.ids('video'), {self.videos[0].id, self.videos[1].id})
+        self.assertTrue(grants.has('course', self.course.id))
+
+    def test_revoked_when_the_source_goes_away(self):
+        purchase = VideoPurchase.objects.create(user=self.user, video=self.videos[0])
+        enrollment = Enrollment.objects.create(user=self.user, course=self.course)
+        load_entitlements(self.user.id)
+
+        purchase.delete()
+        enrollment.is_active = False
+        enrollment.save()
+
+        self.assertEqual(len(load_entitlements(self.user.id)), 0)
+
+    def test_bulk_confirmation_grants_access(self):
+        self.pay_for(self.videos[2])
+        load_entitlements(self.user.id)
+
+        apply_transaction_results([transaction_data(1, 'VID-%d' % self.videos[2].id, 1000)])
+
+        self.assertTrue(load_entitlements(self.user.id).has('video', self.videos[2].id))
+
+    def test_one_query_per_request_then_cached(self):
+        for video in self.videos:
+            VideoPurchase.objects.create(user=self.user, video=video)
+
+        request = self.request()
+        with self.assertNumQueries(1):
+            for video in self.videos:
+                self.assertTrue(can_access(request, 'video', video.id))
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_entitlements(self.request())), 3)
+
+    def test_rebuild_command_restores_missing_rows(self):
+        VideoPurchase.objects.create(user=self.user, video=self.videos[0])
+        Entitlement.objects.all().delete()
+
+        call_command('rebuild_entitlements', stdout=io.StringIO())
+
+        self.assertEqual(Entitlement.objects.get().source, 'purchase')
+
+
+class EnrollmentLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.courses = [
+            Course.objects.create(title=f"Course {n}", description='-', price=Decimal('1000'), duration_weeks=4)
+            for n in range(3)
+        ]
+        others = [User.objects.create_user(username=f"other{n}", email=f"o{n}@example.com", password='x') for n in range(4)]
+        Enrollment.objects.bulk_create([Enrollment(user=u, course=self.courses[0]) for u in others])
+        Enrollment.objects.create(user=self.user, course=self.courses[1])
+
+    def test_membership(self):
+        self.assertTrue(is_enrolled(self.user, self.courses[1].id))
+        self.assertFalse(is_enrolled(self.user, self.courses[0].id))
+
+    def test_counts_are_cached_and_refreshed_by_signals(self):
+        self.assertEqual(enrollment_count(self.courses[0].id), 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(enrollment_count(self.courses[0].id), 4)
+
+        Enrollment.objects.create(user=self.user, course=self.courses[0])
+
+        self.assertEqual(enrollment_count(self.courses[0].id), 5)
+
+    def test_course_page_costs_two_queries(self):
+        with self.assertNumQueries(2):
+            courses = annotate_courses(self.courses, self.user)
+
+        self.assertEqual([c.enrolled_count for c in courses], [4, 1, 0])
+        self.assertEqual([c.is_enrolled for c in courses], [False, True, False])
+
+
+class RegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.invalidate()
+        self.tzs = Currency.objects.create(code='TZS', symbol='TSh', is_default=True)
+        Currency.objects.create(code='USD', symbol='$')
+        self.mpesa = PaymentMethod.objects.create(name='M-Pesa')
+        PaymentMethod.objects.create(name='Cash', is_active=False)
+
+    def test_loaded_once_then_served_from_memory(self):
+        with self.assertNumQueries(2):
+            reference = registry.get_registry()
+        with self.assertNumQueries(0):
+            self.assertIs(registry.get_registry(), reference)
+
+        self.assertEqual(reference.default_currency, self.tzs)
+        self.assertEqual(reference.method('m-pesa'), self.mpesa)
+        self.assertIsNone(reference.method('Cash'))
+
+    def test_saves_invalidate_the_snapshot(self):
+        registry.get_registry()
+
+        PaymentMethod.objects.create(name='Airtel Money')
+
+        self.assertIsNotNone(registry.get_registry().method('Airtel Money'))
+
+    def test_other_processes_reload_when_the_version_moves(self):
+        stale = registry.get_registry()
+        bump_version(registry.VERSION_NAME)
+
+        self.assertIsNot(registry.get_registry(), stale)
+
+    def test_form_choices_and_validation_come_from_the_registry(self):
+        registry.get_registry()
+        with self.assertNumQueries(0):
+            form = PaymentForm()
+            currency_field = form.fields['currency']
+            self.assertEqual([label for _, label in currency_field.widget.choices][1:], [str(self.tzs), 'USD ($)'])
+            self.assertEqual(currency_field.clean(str(self.tzs.pk)), self.tzs)
+            self.assertEqual(form.fields['method'].clean(str(self.mpesa.pk)), self.mpesa)
+
+
+class PaymentHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='payer', email='payer@example.com', password='x')
+        self.client.force_login(self.user)
+        tzs = Currency.objects.create(code='TZS', symbol='TSh')
+        usd = Currency.objects.create(code='USD', symbol='$')
+        method = PaymentMethod.objects.create(name='M-Pesa')
+        Payment.objects.bulk_create([
+            Payment(
+                user=self.user, amount=Decimal('1000'), currency=tzs if n % 3 else usd, method=method,
+                reference_number=f"REF-{n}", status='Completed' if n % 2 else 'Pending',
+            )
+            for n in range(25)
+        ])
+        PaymentTransaction.objects.bulk_create([
+            PaymentTransaction(payment=p, provider_reference=f"P-{p.reference_number}", provider_status='SUCCESS', provider_response='{}')
+            for p in Payment.objects.all()
+        ])
+        other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        Payment.objects.create(user=other, amount=Decimal('5'), currency=tzs, method=method, reference_number='OTHER')
+
+    def fetch(self, after=None, limit=10):
+        params = {'limit': limit}
+        if after:
+            params['after'] = after
+        return self.client.get(reverse('payments:payment_history_api'), params).json()
+
+    def test_keyset_pages_cover_every_payment_once(self):
+        seen, after = [], None
+        while True:
+            page = self.fetch(after)
+            seen += [row['reference'] for row in page['results']]
+            after = page['next']
+            if not after:
+                break
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+        self.assertNotIn('OTHER', seen)
+
+    def test_totals_are_grouped_by_currency_and_status(self):
+        totals = {(row['currency__code'], row['status']): row for row in self.fetch()['totals']}
+
+        self.assertEqual(sum(row['count'] for row in totals.values()), 25)
+        self.assertEqual(totals[('USD', 'Pending')]['count'], 5)
+        self.assertEqual(Decimal(totals[('USD', 'Pending')]['total']), Decimal('5000'))
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        url = reverse('payments:payment_history')
+        self.client.get(url)  # fill the layout's fragment cache first
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {'limit': 2})
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url, {'limit': 20})
+
+        self.assertEqual(len(small), len(large))
+        self.assertContains(response, 'Older payments')
+
+
+def make_jpeg(size=(2400, 1800), color=(200, 30, 30)):
+    image = Image.new('RGB', size, color)
+    exif = Image.Exif()
+    exif[0x0110] = 'Test Phone'   # Model
+    exif[0x0112] = 6              # Orientation: rotate 90° on display
+    buf = io.BytesIO()
+    image.save(buf, format='JPEG', quality=95, exif=exif)
+    return buf.getvalue()
+
+
+class ReceiptProcessingTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        self.client.force_login(self.user)
+        currency = Currency.objects.create(code='TZS', symbol='TSh')
+        method = PaymentMethod.objects.create(name='M-Pesa')
+        self.payments = [
+            Payment.objects.create(user=self.user, amount=Decimal('1000'), currency=currency, method=method, reference_number=f"R-{n}")
+            for n in range(2)
+        ]
+
+    def upload(self, payment, data):
+        return self.client.post(
+            reverse('payments:upload_receipt', args=[payment.id]),
+            {'receipt': SimpleUploadedFile('whatsapp.jpg', data, content_type='image/jpeg')},
+        )
+
+    def test_upload_is_hashed_while_streaming(self):
+        data = make_jpeg()
+
+        response = self.upload(self.payments[0], data)
+
+        self.assertEqual(response.status_code, 302)
+        self.payments[0].refresh_from_db()
+        self.assertEqual(self.payments[0].receipt_hash, hashlib.sha256(data).hexdigest())
+        self.assertIsNone(self.payments[0].receipt_processed_at)
+
+    def test_post_without_a_file_changes_nothing(self):
+        url = reverse('payments:upload_receipt', args=[self.payments[0].id])
+
+        response = self.client.post(url, {})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('receipt', response.context['form'].errors)
+
+        data = make_jpeg()
+        self.upload(self.payments[0], data)
+        call_command('process_receipts', stdout=io.StringIO())
+        Payment.objects.filter(pk=self.payments[0].pk).update(status='Completed', is_confirmed=True)
+
+        response = self.client.post(url, {})
+
+        self.assertEqual(response.status_code, 302)
+        payment = Payment.objects.get(pk=self.payments[0].pk)
+        self.assertEqual(payment.status, 'Completed')
+        self.assertTrue(payment.is_confirmed)
+        self.assertEqual(payment.receipt_hash, hashlib.sha256(data).hexdigest())
+        self.assertIsNotNone(payment.receipt_processed_at)
+        self.assertTrue(payment.receipt_thumbnail)
+
+    def test_processing_shrinks_strips_and_thumbnails(self):
+        data = make_jpeg()
+        self.upload(self.payments[0], data)
+
+        call_command('process_receipts', stdout=io.StringIO())
+
+        payment = Payment.objects.get(pk=self.payments[0].pk)
+        self.assertIsNotNone(payment.receipt_processed_at)
+        self.assertLess(payment.receipt.size, len(data))
+        with Image.open(payment.receipt.path) as image:
+            self.assertEqual(image.size, (1200, 1600))   # rotated upright, long edge capped
+            self.assertFalse(image.getexif())
+        with Image.open(payment.receipt_thumbnail.path) as thumb:
+            self.assertEqual(max(thumb.size), 240)
+
+    def test_duplicate_receipts_are_flagged_in_admin(self):
+        data = make_jpeg()
+        for payment in self.payments:
+            self.upload(payment, data)
+
+        response = self.client.get(reverse('admin:payments_payment_changelist'), {'duplicate_receipt': 'yes'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+
+class RevenueSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        self.tzs = Currency.objects.create(code='TZS', symbol='TSh')
+        self.mpesa = PaymentMethod.objects.create(name='M-Pesa')
+        self.video = Video.objects.create(title='Lesson', url='https://example.com/v', section='A1-A2', language='English')
+
+    def pay(self, ref, amount, **kwargs):
+        return Payment.objects.create(
+            user=self.user, amount=Decimal(amount), currency=self.tzs, method=self.mpesa, reference_number=ref, **kwargs,
+        )
+
+    def snapshot(self):
+        return set(
+            DailyRevenueSummary.objects.filter(count__gt=0)
+            .values_list('day', 'currency', 'method', 'product_type', 'status', 'count', 'amount')
+        )
+
+    def test_signals_match_a_full_rebuild(self):
+        self.pay('A', '1000', video=self.video)
+        second = self.pay('B', '2500')
+        second.status = 'Completed'
+        second.save()
+        Refund.objects.create(payment=second, amount=Decimal('500'), reason='Duplicate')
+        self.pay('C', '700').delete()
+        FlutterwaveTransaction.objects.create(user=self.user, tx_ref='FLW-1', amount=Decimal('900'), currency='TZS')
+
+        incremental = self.snapshot()
+        rebuild()
+
+        self.assertEqual(incremental, self.snapshot())
+        today = timezone.localdate()
+        self.assertEqual(
+            DailyRevenueSummary.objects.get(day=today, status='Completed').amount, Decimal('2500'),
+        )
+        self.assertEqual(DailyRevenueSummary.objects.get(status='Refunded').amount, Decimal('500'))
+        self.assertEqual(DailyRevenueSummary.objects.get(status='Pending', product_type='video').count, 1)
+
+    def test_bulk_confirmation_refreshes_the_day(self):
+        self.pay('FLW-2', '1000')
+
+        apply_transaction_results([transaction_data(1, 'FLW-2', 1000)])
+
+        self.assertEqual(DailyRevenueSummary.objects.get(status='Completed').count, 1)
+        self.assertFalse(DailyRevenueSummary.objects.filter(status='Pending', count__gt=0).exists())
+
+    def test_dashboard_reads_only_the_summary(self):
+        self.pay('D', '1000', status='Completed')
+        self.pay('E', '3000')
+        self.client.force_login(self.user)
+
+        with self.assertNumQueries(1):
+            data = dashboard_data(days=7)
+        response = self.client.get(reverse('admin:payments_dailyrevenuesummary_changelist'))
+
+        self.assertEqual(data['revenue']['TZS'][-1], Decimal('1000'))
+        self.assertEqual(data['conversion'][-1], 50.0)
+        self.assertContains(response, 'Revenue (TZS)')
+
+
+class BulkConfirmationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        self.learners = [
+            User.objects.create_user(username=f"learner{n}", email=f"l{n}@example.com", password='x') for n in range(2)
+        ]
+        self.currency = Currency.objects.create(code='TZS', symbol='TSh')
+        self.method = PaymentMethod.objects.create(name='M-Pesa')
+        self.course = Course.objects.create(title='Swahili 101', description='-', price=Decimal('1000'), duration_weeks=4)
+        self.video = Video.objects.create(title='Lesson', url='https://example.com/v', section='A1-A2', language='English')
+        service = BookingService.objects.create(name='Tutoring', description='-', price=Decimal('1000'))
+        self.booking = Booking.objects.create(
+            user=self.learners[0], service=service, booking_date=timezone.localdate(), timeslot='10:00',
+        )
+
+    def pay(self, user, ref, **item):
+        return Payment.objects.create(
+            user=user, amount=Decimal('1000'), currency=self.currency, method=self.method, reference_number=ref, **item,
+        )
+
+    def test_confirmation_creates_grants_and_one_notification_per_user(self):
+        first, second = self.learners
+        self.pay(first, 'C-1', course=self.course)
+        self.pay(first, 'V-1', video=self.video)
+        self.pay(first, 'B-1', booking=self.booking)
+        self.pay(second, 'V-2', video=self.video)
+
+        stats = confirm_payments(Payment.objects.all())
+
+        self.assertEqual(stats['confirmed'], 4)
+        self.assertEqual(stats['enrollments'], 1)
+        self.assertEqual(stats['purchases'], 2)
+        self.assertEqual(stats['bookings'], 1)
+        self.assertEqual(Notification.objects.filter(user=first).count(), 1)
+        self.assertEqual(Notification.objects.filter(user=second).count(), 1)
+        self.assertIn('C-1', Notification.objects.get(user=first).message)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'confirmed')
+        self.assertTrue(load_entitlements(second.id).has('video', self.video.id))
+
+    def test_running_twice_changes_nothing(self):
+        self.pay(self.learners[0], 'C-1', course=self.course)
+        confirm_payments(Payment.objects.all())
+
+        stats = confirm_payments(Payment.objects.all())
+
+        self.assertEqual(stats['confirmed'], 0)
+        self.assertEqual(stats['enrollments'], 0)
+        self.assertEqual(Enrollment.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_rows_another_worker_inserted_are_not_counted(self):
+        learner = self.learners[0]
+        earlier = self.pay(learner, 'C-0', course=self.course)
+        self.pay(learner, 'C-1', course=self.course)
+        # Inserted after this run checked for existing rows
+        Enrollment.objects.create(user=learner, course=self.course, payment=earlier)
+
+        with mock.patch('payments.confirmation._existing_pairs', return_value=set()):
+            stats = confirm_payments(Payment.objects.filter(reference_number='C-1'))
+
+        self.assertEqual(stats['enrollments'], 0)
+        self.assertEqual(Enrollment.objects.count(), 1)
+
+    def test_notified_users_get_a_fresh_nav(self):
+        learner = self.learners[0]
+        self.pay(learner, 'V-1', video=self.video)
+        before = [fragment_key('nav-user', user) for user in self.learners]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            confirm_payments(Payment.objects.all())
+
+        after = [fragment_key('nav-user', user) for user in self.learners]
+        self.assertNotEqual(after[0], before[0])
+        self.assertEqual(after[1], before[1])
+
+    def test_query_count_does_not_grow_with_selection(self):
+        User.objects.bulk_create([
+            User(username=f"bulk{n}", email=f"bulk{n}@example.com", password='!') for n in range(40)
+        ])
+        users = list(User.objects.filter(username__startswith='bulk'))
+
+        def run(selection):
+            Payment.objects.bulk_create([
+                Payment(
+                    user=user, amount=Decimal('1000'), currency=self.currency, method=self.method,
+                    reference_number=f"Q-{len(selection)}-{user.pk}", course=self.course,
+                )
+                for user in selection
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                confirm_payments(Payment.objects.filter(reference_number__startswith=f"Q-{len(selection)}-"))
+            return len(queries)
+
+        self.assertEqual(run(users[:3]), run(users[3:]))
+
+    def test_admin_action_reports_counts(self):
+        self.pay(self.learners[0], 'C-1', course=self.course)
+        self.client.force_login(self.admin)
+
+        response = self.client.post(
+            reverse('admin:payments_payment_changelist'),
+            {'action': 'mark_as_confirmed', '_selected_action': list(Payment.objects.values_list('pk', flat=True))},
+            follow=True,
+        )
+
+        self.assertContains(response, '1 enrollment(s)')
+        self.assertTrue(Enrollment.objects.filter(user=self.learners[0], course=self.course).exists())
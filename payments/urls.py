@@ -12,4 +12,11 @@ urlpatterns = [
     # ✅ QR Code
     path('qr/<str:obj_type>/<int:obj_id>/<str:method>/', views.generate_qr, name='generate_qr'),
     path("receipt/upload/<int:payment_id>/", views.upload_receipt, name="upload_receipt"),
+
+    # History
+    path("history/", views.payment_history, name="payment_history"),
+    path("api/history/", views.payment_history_api, name="payment_history_api"),
+
+    # Flutterwave webhooks
+    path("webhooks/flutterwave/", views.flutterwave_webhook, name="flutterwave_webhook"),
 ]
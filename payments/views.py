@@ -4,19 +4,25 @@ from django.http import JsonResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 import time, uuid
-import qrcode
-import io
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
 
 from .forms import PaymentForm
-from .models import PaymentTransaction, PaymentMethod, Payment
+from .models import PaymentTransaction, Payment
 from quotes.models import QuoteRequest
 from bookings.models import Booking
 from content.models import Video
 from lessons.models import Course
-from payments.models import Currency
 from django.conf import settings
 from .forms import ReceiptUploadForm
+from .history import MAX_PAGE_SIZE, PAGE_SIZE, history_page, history_totals, serialize_payment
+from .qr_cache import PAYMENT_NUMBERS, get_qr_cache, qr_text, text_digest
+from .receipts import HashingUploadHandler
+from .registry import get_registry
+from .webhooks import record_event, verify_signature
 from lessons.models import Course
 from content.models import Video
 from bookings.models import Booking
@@ -27,20 +33,13 @@ from quotes.models import QuoteRequest
 
 @login_required
 def select_payment_method(request, obj_type, obj_id):
-    # Map object type to model + amount field
-    model_map = {
-        "course": (Course, "price"),
-        "booking": (Booking, "amount"),
-        "quote": (QuoteRequest, "amount"),
-        "video": (Video, "price"),
-    }
-
-    if obj_type not in model_map:
+    if obj_type not in PAYABLE:
         return render(request, "payments/error.html", {"message": "Invalid payment type"})
 
-    model, amount_field = model_map[obj_type]
-    obj = get_object_or_404(model, id=obj_id)
-    amount = getattr(obj, amount_field, 0)
+    obj = _get_payment_object(obj_type, obj_id)
+    amount = getattr(obj, PAYABLE[obj_type][1], 0)
+
+    registry = get_registry()
 
     # ✅ Ensure a Payment record exists (Pending by default)
     payment, created = Payment.objects.get_or_create(
@@ -48,8 +47,8 @@ def select_payment_method(request, obj_type, obj_id):
         reference_number=f"TXN-{request.user.id}-{obj_type.upper()}-{obj_id}",
         defaults={
             "amount": amount,
-            "currency": Currency.objects.filter(is_default=True).first(),
-            "method": PaymentMethod.objects.first(),  # placeholder until chosen
+            "currency": registry.default_currency,
+            "method": registry.default_method,  # placeholder until chosen
             "status": "Pending",
             obj_type: obj,  # assign FK dynamically
         },
@@ -60,7 +59,7 @@ def select_payment_method(request, obj_type, obj_id):
         "type": obj_type,
         "amount": amount,
         "payment": payment,   # pass payment instance to template
-        "mpesa_number": "68088449",
+        "mpesa_number": PAYMENT_NUMBERS["mpesa"],
         "airtel_number": "",
     })
 
@@ -73,14 +72,15 @@ def pay_with_mpesa(request, obj_type, obj_id):  # Changed parameter names
         return redirect("home")
 
     # Create Payment
+    registry = get_registry()
     tx_ref = f"MPESA-{uuid.uuid4().hex[:8]}"
     payment = Payment.objects.create(
         user=request.user,
         amount=getattr(obj, "price", getattr(obj, "amount", 0)),
-        method=PaymentMethod.objects.filter(name__iexact="M-Pesa").first(),
+        method=registry.method("M-Pesa"),
         reference_number=tx_ref,
         status="Completed",  # Simulated
-        currency=Currency.objects.filter(is_default=True).first()
+        currency=registry.default_currency
     )
 
     # Create Transaction log
@@ -104,14 +104,15 @@ def pay_with_airtel(request, obj_type, obj_id):  # Changed parameter names
         return redirect("home")
 
     # Create Payment
+    registry = get_registry()
     tx_ref = f"AIRTEL-{uuid.uuid4().hex[:8]}"
     payment = Payment.objects.create(
         user=request.user,
         amount=getattr(obj, "price", getattr(obj, "amount", 0)),
-        method=PaymentMethod.objects.filter(name__iexact="Airtel Money").first(),
+        method=registry.method("Airtel Money"),
         reference_number=tx_ref,
         status="Completed",  # Simulated
-        currency=Currency.objects.filter(is_default=True).first()
+        currency=registry.default_currency
     )
 
     # Create Transaction log
@@ -127,46 +128,94 @@ def pay_with_airtel(request, obj_type, obj_id):  # Changed parameter names
 
 
 # -------------------- HELPERS --------------------
-def _get_payment_object(obj_type, obj_id):  # Updated parameter names
+# Object type in payment URLs -> (model, amount field)
+PAYABLE = {
+    "course": (Course, "price"),
+    "booking": (Booking, "amount"),
+    "quote": (QuoteRequest, "amount"),
+    "video": (Video, "price"),
+}
+
+
+def _get_payment_object(obj_type, obj_id):
     """Fetch the correct object for payment"""
-    if obj_type == "course":
-        return get_object_or_404(Course, id=obj_id)
-    elif obj_type == "booking":
-        return get_object_or_404(Booking, id=obj_id)
-    elif obj_type == "quote":
-        return get_object_or_404(QuoteRequest, id=obj_id)
-    elif obj_type == "video":
-        return get_object_or_404(Video, id=obj_id)
-    return None
+    if obj_type not in PAYABLE:
+        return None
+    return get_object_or_404(PAYABLE[obj_type][0], id=obj_id)
+
+
+def _get_payment_amount(obj_type, obj_id):
+    """Just the amount, without loading the whole object"""
+    model, amount_field = PAYABLE[obj_type]
+    amounts = model.objects.filter(id=obj_id).values_list(amount_field, flat=True)
+    if not amounts:
+        raise Http404(f"No {obj_type} with id {obj_id}")
+    return amounts[0]
 
 
 # -------------------- SUCCESS / HISTORY --------------------
 def payment_success(request):
     return render(request, 'payments/payment_success.html')
 
+def _history_page_size(request):
+    try:
+        return max(1, min(int(request.GET.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+
+
 @login_required
 def payment_history(request):
-    transactions = PaymentTransaction.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, 'payments/history.html', {'transactions': transactions})
+    payments, next_cursor = history_page(request.user, request.GET.get("after"), _history_page_size(request))
+    return render(request, 'payments/history.html', {
+        'payments': payments,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get("after"),
+        'totals': history_totals(request.user),
+    })
+
 
 @login_required
+def payment_history_api(request):
+    payments, next_cursor = history_page(request.user, request.GET.get("after"), _history_page_size(request))
+    data = {
+        "results": [serialize_payment(payment) for payment in payments],
+        "next": next_cursor,
+    }
+    if not request.GET.get("after"):
+        data["totals"] = [
+            {**row, "total": str(row["total"])} for row in history_totals(request.user)
+        ]
+    return JsonResponse(data)
+
+@login_required
+@csrf_exempt
 def upload_receipt(request, payment_id):
+    # Upload handlers must be swapped before anything reads the body, so CSRF is checked below instead
+    request.upload_handlers = [HashingUploadHandler(request)]
+    return _upload_receipt(request, payment_id)
+
+
+@csrf_protect
+def _upload_receipt(request, payment_id):
     payment = get_object_or_404(Payment, id=payment_id, user=request.user)
 
     if request.method == "POST":
-        print("📤 POST request received")
-        print("FILES:", request.FILES)
-
         form = ReceiptUploadForm(request.POST, request.FILES, instance=payment)
         if form.is_valid():
-            print("✅ Form valid")
-            payment = form.save(commit=False)
-            payment.status = "Pending"
-            payment.is_confirmed = False
-            payment.save()
+            # The required field still accepts an empty POST when a receipt is already on file
+            upload = request.FILES.get("receipt")
+            if upload is not None:
+                payment = form.save(commit=False)
+                payment.status = "Pending"
+                payment.is_confirmed = False
+                # process_receipts shrinks the image and writes the thumbnail later
+                payment.receipt_hash = getattr(upload, "sha256", "")
+                payment.receipt_processed_at = None
+                if payment.receipt_thumbnail:
+                    payment.receipt_thumbnail.delete(save=False)
+                payment.save()
             return redirect("content:video_learning")
-        else:
-            print("❌ Form errors:", form.errors)
     else:
         form = ReceiptUploadForm(instance=payment)
 
@@ -177,8 +226,9 @@ def buy_video(request, video_id):
     video = get_object_or_404(Video, id=video_id)
 
     # Pick default currency & method (you can let them choose)
-    currency = Currency.objects.filter(is_default=True).first()
-    method = PaymentMethod.objects.first()
+    registry = get_registry()
+    currency = registry.default_currency
+    method = registry.default_method
 
     # Create a pending payment
     payment = Payment.objects.create(
@@ -198,34 +248,34 @@ def buy_video(request, video_id):
 
 
 def generate_qr(request, obj_type, obj_id, method):
-    """Generate QR code for payment (M-Pesa / Airtel)"""
-    if obj_type == "video":
-        obj = get_object_or_404(Video, id=obj_id)
-        amount = obj.price
-    elif obj_type == "course":
-        obj = get_object_or_404(Course, id=obj_id)
-        amount = obj.price
-    elif obj_type == "booking":
-        obj = get_object_or_404(Booking, id=obj_id)
-        amount = obj.amount
-    elif obj_type == "quote":
-        obj = get_object_or_404(QuoteRequest, id=obj_id)
-        amount = obj.amount
-    else:
+    """Generate QR code for payment (M-Pesa / Airtel), served from the QR cache"""
+    if obj_type not in PAYABLE:
         return HttpResponseBadRequest("Invalid type")
-
-    if method == "mpesa":
-        number = "68088449"
-    elif method == "airtel":
-        number = "+255784567890"
-    else:
+    if method not in PAYMENT_NUMBERS:
         return HttpResponseBadRequest("Invalid method")
 
-    # Create payment text
-    qr_text = f"PAY TO {number} AMOUNT {amount} REFERENCE {obj_type.upper()}{obj.id}"
+    text = qr_text(obj_type, obj_id, method, _get_payment_amount(obj_type, obj_id))
+    etag = quote_etag(text_digest(text))
 
-    # Generate QR image
-    qr = qrcode.make(qr_text)
-    buf = io.BytesIO()
-    qr.save(buf, format="PNG")
-    return HttpResponse(buf.getvalue(), content_type="image/png")
\ No newline at end of file
+    # The ETag is known before rendering, so revalidations skip the image entirely
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        _, png = get_qr_cache().get(text)
+        response = HttpResponse(png, content_type="image/png")
+    response["ETag"] = etag
+    # Prices can change under the same URL, so browsers keep the image but always revalidate
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# -------------------- FLUTTERWAVE WEBHOOK --------------------
+@csrf_exempt
+@require_POST
+def flutterwave_webhook(request):
+    """Store the delivery and acknowledge; process_flutterwave_events applies it"""
+    if not verify_signature(request):
+        return JsonResponse({"status": "error", "message": "Invalid signature"}, status=401)
+    if not record_event(request.body):
+        return JsonResponse({"status": "error", "message": "Invalid payload"}, status=400)
+    return JsonResponse({"status": "received"})
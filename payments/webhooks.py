@@ -0,0 +1,175 @@
+# payments/webhooks.py
+import hashlib
+import hmac
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .flutterwave_sync import apply_transaction_results
+from .flutterwave_utils import FlutterwaveAPI
+from .models import FlutterwaveWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = timedelta(minutes=1)   # doubles after each failed verification
+VERIFY_LEASE = timedelta(minutes=15)   # other workers skip a batch this long while it is verified
+
+
+def verify_signature(request):
+    """Flutterwave echoes the dashboard "secret hash" in the verif-hash header"""
+    secret_hash = getattr(settings, 'FLW_SECRET_HASH', '')
+    received = request.headers.get('verif-hash', '')
+    if not secret_hash or not received:
+        return False
+    return hmac.compare_digest(received.encode('utf-8'), secret_hash.encode('utf-8'))
+
+
+def _payload_data(payload):
+    """The delivery's `data` object ({} when absent), or None when either isn't a JSON object"""
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get('data')
+    if data is None:
+        return {}
+    return data if isinstance(data, dict) else None
+
+
+def _event_type(payload):
+    return str(payload.get('event') or payload.get('event.type') or '')
+
+
+def event_key(payload, body):
+    """Stable id for a delivery: event type + Flutterwave transaction id, else a body digest"""
+    data = _payload_data(payload) or {}
+    event_type = _event_type(payload)
+    if data.get('id'):
+        return f"{event_type}:{data['id']}"[:120]
+    return f"sha256:{hashlib.sha256(body).hexdigest()}"
+
+
+def record_event(body):
+    """
+    Store a raw delivery with a single INSERT ... ON CONFLICT DO NOTHING.
+
+    Returns False when the body isn't UTF-8 JSON or it or its `data` isn't
+    an object. Redeliveries hit the unique event_id and are dropped by the
+    database without an extra read.
+    """
+    try:
+        text = body.decode('utf-8')
+        payload = json.loads(text)
+    except ValueError:  # UnicodeDecodeError included
+        return False
+    data = _payload_data(payload)
+    if data is None:
+        return False
+
+    event = FlutterwaveWebhookEvent(
+        event_id=event_key(payload, body),
+        event_type=_event_type(payload)[:50],
+        tx_ref=str(data.get('tx_ref') or data.get('txRef') or '')[:100],
+        payload=text,
+    )
+    FlutterwaveWebhookEvent.objects.bulk_create([event], ignore_conflicts=True)
+    return True
+
+
+def _claim(batch_size):
+    """Lock up to batch_size due events, skipping rows another worker holds"""
+    return list(
+        FlutterwaveWebhookEvent.objects.select_for_update(skip_locked=True)
+        .filter(status='received', next_attempt_at__lte=timezone.now())
+        .order_by('id')[:batch_size]
+    )
+
+
+def _verify(events):
+    """{event pk: Flutterwave's verify response} for every event with a transaction id"""
+    api = FlutterwaveAPI()
+    responses = {}
+    for event in events:
+        data = _payload_data(json.loads(event.payload)) or {}
+        if data.get('id'):
+            responses[event.pk] = api.verify_transaction(data['id'])
+    return responses
+
+
+def _apply(events, verified):
+    now = timezone.now()
+    results, by_ref = [], {}
+    for event in events:
+        event.attempts += 1
+        data = _payload_data(json.loads(event.payload))
+        if data is None:
+            # Left in the queue it would fail every batch it heads
+            event.status, event.error = 'ignored', 'Payload data is not a JSON object'
+            continue
+        if event.pk in verified:
+            # Trust the provider's record over the delivered body
+            response = verified[event.pk]
+            if response.get('status') != 'success' or not isinstance(response.get('data'), dict):
+                event.error = str(response.get('message') or 'Verification failed')
+                if event.attempts >= MAX_ATTEMPTS:
+                    event.status = 'failed'
+                else:
+                    event.status = 'received'
+                    event.next_attempt_at = now + RETRY_BACKOFF * 2 ** (event.attempts - 1)
+                continue
+            data = response['data']
+        if not data.get('tx_ref'):
+            event.status, event.error = 'ignored', 'No tx_ref in payload'
+            continue
+        results.append(data)
+        by_ref.setdefault(data['tx_ref'], []).append(event)
+
+    outcomes = apply_transaction_results(results)
+
+    for tx_ref, ref_events in by_ref.items():
+        outcome = outcomes.get(tx_ref, 'unknown')
+        for event in ref_events:
+            if outcome == 'unknown':
+                event.status, event.error = 'ignored', f"No transaction or payment for {tx_ref}"
+            elif outcome == 'mismatch':
+                event.status, event.error = 'failed', 'Paid amount or currency does not match'
+            else:
+                event.status, event.error = 'processed', ''
+    for event in events:
+        if event.status != 'received':
+            event.processed_at = now
+
+    FlutterwaveWebhookEvent.objects.bulk_update(events, ['status', 'attempts', 'error', 'next_attempt_at', 'processed_at'])
+    handled = sum(event.status != 'received' for event in events)
+    logger.info("Processed %d Flutterwave webhook event(s), %d left for retry", handled, len(events) - handled)
+    return handled
+
+
+def process_pending_events(batch_size=100, verify=False):
+    """
+    Apply one batch of due events and return how many were settled.
+
+    Rows are locked with SKIP LOCKED where the database supports it, so
+    several workers can drain the queue side by side. With verify=True the
+    batch is leased through next_attempt_at and the locks are released
+    while Flutterwave is called; a failed verification is retried with
+    exponential backoff and is not counted as settled.
+    """
+    if not verify:
+        with transaction.atomic():
+            events = _claim(batch_size)
+            return _apply(events, {}) if events else 0
+
+    with transaction.atomic():
+        events = _claim(batch_size)
+        FlutterwaveWebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            next_attempt_at=timezone.now() + VERIFY_LEASE,
+        )
+    if not events:
+        return 0
+    verified = _verify(events)
+    with transaction.atomic():
+        return _apply(events, verified)